@@ -0,0 +1,94 @@
+"""
+This file contains the command line of the benchmark suite.
+Run it with: `python -m benchmarks --scales 1000 100000`
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from benchmarks.generator import generate_dataset
+from benchmarks.suite import (
+    benchmark,
+    compare_with_baseline,
+    load_baselines,
+    save_baselines,
+)
+
+
+def main() -> int:
+    """
+    Benchmark the ETL on synthetic data at each scale and compare the results with the baselines.
+
+    Returns
+    -------
+    int
+        The exit code: 1 if a stage regressed, 0 otherwise.
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the ETL.")
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000],
+        help="The numbers of articles to generate.",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="The number of timed runs."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="The relative increase allowed before a measure is a regression.",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the new baselines instead of comparing them.",
+    )
+    arguments = parser.parse_args()
+
+    baselines = load_baselines()
+    regressions = []
+
+    for scale in arguments.scales:
+        with tempfile.TemporaryDirectory() as folder_path:
+            data_folder = os.path.join(folder_path, "data")
+            generate_dataset(data_folder, scale)
+            results = benchmark(
+                data_folder, os.path.join(folder_path, "data.json"), arguments.repeat
+            )
+
+        print(f"{scale:,} articles:")
+        for stage, measures in results.items():
+            print(
+                f"- {stage}: {measures['seconds']:.3f}s, {measures['peak_bytes']:,} peak bytes"
+            )
+
+        if arguments.save_baseline:
+            baselines[str(scale)] = results
+        elif str(scale) in baselines:
+            regressions += [
+                f"{scale:,} articles, {regression}"
+                for regression in compare_with_baseline(
+                    results, baselines[str(scale)], arguments.tolerance
+                )
+            ]
+        else:
+            print(f"No baseline for {scale:,} articles.", file=sys.stderr)
+
+    if arguments.save_baseline:
+        save_baselines(baselines)
+        print("Baselines saved.")
+
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+This file contains functions to generate synthetic drugs, pubmed and clinical trials files
+with the same shapes as the `data` folder, at any scale.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from etl.sinks import JsonSink
+
+BLOCK_SIZE = 100_000
+TITLE_WORDS_COUNT = 12
+DRUG_QUOTE_RATE = 0.3
+ESCAPE_SEQUENCE_RATE = 0.01
+DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d %B %Y")
+# share of the articles written to each file
+ARTICLES_FILES_SHARES = {
+    "pubmed.csv": 0.4,
+    "pubmed.json": 0.1,
+    "clinical_trials.csv": 0.5,
+}
+
+SAMPLE_DRUGS = [
+    "DIPHENHYDRAMINE",
+    "TETRACYCLINE",
+    "ETHANOL",
+    "ATROPINE",
+    "EPINEPHRINE",
+    "ISOPRENALINE",
+    "BETAMETHASONE",
+]
+SYLLABLES = ["ab", "ce", "di", "fo", "lu", "ma", "ne", "pra", "ro", "sti", "tu", "vi"]
+SUFFIXES = ["mine", "cycline", "nol", "pine", "phrine", "line", "sone", "zole"]
+WORDS = [
+    "a",
+    "acute",
+    "administration",
+    "analysis",
+    "and",
+    "as",
+    "associated",
+    "chronic",
+    "clinical",
+    "controlled",
+    "effects",
+    "evaluation",
+    "following",
+    "for",
+    "group",
+    "in",
+    "infusion",
+    "injection",
+    "of",
+    "on",
+    "pain",
+    "patients",
+    "phase",
+    "postoperative",
+    "prevention",
+    "randomized",
+    "rates",
+    "reactions",
+    "risk",
+    "study",
+    "the",
+    "therapy",
+    "treatment",
+    "trial",
+    "versus",
+    "with",
+]
+
+
+def generate_dataset(
+    folder_path: str, articles_count: int, drugs_count: int = 100, seed: int = 0
+) -> None:
+    """
+    Generate drugs, pubmed and clinical trials files in a folder.
+    The same arguments always give the same files.
+
+    Articles are split between `pubmed.csv`, `pubmed.json` and `clinical_trials.csv`.
+    Titles quote drugs, dates use several formats and a few titles hold literal escape sequences,
+    as in the `data` folder.
+
+    Parameters
+    ----------
+    folder_path : str
+        The path to the folder, created if needed.
+    articles_count : int
+        The total number of articles.
+    drugs_count : int
+        The number of drugs.
+    seed : int
+        The seed of the random generator.
+    """
+
+    os.makedirs(folder_path, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    drugs = _generate_drugs(rng, drugs_count)
+    drugs.to_csv(os.path.join(folder_path, "drugs.csv"), index=False)
+
+    journals = np.array(
+        [
+            f"Journal of {' '.join(rng.choice(WORDS, size=2))} {index}"
+            for index in range(max(10, articles_count // 1000))
+        ],
+        dtype=object,
+    )
+
+    first_id = 1
+    for file_name, share in ARTICLES_FILES_SHARES.items():
+        file_articles_count = round(articles_count * share)
+        file_path = os.path.join(folder_path, file_name)
+        title_column = "title" if file_name.startswith("pubmed") else "scientific_title"
+
+        blocks = (
+            _generate_articles(
+                rng,
+                first_id + start,
+                min(BLOCK_SIZE, file_articles_count - start),
+                drugs["drug"].to_numpy(dtype=object),
+                journals,
+                title_column,
+            )
+            for start in range(0, file_articles_count, BLOCK_SIZE)
+        )
+        if file_name.endswith(".json"):
+            with JsonSink(file_path) as sink:
+                for block in blocks:
+                    sink.write_dataframe(block)
+        else:
+            pd.DataFrame(columns=["id", title_column, "date", "journal"]).to_csv(
+                file_path, index=False
+            )
+            for block in blocks:
+                block.to_csv(file_path, mode="a", header=False, index=False)
+
+        first_id += file_articles_count
+
+
+def _generate_drugs(rng: np.random.Generator, drugs_count: int) -> pd.DataFrame:
+    """
+    Generate the drugs table, starting with the drugs of the `data` folder.
+
+    Parameters
+    ----------
+    rng : np.random.Generator
+        The random generator.
+    drugs_count : int
+        The number of drugs.
+
+    Returns
+    -------
+    pd.DataFrame
+        The drugs, with their ATC code.
+    """
+
+    drugs = SAMPLE_DRUGS[:drugs_count]
+    while len(drugs) < drugs_count:
+        drug = (
+            "".join(rng.choice(SYLLABLES, size=rng.integers(2, 4)))
+            + rng.choice(SUFFIXES)
+        ).upper()
+        if drug not in drugs:
+            drugs.append(drug)
+
+    atccodes = [
+        f"{chr(65 + rng.integers(26))}{rng.integers(100):02d}{chr(65 + rng.integers(26))}"
+        f"{chr(65 + rng.integers(26))}"
+        for _ in drugs
+    ]
+
+    return pd.DataFrame({"atccode": atccodes, "drug": drugs})
+
+
+def _generate_articles(
+    rng: np.random.Generator,
+    first_id: int,
+    articles_count: int,
+    drugs: np.ndarray,
+    journals: np.ndarray,
+    title_column: str,
+) -> pd.DataFrame:
+    """
+    Generate a block of articles.
+
+    Parameters
+    ----------
+    rng : np.random.Generator
+        The random generator.
+    first_id : int
+        The id of the first article.
+    articles_count : int
+        The number of articles.
+    drugs : np.ndarray
+        The drugs names, quoted by some titles.
+    journals : np.ndarray
+        The journals names.
+    title_column : str
+        The name of the title column. Clinical trials, with a `scientific_title` column, get NCT ids.
+
+    Returns
+    -------
+    pd.DataFrame
+        The articles.
+    """
+
+    words = np.array(WORDS, dtype=object)[
+        rng.integers(len(WORDS), size=(articles_count, TITLE_WORDS_COUNT))
+    ]
+    words[:, 0] = np.char.capitalize(words[:, 0].astype(str))
+
+    quoting_articles = np.flatnonzero(rng.random(articles_count) < DRUG_QUOTE_RATE)
+    words[
+        quoting_articles,
+        rng.integers(1, TITLE_WORDS_COUNT, size=len(quoting_articles)),
+    ] = np.char.capitalize(
+        drugs[rng.integers(len(drugs), size=len(quoting_articles))].astype(str)
+    )
+
+    escaping_articles = np.flatnonzero(
+        rng.random(articles_count) < ESCAPE_SEQUENCE_RATE
+    )
+    words[escaping_articles, -1] = "\\xc3\\xb1"
+
+    days = pd.Timestamp("2015-01-01") + pd.to_timedelta(
+        rng.integers(6 * 365, size=articles_count), unit="D"
+    )
+    dates_formats = rng.integers(len(DATE_FORMATS), size=articles_count)
+    dates = np.empty(articles_count, dtype=object)
+    for index, date_format in enumerate(DATE_FORMATS):
+        is_format = dates_formats == index
+        dates[is_format] = days[is_format].strftime(date_format)
+
+    ids = np.arange(first_id, first_id + articles_count)
+    if title_column == "scientific_title":
+        ids = np.char.add("NCT", np.char.zfill(ids.astype(str), 8)).astype(object)
+
+    return pd.DataFrame(
+        {
+            "id": ids,
+            title_column: [" ".join(title_words) + "." for title_words in words],
+            "date": dates,
+            "journal": journals[rng.integers(len(journals), size=articles_count)],
+        }
+    )
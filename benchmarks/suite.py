@@ -0,0 +1,189 @@
+"""
+This file contains functions to time and memory-profile each stage of the ETL,
+and to compare the results with stored baselines.
+"""
+
+import contextlib
+import io
+import json
+import os
+import time
+import tracemalloc
+
+from etl.etl import ETL
+
+STAGES = ("extract", "transform", "graph", "load")
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+# stages faster than this are too noisy to be compared relatively
+MIN_SECONDS_DIFFERENCE = 0.05
+
+
+def run_stages(data_folder: str, output_path: str) -> dict[str, float]:
+    """
+    Run the ETL on a folder stage by stage, timing each stage.
+
+    Stages are `ETL._extract`, the constraints applied by `ETL._transform`,
+    `ETL._create_graph_oriented_dataframe` and `ETL._load`.
+    If tracemalloc is tracing, the peak memory of each stage is measured instead.
+
+    Parameters
+    ----------
+    data_folder : str
+        The path to the folder containing the files to be extracted.
+    output_path : str
+        The path to the output file.
+
+    Returns
+    -------
+    dict[str, float]
+        The seconds spent in each stage, or the peak bytes allocated by each stage when tracing.
+    """
+
+    etl = ETL(output_path=output_path)
+    stages = {
+        "extract": lambda _: etl._extract(data_folder, "append"),
+        "transform": etl._apply_constraints,
+        "graph": etl._create_graph_oriented_dataframe,
+        "load": etl._load,
+    }
+
+    measures = {}
+    data = None
+    # progress messages and bars would be mixed up with the results
+    with (
+        contextlib.redirect_stdout(io.StringIO()),
+        contextlib.redirect_stderr(io.StringIO()),
+    ):
+        for stage, function in stages.items():
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+                memory_before, _ = tracemalloc.get_traced_memory()
+                data = function(data)
+                measures[stage] = tracemalloc.get_traced_memory()[1] - memory_before
+            else:
+                start = time.perf_counter()
+                data = function(data)
+                measures[stage] = time.perf_counter() - start
+
+    return measures
+
+
+def benchmark(data_folder: str, output_path: str, repeat: int = 3) -> dict[str, dict]:
+    """
+    Benchmark each stage of the ETL on a folder.
+
+    Parameters
+    ----------
+    data_folder : str
+        The path to the folder containing the files to be extracted.
+    output_path : str
+        The path to the output file.
+    repeat : int
+        The number of timed runs. The fastest time of each stage is kept.
+        The peak memory is measured in an extra run, as tracing slows the ETL down.
+
+    Returns
+    -------
+    dict[str, dict]
+        The seconds and peak bytes of each stage.
+    """
+
+    timings = [run_stages(data_folder, output_path) for _ in range(repeat)]
+
+    tracemalloc.start()
+    try:
+        peak_memory = run_stages(data_folder, output_path)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        stage: {
+            "seconds": round(min(timing[stage] for timing in timings), 4),
+            "peak_bytes": peak_memory[stage],
+        }
+        for stage in STAGES
+    }
+
+
+def compare_with_baseline(
+    results: dict[str, dict], baseline: dict[str, dict], tolerance: float = 0.25
+) -> list[str]:
+    """
+    Compare benchmark results with a baseline.
+
+    Parameters
+    ----------
+    results : dict[str, dict]
+        The seconds and peak bytes of each stage.
+    baseline : dict[str, dict]
+        The seconds and peak bytes of each stage in the baseline.
+    tolerance : float
+        The relative increase allowed before a measure is a regression.
+
+    Returns
+    -------
+    list[str]
+        The regressions, empty if there is none.
+    """
+
+    regressions = []
+    for stage, measures in results.items():
+        if stage not in baseline:
+            continue
+
+        seconds = baseline[stage]["seconds"]
+        if measures["seconds"] > max(
+            seconds * (1 + tolerance), seconds + MIN_SECONDS_DIFFERENCE
+        ):
+            regressions.append(
+                f"{stage}: {measures['seconds']:.3f}s instead of {seconds:.3f}s"
+            )
+
+        peak_bytes = baseline[stage]["peak_bytes"]
+        if measures["peak_bytes"] > peak_bytes * (1 + tolerance):
+            regressions.append(
+                f"{stage}: {measures['peak_bytes']:,} bytes instead of {peak_bytes:,} bytes"
+            )
+
+    return regressions
+
+
+def load_baselines(baselines_path: str = BASELINES_PATH) -> dict[str, dict]:
+    """
+    Load the stored baselines, keyed by number of articles.
+
+    Parameters
+    ----------
+    baselines_path : str
+        The path to the baselines file.
+
+    Returns
+    -------
+    dict[str, dict]
+        The baselines, empty if the file does not exist.
+    """
+
+    try:
+        with open(baselines_path, "r", encoding="UTF-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(
+    baselines: dict[str, dict], baselines_path: str = BASELINES_PATH
+) -> None:
+    """
+    Save the baselines, keyed by number of articles.
+
+    Parameters
+    ----------
+    baselines : dict[str, dict]
+        The baselines.
+    baselines_path : str
+        The path to the baselines file.
+    """
+
+    with open(baselines_path, "w", encoding="UTF-8") as f:
+        json.dump(baselines, f, indent=4, sort_keys=True)
+        f.write("\n")
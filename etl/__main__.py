@@ -0,0 +1,10 @@
+"""
+This file contains the entry point of `python -m etl`.
+"""
+
+import sys
+
+from etl.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
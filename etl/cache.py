@@ -0,0 +1,344 @@
+"""
+This file contains the InputCache class, used to skip parsing the input files which did not change since a previous run.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from etl.manifest import hash_file
+from etl.readers import read_file
+
+# bumped when the parsed tables or their storage change, so older entries are not read
+CACHE_VERSION = 1
+CACHE_MAX_BYTES = 1 << 30
+CACHE_EXTENSION = ".arrow"
+# JSON nulls are None while missing keys and empty cells are NaN, and types turn them into different texts
+NONE_MASK_PREFIX = "__none__"
+
+
+class InputCache:
+    def __init__(self, cache_folder: str, max_bytes: int = CACHE_MAX_BYTES):
+        """
+        On-disk cache of parsed input files, as uncompressed Arrow IPC (Feather) files.
+
+        Entries are keyed by the hash of the file content, the columns read and the cache version,
+        so an edited file or a new column selection is parsed again. Hits are memory-mapped:
+        numeric columns are not copied, and text columns are decoded without parsing CSV or JSON again.
+        The least recently used entries are evicted once the cache is larger than `max_bytes`.
+
+        Parameters
+        ----------
+        cache_folder : str
+            The folder of the cache entries, created if needed.
+        max_bytes : int
+            The maximum size of the cache, in bytes.
+        """
+
+        _check_pyarrow_is_installed()
+
+        self.cache_folder = cache_folder
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_folder, exist_ok=True)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The size of the cache entries, in bytes.
+        """
+
+        return sum(size for _, _, size in self._list_entries())
+
+    def read(
+        self, file_path: str, columns: tuple[str, ...] | None = None
+    ) -> pd.DataFrame:
+        """
+        Read a file from the cache, or parse it and add it to the cache.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the CSV, JSON array or JSON Lines file.
+        columns : tuple[str, ...] | None
+            The columns to keep. All columns are kept if None.
+
+        Returns
+        -------
+        pd.DataFrame
+            The content of the file, as returned by `read_file`.
+        """
+
+        entry_path = self._get_entry_path(file_path, columns)
+
+        try:
+            data = _read_entry(entry_path)
+        except FileNotFoundError:
+            pass
+        else:
+            self.hits += 1
+            # entries are evicted by modification time, so a hit makes an entry the most recently used
+            os.utime(entry_path)
+            return data
+
+        self.misses += 1
+        data = read_file(file_path, columns)
+        self._write_entry(entry_path, data)
+
+        return data
+
+    def invalidate(self, file_path: str | None = None) -> None:
+        """
+        Remove the entries of a file, whatever the columns read, or all entries.
+
+        Parameters
+        ----------
+        file_path : str | None
+            The path to the file, whose current content is invalidated. All entries are removed if None.
+        """
+
+        prefix = "" if file_path is None else hash_file(file_path)
+        for entry_path, _, _ in self._list_entries():
+            if os.path.basename(entry_path).startswith(prefix):
+                _remove(entry_path)
+
+    def _get_entry_path(self, file_path: str, columns: tuple[str, ...] | None) -> str:
+        """
+        Get the path of the entry of a file.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the file.
+        columns : tuple[str, ...] | None
+            The columns read.
+
+        Returns
+        -------
+        str
+            The entry path, named after the content hash then the hash of the reading options.
+        """
+
+        options = json.dumps(
+            {
+                "version": CACHE_VERSION,
+                "extension": os.path.splitext(file_path)[1],
+                "columns": None if columns is None else list(columns),
+            }
+        )
+        options_hash = hashlib.sha256(options.encode()).hexdigest()[:16]
+
+        return os.path.join(
+            self.cache_folder, f"{hash_file(file_path)}-{options_hash}{CACHE_EXTENSION}"
+        )
+
+    def _write_entry(self, entry_path: str, data: pd.DataFrame) -> None:
+        """
+        Write an entry atomically, then evict the least recently used entries past the maximum size.
+
+        Parameters
+        ----------
+        entry_path : str
+            The path to the entry.
+        data : pd.DataFrame
+            The parsed file.
+        """
+
+        import pyarrow as pa
+
+        table = _to_arrow(data)
+        if table.nbytes > self.max_bytes:
+            return
+
+        temporary_path = f"{entry_path}.{os.getpid()}.tmp"
+        with (
+            pa.OSFile(temporary_path, "wb") as sink,
+            pa.ipc.new_file(sink, table.schema) as writer,
+        ):
+            writer.write_table(table)
+        os.replace(temporary_path, entry_path)
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache fits in its maximum size.
+        """
+
+        entries = sorted(self._list_entries(), key=lambda entry: entry[1])
+        size = sum(entry_size for _, _, entry_size in entries)
+        for entry_path, _, entry_size in entries:
+            if size <= self.max_bytes:
+                break
+            _remove(entry_path)
+            size -= entry_size
+
+    def _list_entries(self) -> list[tuple[str, float, int]]:
+        """
+        List the entries of the cache.
+
+        Returns
+        -------
+        list[tuple[str, float, int]]
+            The path, the modification time and the size of each entry.
+        """
+
+        entries = []
+        with os.scandir(self.cache_folder) as scanned:
+            for entry in scanned:
+                if not entry.name.endswith(CACHE_EXTENSION):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # evicted by another process in the meantime
+                    continue
+                entries.append((entry.path, stat.st_mtime, stat.st_size))
+
+        return entries
+
+
+def read_input_file(
+    file_path: str,
+    columns: tuple[str, ...] | None = None,
+    cache_folder: str | None = None,
+    max_bytes: int = CACHE_MAX_BYTES,
+) -> pd.DataFrame:
+    """
+    Read a file, from the input cache of a folder if given.
+    Only takes plain arguments, so it can be sent to worker processes.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the CSV, JSON array or JSON Lines file.
+    columns : tuple[str, ...] | None
+        The columns to keep. All columns are kept if None.
+    cache_folder : str | None
+        The folder of the cache entries. The file is parsed without cache if None.
+    max_bytes : int
+        The maximum size of the cache, in bytes.
+
+    Returns
+    -------
+    pd.DataFrame
+        The content of the file, as returned by `read_file`.
+    """
+
+    if cache_folder is None:
+        return read_file(file_path, columns)
+
+    return InputCache(cache_folder, max_bytes).read(file_path, columns)
+
+
+def _to_arrow(data: pd.DataFrame):
+    """
+    Convert a parsed file to an Arrow table.
+    Values of text columns are stored as the texts the transformations turn them into,
+    and the positions of None values are stored in a mask column, to restore them when read.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The parsed file.
+
+    Returns
+    -------
+    pa.Table
+        The table.
+    """
+
+    import pyarrow as pa
+
+    arrays = {}
+    for column in data.columns:
+        values = data[column]
+        if values.dtype != object:
+            arrays[column] = pa.Array.from_pandas(values)
+            continue
+
+        missing = values.isna().to_numpy()
+        arrays[column] = pa.array(
+            [
+                None if is_missing else str(value)
+                for value, is_missing in zip(values, missing)
+            ],
+            type=pa.large_string(),
+        )
+        nones = np.fromiter(
+            (value is None for value in values), dtype=bool, count=len(values)
+        )
+        if nones.any():
+            arrays[NONE_MASK_PREFIX + column] = pa.array(nones)
+
+    return pa.table(arrays)
+
+
+def _read_entry(entry_path: str) -> pd.DataFrame:
+    """
+    Read a parsed file from a memory-mapped entry.
+
+    Parameters
+    ----------
+    entry_path : str
+        The path to the entry.
+
+    Returns
+    -------
+    pd.DataFrame
+        The parsed file.
+    """
+
+    import pyarrow as pa
+
+    # the table keeps the memory map open for as long as its buffers are used
+    table = pa.ipc.open_file(pa.memory_map(entry_path)).read_all()
+
+    masks = {
+        name.removeprefix(NONE_MASK_PREFIX): table.column(name).to_numpy()
+        for name in table.column_names
+        if name.startswith(NONE_MASK_PREFIX)
+    }
+    table = table.select(
+        [name for name in table.column_names if not name.startswith(NONE_MASK_PREFIX)]
+    )
+
+    data = table.to_pandas()
+    for name, field in zip(table.column_names, table.schema):
+        if pa.types.is_large_string(field.type):
+            values = data[name].to_numpy()
+            values[pd.isna(values)] = np.nan
+            if name in masks:
+                values[masks[name]] = None
+            data[name] = values
+
+    return data
+
+
+def _remove(entry_path: str) -> None:
+    """
+    Remove an entry, which may have been removed by another process in the meantime.
+    """
+
+    try:
+        os.remove(entry_path)
+    except FileNotFoundError:
+        pass
+
+
+def _check_pyarrow_is_installed() -> None:
+    """
+    Raise an explicit error if pyarrow, needed by the cache entries, is not installed.
+    """
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as error:
+        raise ImportError(
+            "pyarrow is required by the input cache. Install it with `pip install pyarrow`."
+        ) from error
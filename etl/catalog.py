@@ -0,0 +1,248 @@
+"""
+This file contains the Catalog class, used to look up articles and drugs by name or by surrogate key in constant time.
+"""
+
+import numpy as np
+import pandas as pd
+
+from etl.keys import SURROGATE_KEY_COLUMN
+
+ARTICLES_TITLE_COLUMNS = {"pubmed": "title", "clinical_trials": "scientific_title"}
+DRUGS_NAME_COLUMN = "drug"
+
+
+class Catalog:
+    def __init__(self, data: dict[str, pd.DataFrame]):
+        """
+        Hash indexes over the extracted tables, built once per run.
+
+        Each index maps a title, scientific title, drug name or surrogate key
+        to the position of the first row holding it.
+        Indexes are built lazily, the first time a table is looked up.
+
+        Parameters
+        ----------
+        data : dict[str, pd.DataFrame]
+            The dictionary containing the data.
+        """
+
+        self.data = data
+        self._indexes: dict[tuple[str, str], dict] = {}
+        self._records: dict[tuple[str, int], dict] = {}
+
+    def get_article_journal(self, article_name: str) -> str:
+        """
+        Get the journal of an article from its name.
+        PubMed articles are looked up before clinical trials.
+
+        Parameters
+        ----------
+        article_name : str
+            The article name.
+
+        Returns
+        -------
+        str
+            The journal name.
+        """
+
+        return self._get_article_value(
+            article_name, "journal", ("pubmed", "clinical_trials")
+        )
+
+    def get_article_date(self, article_name: str) -> str:
+        """
+        Get the date of an article from its name.
+        PubMed articles are looked up before clinical trials.
+
+        Parameters
+        ----------
+        article_name : str
+            The article name.
+
+        Returns
+        -------
+        str
+            The date of the article.
+        """
+
+        return self._get_article_value(
+            article_name, "date", ("pubmed", "clinical_trials")
+        )
+
+    def get_article_info(self, article_name: str) -> dict[str, str]:
+        """
+        Get the article info from its name.
+        Clinical trials are looked up before PubMed articles.
+
+        Parameters
+        ----------
+        article_name : str
+            The article name.
+
+        Returns
+        -------
+        dict[str, str]
+            The article info.
+        """
+
+        for table_name in ("clinical_trials", "pubmed"):
+            position = self._lookup(table_name, article_name)
+            if position is not None:
+                return self._get_record(table_name, position)
+
+        raise IndexError(f"Article {article_name!r} not found.")
+
+    def get_drug_info(self, drug: str) -> dict[str, str]:
+        """
+        Get the drug info from its name.
+
+        Parameters
+        ----------
+        drug : str
+            The drug name.
+
+        Returns
+        -------
+        dict[str, str]
+            The drug info.
+        """
+
+        position = self._lookup("drugs", drug)
+        if position is None:
+            raise IndexError(f"Drug {drug!r} not found.")
+
+        return self._get_record("drugs", position)
+
+    def get_record(self, table_name: str, key: int) -> dict[str, str]:
+        """
+        Get a drug or article info from its surrogate key.
+
+        Parameters
+        ----------
+        table_name : str
+            The table name.
+        key : int
+            The surrogate key.
+
+        Returns
+        -------
+        dict[str, str]
+            The drug or article info.
+        """
+
+        position = self._lookup(table_name, key, SURROGATE_KEY_COLUMN)
+        if position is None:
+            raise IndexError(f"Key {key} not found in {table_name}.")
+
+        return self._get_record(table_name, position)
+
+    def _get_article_value(
+        self, article_name: str, column: str, tables_names: tuple[str, ...]
+    ) -> str:
+        """
+        Get a column value of the first article matching a name in the given tables.
+
+        Parameters
+        ----------
+        article_name : str
+            The article name.
+        column : str
+            The column to read.
+        tables_names : tuple[str, ...]
+            The tables to look up, in order.
+
+        Returns
+        -------
+        str
+            The column value.
+        """
+
+        for table_name in tables_names:
+            position = self._lookup(table_name, article_name)
+            if position is not None:
+                return self.data[table_name][column].values[position]
+
+        raise IndexError(f"Article {article_name!r} not found.")
+
+    def _lookup(
+        self, table_name: str, name: str | int, column: str | None = None
+    ) -> int | None:
+        """
+        Get the position of the first row of a table holding a name.
+
+        Parameters
+        ----------
+        table_name : str
+            The table name.
+        name : str | int
+            The title, scientific title, drug name or surrogate key.
+        column : str | None
+            The column holding the name. Defaults to the title or drug name column of the table.
+
+        Returns
+        -------
+        int | None
+            The row position, or None if the name or the table is missing.
+        """
+
+        if table_name not in self.data:
+            return None
+        if column is None:
+            column = ARTICLES_TITLE_COLUMNS.get(table_name, DRUGS_NAME_COLUMN)
+        if (table_name, column) not in self._indexes:
+            self._indexes[table_name, column] = self._build_index(table_name, column)
+
+        return self._indexes[table_name, column].get(name)
+
+    def _build_index(self, table_name: str, column: str) -> dict:
+        """
+        Build the hash index of a column of a table.
+
+        Parameters
+        ----------
+        table_name : str
+            The table name.
+        column : str
+            The indexed column.
+
+        Returns
+        -------
+        dict
+            The value to first row position index.
+        """
+
+        names = self.data[table_name][column]
+        first_occurrences = ~names.duplicated(keep="first").to_numpy()
+
+        return dict(
+            zip(
+                names.to_numpy()[first_occurrences].tolist(),
+                np.flatnonzero(first_occurrences).tolist(),
+            )
+        )
+
+    def _get_record(self, table_name: str, position: int) -> dict[str, str]:
+        """
+        Get a row of a table as a dictionary, caching it since articles and drugs are referenced many times.
+
+        Parameters
+        ----------
+        table_name : str
+            The table name.
+        position : int
+            The row position.
+
+        Returns
+        -------
+        dict[str, str]
+            The row as a dictionary.
+        """
+
+        key = (table_name, position)
+        if key not in self._records:
+            self._records[key] = (
+                self.data[table_name].iloc[[position]].to_dict("records")[0]
+            )
+
+        return dict(self._records[key])
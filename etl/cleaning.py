@@ -0,0 +1,203 @@
+"""
+This file contains the TextCleaner class, used to clean the text columns of the extracted data.
+"""
+
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+from etl.util import apply_to_categories
+
+TEXT_CLEANING_STEPS = ("escapes", "control_characters", "whitespace", "unicode")
+
+ESCAPES_PATTERN = r"(?:\\x[0-9a-fA-F]{2})+"
+CONTROL_CHARACTERS_PATTERN = r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f�]"
+WHITESPACE_PATTERN = r"\s+"
+# every text changed by a step matches: an escape sequence, a double or outer space, or a character
+# outside printable ASCII, covering control characters, other whitespace, replacement and non-NFC characters
+DIRTY_TEXT_PATTERN = r"\\x|  |^ | $|[^ -~]"
+# the inferred types of the values searched by the `.str` accessor
+TEXT_INFERRED_TYPES = ("string", "empty", "mixed", "mixed-integer")
+
+
+class TextCleaner:
+    def __init__(
+        self,
+        steps_per_column: dict[str, tuple[str, ...]] | None = None,
+        default_steps: tuple[str, ...] = TEXT_CLEANING_STEPS,
+    ):
+        """
+        Text cleaner applying vectorized string operations to whole columns.
+
+        Available steps, applied in this order:
+        - escapes: decode runs of literal escape sequences such as `\\xc3\\xb1` as UTF-8,
+          and drop the runs which are not valid UTF-8
+        - control_characters: drop control characters and replacement characters
+        - whitespace: collapse whitespace runs to a single space and strip both ends
+        - unicode: normalize to the NFC form
+
+        Parameters
+        ----------
+        steps_per_column : dict[str, tuple[str, ...]] | None
+            The steps applied to each column. An empty tuple leaves a column untouched.
+        default_steps : tuple[str, ...]
+            The steps applied to the text columns not in `steps_per_column`.
+        """
+
+        self.steps_per_column = steps_per_column or {}
+        self.default_steps = default_steps
+
+        for steps in (default_steps, *self.steps_per_column.values()):
+            unknown_steps = set(steps) - set(TEXT_CLEANING_STEPS)
+            if unknown_steps:
+                raise ValueError(
+                    f"Text cleaning steps {sorted(unknown_steps)} are not supported. "
+                    f"Use some of {TEXT_CLEANING_STEPS}."
+                )
+
+    def clean(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Clean the text columns of a DataFrame.
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            The data.
+
+        Returns
+        -------
+        pd.DataFrame
+            The data with cleaned text columns.
+        """
+
+        for column in data.columns:
+            if pd.api.types.is_string_dtype(data[column]) or isinstance(
+                data[column].dtype, pd.CategoricalDtype
+            ):
+                data[column] = self.clean_column(
+                    data[column],
+                    self.steps_per_column.get(column, self.default_steps),
+                )
+
+        return data
+
+    def clean_column(self, texts: pd.Series, steps: tuple[str, ...]) -> pd.Series:
+        """
+        Clean a text column.
+
+        Parameters
+        ----------
+        texts : pd.Series
+            The texts. Only the categories of categorical texts are cleaned.
+        steps : tuple[str, ...]
+            The cleaning steps.
+
+        Returns
+        -------
+        pd.Series
+            The cleaned texts.
+        """
+
+        if isinstance(texts.dtype, pd.CategoricalDtype):
+            return apply_to_categories(
+                texts, lambda categories: self.clean_column(categories, steps)
+            )
+
+        # clean texts are the vast majority: they are found in a single pass over the column,
+        # and only the others go through the slower regular expression replacements
+        is_dirty = _find_dirty_texts(texts)
+        if not is_dirty.any():
+            return texts
+
+        texts = texts.copy()
+        texts[is_dirty] = self._clean_dirty_texts(texts[is_dirty], steps)
+
+        return texts
+
+    def _clean_dirty_texts(self, texts: pd.Series, steps: tuple[str, ...]) -> pd.Series:
+        """
+        Apply the cleaning steps to texts.
+
+        Parameters
+        ----------
+        texts : pd.Series
+            The texts to clean.
+        steps : tuple[str, ...]
+            The cleaning steps.
+
+        Returns
+        -------
+        pd.Series
+            The cleaned texts.
+        """
+
+        # the few dirty texts are cleaned as Python strings, as Arrow strings do not support all the replacements
+        texts = texts.astype(object)
+
+        if "escapes" in steps:
+            texts = texts.str.replace(
+                ESCAPES_PATTERN, _decode_escapes_match, regex=True
+            )
+        if "control_characters" in steps:
+            texts = texts.str.replace(CONTROL_CHARACTERS_PATTERN, "", regex=True)
+        if "whitespace" in steps:
+            texts = texts.str.replace(WHITESPACE_PATTERN, " ", regex=True).str.strip()
+        if "unicode" in steps:
+            texts = texts.str.normalize("NFC")
+
+        return texts
+
+
+def _find_dirty_texts(texts: pd.Series) -> pd.Series:
+    """
+    Find the texts which may be changed by a cleaning step, in a single vectorized search.
+    Texts holding only printable ASCII characters, without escape sequence
+    nor whitespace other than single inner spaces, are left unchanged by every step.
+
+    Parameters
+    ----------
+    texts : pd.Series
+        The texts.
+
+    Returns
+    -------
+    pd.Series
+        True for the texts to clean.
+    """
+
+    # categories of a categorical column may be numbers, which are left untouched
+    if pd.api.types.infer_dtype(texts, skipna=True) not in TEXT_INFERRED_TYPES:
+        return pd.Series(False, index=texts.index)
+
+    return texts.str.contains(DIRTY_TEXT_PATTERN, regex=True, na=False).astype(bool)
+
+
+def _decode_escapes_match(match: re.Match) -> str:
+    """
+    Decode a run of literal escape sequences matched in a text.
+    """
+
+    return _decode_escapes(match.group(0))
+
+
+@lru_cache(maxsize=4096)
+def _decode_escapes(escapes: str) -> str:
+    """
+    Decode a run of literal escape sequences as UTF-8, or drop it if it is not valid UTF-8.
+
+    Parameters
+    ----------
+    escapes : str
+        The escape sequences, such as `\\xc3\\xb1`.
+
+    Returns
+    -------
+    str
+        The decoded text, or an empty string.
+    """
+
+    try:
+        return bytes.fromhex(escapes.replace("\\x", "")).decode("UTF-8")
+    except UnicodeDecodeError:
+        return ""
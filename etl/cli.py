@@ -0,0 +1,187 @@
+"""
+This file contains the command line of the ETL.
+Run it with: `python -m etl run --data-folder data --if-exists n --output data.json --workers 4`
+
+Only the standard library is imported at startup: each subcommand imports the modules it needs,
+so `--help` and light subcommands start fast.
+"""
+
+import argparse
+import os
+import sys
+
+# the output formats and engines of the ETL, listed here so the command line does not import it
+OUTPUT_FORMATS = ("json", "jsonl", "parquet", "feather", "sqlite")
+ENGINES = ("pandas", "duckdb")
+
+
+def main(arguments: list[str] | None = None) -> int:
+    """
+    Run the subcommand given on the command line.
+
+    Parameters
+    ----------
+    arguments : list[str] | None
+        The command line arguments. Defaults to `sys.argv`.
+
+    Returns
+    -------
+    int
+        The exit code: 0 if the subcommand succeeded, 1 otherwise.
+    """
+
+    arguments = parse_arguments(arguments)
+
+    return arguments.command(arguments)
+
+
+def parse_arguments(arguments: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Parameters
+    ----------
+    arguments : list[str] | None
+        The command line arguments. Defaults to `sys.argv`.
+
+    Returns
+    -------
+    argparse.Namespace
+        The arguments, with the function of the subcommand as `command`.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m etl",
+        description="Extract drugs, PubMed articles and clinical trials, and load their graph.",
+    )
+    subparsers = parser.add_subparsers(required=True, metavar="command")
+
+    run_parser = subparsers.add_parser("run", help="Run the ETL.")
+    run_parser.add_argument(
+        "--data-folder",
+        default="data",
+        help="The folder containing the files to be extracted.",
+    )
+    run_parser.add_argument(
+        "--if-exists",
+        choices=("y", "n"),
+        default="n",
+        help='"y" to keep the last file of each name, or "n" to append them.',
+    )
+    run_parser.add_argument(
+        "--output", default="data.json", help="The path to the output file or folder."
+    )
+    run_parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="The output format.",
+    )
+    run_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="The number of processes parsing files and matching articles.",
+    )
+    run_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Stream articles by chunks of this number of rows.",
+    )
+    run_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process the files added or changed since the previous run.",
+    )
+    run_parser.add_argument(
+        "--engine", choices=ENGINES, default="pandas", help="The engine."
+    )
+    run_parser.set_defaults(command=run)
+
+    journals_parser = subparsers.add_parser(
+        "journals",
+        help="Rank the journals of a previous run by number of distinct drugs.",
+    )
+    journals_parser.add_argument(
+        "--output",
+        default="data.json",
+        help="The output of the run, read through its query index, or the SQLite database.",
+    )
+    journals_parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="The output format of the run.",
+    )
+    journals_parser.add_argument(
+        "--limit", type=int, default=1, help="The number of journals to print."
+    )
+    journals_parser.set_defaults(command=rank_journals)
+
+    return parser.parse_args(arguments)
+
+
+def run(arguments: argparse.Namespace) -> int:
+    """
+    Run the ETL.
+
+    Parameters
+    ----------
+    arguments : argparse.Namespace
+        The arguments of the `run` subcommand.
+
+    Returns
+    -------
+    int
+        The exit code.
+    """
+
+    from etl.etl import ETL
+
+    etl = ETL(
+        chunk_size=arguments.chunk_size,
+        workers=arguments.workers,
+        incremental=arguments.incremental,
+        output_path=arguments.output,
+        output_format=arguments.format,
+    )
+    if not etl.run(arguments.data_folder, arguments.if_exists, arguments.engine):
+        return 1
+
+    print("ETL completed successfully.")
+
+    return 0
+
+
+def rank_journals(arguments: argparse.Namespace) -> int:
+    """
+    Print the journals quoting the most distinct drugs, from the query index or the SQLite database of a run.
+
+    Parameters
+    ----------
+    arguments : argparse.Namespace
+        The arguments of the `journals` subcommand.
+
+    Returns
+    -------
+    int
+        The exit code.
+    """
+
+    if arguments.format == "sqlite":
+        from etl.database import rank_journals as rank_database_journals
+
+        ranking = rank_database_journals(arguments.output, arguments.limit)
+    else:
+        from etl.index import QueryIndex, get_index_path
+
+        index_path = get_index_path(arguments.output)
+        if not os.path.exists(index_path):
+            print(f"No query index found at {index_path}.", file=sys.stderr)
+            return 1
+        ranking = QueryIndex.load(index_path).rank_journals()[: arguments.limit]
+
+    for journal, nb_of_drugs in ranking:
+        print(f'The journal "{journal}" quotes {nb_of_drugs} different drugs.')
+
+    return 0
@@ -0,0 +1,294 @@
+"""
+This file contains the functions loading the graph to a SQLite database, reading it back and querying it.
+"""
+
+import json
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+
+from etl.catalog import ARTICLES_TITLE_COLUMNS, DRUGS_NAME_COLUMN
+from etl.keys import SURROGATE_KEYS, get_article_key_columns, get_records_keys
+from etl.sinks import _to_json_serializable
+
+DATABASE_FORMAT = "sqlite"
+
+# drugs and articles are keyed by their surrogate keys, hashed from their business columns,
+# so loading the same edges again, from this run or a later one, updates them in place
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS drugs (
+        drug_key INTEGER PRIMARY KEY,
+        atccode TEXT NOT NULL,
+        drug TEXT NOT NULL,
+        info TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS articles (
+        article_key INTEGER PRIMARY KEY,
+        id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        info TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS journals (
+        journal_key INTEGER PRIMARY KEY,
+        journal TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS edges (
+        edge_key INTEGER PRIMARY KEY,
+        drug_key INTEGER NOT NULL REFERENCES drugs,
+        article_key INTEGER NOT NULL REFERENCES articles,
+        journal_key INTEGER NOT NULL REFERENCES journals,
+        relationship TEXT NOT NULL,
+        date TEXT,
+        UNIQUE (drug_key, article_key, relationship)
+    )
+    """,
+)
+
+# created once the edges are loaded, cheaper than updating them row by row
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS edges_drug ON edges (drug_key)",
+    "CREATE INDEX IF NOT EXISTS edges_journal_drug ON edges (journal_key, drug_key)",
+    "CREATE INDEX IF NOT EXISTS edges_date ON edges (date)",
+)
+
+UPSERT_DRUG = """
+    INSERT INTO drugs (drug_key, atccode, drug, info) VALUES (?, ?, ?, ?)
+    ON CONFLICT (drug_key) DO UPDATE
+    SET atccode = excluded.atccode, drug = excluded.drug, info = excluded.info
+"""
+UPSERT_ARTICLE = """
+    INSERT INTO articles (article_key, id, title, info) VALUES (?, ?, ?, ?)
+    ON CONFLICT (article_key) DO UPDATE
+    SET id = excluded.id, title = excluded.title, info = excluded.info
+"""
+UPSERT_JOURNAL = "INSERT INTO journals (journal) VALUES (?) ON CONFLICT DO NOTHING"
+UPSERT_EDGE = """
+    INSERT INTO edges (drug_key, article_key, journal_key, relationship, date)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (drug_key, article_key, relationship)
+    DO UPDATE SET journal_key = excluded.journal_key, date = excluded.date
+"""
+
+
+def write_database(
+    data: pd.DataFrame, database_path: str, if_exists: str = "replace"
+) -> None:
+    """
+    Load the graph-oriented DataFrame to a SQLite database, in a single transaction.
+
+    Drugs, articles and journals are stored once, and edges reference them by integer key:
+    the surrogate keys of drugs and articles, computed from their business columns if the records do not hold them.
+    Rows are bulk inserted with prepared statements, and the database uses write-ahead logging,
+    so readers are not blocked while it is loaded.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The graph-oriented DataFrame, with one nested drug and article record per edge.
+    database_path : str
+        The path to the database file.
+    if_exists : str
+        "replace" to drop the previous graph, or "append" to upsert the edges into it:
+        edges already loaded are updated instead of being duplicated.
+    """
+
+    if data.empty:
+        data = pd.DataFrame(
+            columns=["drug", "article", "journal", "relationship", "date"]
+        )
+    drugs = data["drug"].tolist()
+    articles = data["article"].tolist()
+    drugs_keys = get_records_keys(drugs, lambda drug: SURROGATE_KEYS["drugs"])
+    articles_keys = get_records_keys(articles, get_article_key_columns)
+
+    connection = sqlite3.connect(database_path, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if if_exists == "replace":
+                for table_name in ("edges", "drugs", "articles", "journals"):
+                    connection.execute(f"DROP TABLE IF EXISTS {table_name}")
+            for statement in SCHEMA:
+                connection.execute(statement)
+
+            # later records of a node win, as they would row after row
+            connection.executemany(
+                UPSERT_DRUG,
+                (
+                    (
+                        drug_key,
+                        drug.get("atccode", ""),
+                        drug[DRUGS_NAME_COLUMN],
+                        _dumps(drug),
+                    )
+                    for drug_key, drug in dict(zip(drugs_keys, drugs)).items()
+                ),
+            )
+            connection.executemany(
+                UPSERT_ARTICLE,
+                (
+                    (
+                        article_key,
+                        article.get("id", ""),
+                        _get_title(article),
+                        _dumps(article),
+                    )
+                    for article_key, article in dict(
+                        zip(articles_keys, articles)
+                    ).items()
+                ),
+            )
+            journals = data["journal"].tolist()
+            connection.executemany(
+                UPSERT_JOURNAL, ((journal,) for journal in dict.fromkeys(journals))
+            )
+            journals_keys = dict(
+                connection.execute("SELECT journal, journal_key FROM journals")
+            )
+
+            connection.executemany(
+                UPSERT_EDGE,
+                (
+                    (
+                        drug_key,
+                        article_key,
+                        journals_keys[journal],
+                        str(relationship),
+                        None if pd.isna(date) else date,
+                    )
+                    for drug_key, article_key, journal, relationship, date in zip(
+                        drugs_keys,
+                        articles_keys,
+                        journals,
+                        data["relationship"].tolist(),
+                        data["date"].tolist(),
+                    )
+                ),
+            )
+
+            for statement in INDEXES:
+                connection.execute(statement)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+    finally:
+        connection.close()
+
+
+def read_database(database_path: str) -> pd.DataFrame:
+    """
+    Read the graph-oriented DataFrame back from a SQLite database, in the order the edges were loaded.
+
+    Parameters
+    ----------
+    database_path : str
+        The path to the database file.
+
+    Returns
+    -------
+    pd.DataFrame
+        The graph-oriented DataFrame, with one nested drug and article record per edge.
+    """
+
+    with _connect(database_path) as connection:
+        rows = connection.execute(
+            """
+            SELECT drugs.info, articles.info, journals.journal, edges.relationship, edges.date
+            FROM edges
+            JOIN drugs USING (drug_key)
+            JOIN articles USING (article_key)
+            JOIN journals USING (journal_key)
+            ORDER BY edges.edge_key
+            """
+        ).fetchall()
+
+    if not rows:
+        return pd.DataFrame()
+
+    drugs, articles, journals, relationships, dates = zip(*rows)
+
+    return pd.DataFrame(
+        {
+            "drug": [json.loads(drug) for drug in drugs],
+            "article": [json.loads(article) for article in articles],
+            "journal": journals,
+            "relationship": relationships,
+            "date": dates,
+        }
+    )
+
+
+def rank_journals(
+    database_path: str, limit: int | None = None
+) -> list[tuple[str, int]]:
+    """
+    Rank the journals by number of distinct drugs referenced.
+    Ties keep the order of the edges. The query only reads the (journal, drug) index of the edges.
+
+    Parameters
+    ----------
+    database_path : str
+        The path to the database file.
+    limit : int | None
+        The number of journals to return. All journals are returned if None.
+
+    Returns
+    -------
+    list[tuple[str, int]]
+        The journals names and their number of distinct drugs, from the most to the least.
+    """
+
+    with _connect(database_path) as connection:
+        return connection.execute(
+            """
+            SELECT journals.journal, ranking.drugs
+            FROM (
+                SELECT journal_key, count(DISTINCT drug_key) AS drugs, min(edge_key) AS first_edge
+                FROM edges
+                GROUP BY journal_key
+            ) AS ranking
+            JOIN journals USING (journal_key)
+            ORDER BY ranking.drugs DESC, ranking.first_edge
+            LIMIT ?
+            """,
+            (-1 if limit is None else limit,),
+        ).fetchall()
+
+
+def _connect(database_path: str) -> closing[sqlite3.Connection]:
+    """
+    Open an existing database in read-only mode, closed when used as a context manager.
+    """
+
+    return closing(sqlite3.connect(f"file:{database_path}?mode=ro", uri=True))
+
+
+def _get_title(article: dict) -> str:
+    """
+    Get the title of an article, whatever its source.
+    """
+
+    for title_column in ARTICLES_TITLE_COLUMNS.values():
+        if title_column in article:
+            return article[title_column]
+
+    return ""
+
+
+def _dumps(record: dict) -> str:
+    """
+    Serialize a node record, keeping the order of its keys.
+    """
+
+    return json.dumps(record, ensure_ascii=False, default=_to_json_serializable)
@@ -0,0 +1,122 @@
+"""
+This file contains the DateNormalizer class, used to normalize the dates of the articles to a single text format.
+"""
+
+import pandas as pd
+
+from etl.util import apply_to_categories
+
+DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d %B %Y", "%d-%m-%Y")
+NORMALIZED_DATE_FORMAT = "%d-%m-%Y"
+
+
+class DateNormalizer:
+    def __init__(
+        self,
+        formats: tuple[str, ...] = DATE_FORMATS,
+        output_format: str = NORMALIZED_DATE_FORMAT,
+    ):
+        """
+        Date normalizer parsing each distinct date text once.
+
+        Distinct texts are parsed with each known format in turn, then with day-first mixed format inference
+        for the leftovers. Normalized texts are cached, so a date repeated across rows, chunks or files
+        is only parsed the first time it is seen.
+
+        Parameters
+        ----------
+        formats : tuple[str, ...]
+            The known date formats, tried in order.
+        output_format : str
+            The format of the normalized dates.
+        """
+
+        self.formats = formats
+        self.output_format = output_format
+        self.unparseable_dates: set[str] = set()
+
+        self._cache: dict[str, str] = {}
+
+    def normalize(self, dates: pd.Series) -> pd.Series:
+        """
+        Normalize dates to the output format.
+        Unparseable dates are kept as is and added to `unparseable_dates`.
+
+        Parameters
+        ----------
+        dates : pd.Series
+            The dates, as text. Only the categories of categorical dates are normalized.
+
+        Returns
+        -------
+        pd.Series
+            The normalized dates.
+        """
+
+        if isinstance(dates.dtype, pd.CategoricalDtype):
+            return apply_to_categories(dates, self.normalize)
+
+        is_missing = dates.isna()
+        texts = dates.astype(str)
+        self._parse(
+            [text for text in texts[~is_missing].unique() if text not in self._cache]
+        )
+
+        return dates.mask(~is_missing, texts.map(self._cache))
+
+    def _parse(self, texts: list[str]) -> None:
+        """
+        Parse date texts and cache their normalized text.
+
+        Parameters
+        ----------
+        texts : list[str]
+            The distinct date texts not cached yet.
+        """
+
+        leftovers = pd.Series(texts, dtype=object)
+
+        for date_format in self.formats:
+            if leftovers.empty:
+                return
+            parsed_dates = pd.to_datetime(
+                leftovers, format=date_format, errors="coerce"
+            )
+            leftovers = self._cache_parsed_dates(leftovers, parsed_dates)
+
+        if leftovers.empty:
+            return
+        parsed_dates = pd.to_datetime(
+            leftovers, dayfirst=True, format="mixed", errors="coerce"
+        )
+        leftovers = self._cache_parsed_dates(leftovers, parsed_dates)
+
+        for text in leftovers:
+            self._cache[text] = text
+            self.unparseable_dates.add(text)
+
+    def _cache_parsed_dates(
+        self, texts: pd.Series, parsed_dates: pd.Series
+    ) -> pd.Series:
+        """
+        Cache the normalized text of the parsed dates.
+
+        Parameters
+        ----------
+        texts : pd.Series
+            The date texts.
+        parsed_dates : pd.Series
+            The parsed dates, NaT for the texts which could not be parsed.
+
+        Returns
+        -------
+        pd.Series
+            The texts which could not be parsed.
+        """
+
+        parsed = parsed_dates.notna()
+        self._cache.update(
+            zip(texts[parsed], parsed_dates[parsed].dt.strftime(self.output_format))
+        )
+
+        return texts[~parsed].reset_index(drop=True)
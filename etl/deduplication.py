@@ -0,0 +1,177 @@
+"""
+This file contains the Deduplicator class, used to drop the rows whose business keys were already seen,
+across the files and the chunks of a run.
+"""
+
+import numpy as np
+import pandas as pd
+
+# each column is a key on its own: a row is a duplicate if any of its keys appeared in an earlier row
+DEDUPLICATION_KEYS = {
+    "pubmed": ("id", "title"),
+    "clinical_trials": ("id", "scientific_title"),
+}
+
+
+class HashedKeySet:
+    def __init__(self):
+        """
+        Set of 64-bit key hashes, stored as sorted arrays.
+
+        Each key costs 8 bytes, whatever its length, instead of the Python object of a set entry.
+        Added hashes form a new sorted run, merged with the last runs while they are not larger,
+        so each hash is merged a logarithmic number of times and lookups search a logarithmic number of runs.
+        """
+
+        self._runs: list[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self._runs)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(run.nbytes for run in self._runs)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Check which hashes are in the set.
+
+        Parameters
+        ----------
+        hashes : np.ndarray
+            The hashes to look up.
+
+        Returns
+        -------
+        np.ndarray
+            A boolean mask, True for the hashes in the set.
+        """
+
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            positions = np.searchsorted(run, hashes)
+            positions[positions == len(run)] = 0
+            found |= run[positions] == hashes
+
+        return found
+
+    def add(self, hashes: np.ndarray) -> None:
+        """
+        Add hashes to the set.
+
+        Parameters
+        ----------
+        hashes : np.ndarray
+            The hashes to add.
+        """
+
+        run = np.unique(hashes.astype(np.uint64))
+        run = run[~self.contains(run)]
+        if not len(run):
+            return
+
+        # runs have decreasing sizes, like the bits of a binary counter
+        while self._runs and len(self._runs[-1]) <= len(run):
+            run = np.concatenate([self._runs.pop(), run])
+            run.sort(kind="stable")
+        self._runs.append(run)
+
+
+class Deduplicator:
+    def __init__(self, keys: dict[str, tuple[str, ...]] | None = None):
+        """
+        Deduplication of tables on business keys, across the files and chunks of a run.
+
+        Text keys are compared once whitespace is collapsed and case folded, and missing or empty keys are ignored,
+        so an article repeated with different spacing or without id is still recognized by its other keys.
+        Only the hashes of the keys are kept between calls.
+
+        Parameters
+        ----------
+        keys : dict[str, tuple[str, ...]] | None
+            The key columns of each table. A row is dropped if any of its keys appeared in an earlier row.
+            Defaults to the id and the title of articles. Tables without keys are left untouched.
+        """
+
+        self.keys = DEDUPLICATION_KEYS if keys is None else keys
+        self._seen: dict[tuple[str, str], HashedKeySet] = {}
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The memory used by the hashes of the keys seen, in bytes.
+        """
+
+        return sum(key_set.nbytes for key_set in self._seen.values())
+
+    def reset(self) -> None:
+        """
+        Forget the keys seen, before a new run.
+        """
+
+        self._seen = {}
+
+    def deduplicate(self, data: pd.DataFrame, table_name: str) -> pd.DataFrame:
+        """
+        Drop the rows of a table whose keys appeared in an earlier row of this call or of a previous one.
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            The rows of the table: a whole file, or a chunk.
+        table_name : str
+            The table name.
+
+        Returns
+        -------
+        pd.DataFrame
+            The rows seen for the first time, with their index.
+        """
+
+        columns = [column for column in self.keys.get(table_name, ()) if column in data]
+        if not columns or data.empty:
+            return data
+
+        duplicated = np.zeros(len(data), dtype=bool)
+        for column in columns:
+            hashes, present = _hash_keys(data[column])
+            key_set = self._seen.setdefault((table_name, column), HashedKeySet())
+
+            duplicated[present] |= (
+                key_set.contains(hashes) | pd.Series(hashes).duplicated().to_numpy()
+            )
+            key_set.add(hashes)
+
+        # a taken frame is not a view, so later stages can assign its columns
+        return data.take(np.flatnonzero(~duplicated))
+
+
+def _hash_keys(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Hash the normalized keys of a column: whitespace is collapsed and case folded.
+
+    Parameters
+    ----------
+    values : pd.Series
+        The keys.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The hashes of the present keys, and the mask of the rows with a present key.
+    """
+
+    # arrays given by pandas may be read-only views of the column
+    present = values.notna().to_numpy().copy()
+    keys = (
+        values[present]
+        .astype(str)
+        .str.split()
+        .str.join(" ")
+        .str.casefold()
+        .to_numpy(dtype=object)
+    )
+    non_empty = keys != ""
+    present[present] = non_empty
+
+    return pd.util.hash_array(keys[non_empty], categorize=False), present
@@ -0,0 +1,93 @@
+"""
+This file contains the EdgeBuffer class, used to accumulate graph edges before building a DataFrame.
+"""
+
+import pandas as pd
+
+
+class EdgeBuffer:
+    def __init__(self, columns: list[str]):
+        """
+        Columnar accumulator of edges.
+
+        Edges are appended to one Python list per column and the DataFrame is materialized once,
+        so building N edges costs O(N) instead of copying the accumulated frame on every edge.
+
+        Parameters
+        ----------
+        columns : list[str]
+            The edge attributes, in the order of the DataFrame columns.
+        """
+
+        self.columns = columns
+        self._buffers: dict[str, list] = {column: [] for column in columns}
+
+    def __len__(self) -> int:
+        return len(self._buffers[self.columns[0]]) if self.columns else 0
+
+    def append(self, edge: dict) -> None:
+        """
+        Append an edge to the buffer.
+
+        Parameters
+        ----------
+        edge : dict
+            The edge attributes. Every column of the buffer must be present.
+        """
+
+        for column in self.columns:
+            self._buffers[column].append(edge[column])
+
+    def extend(self, edges: dict[str, list]) -> None:
+        """
+        Append several edges given as columns to the buffer.
+
+        Parameters
+        ----------
+        edges : dict[str, list]
+            The edge attributes, one list per column. All lists must have the same length.
+        """
+
+        for column in self.columns:
+            self._buffers[column].extend(edges[column])
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Materialize the buffered edges into a pandas DataFrame.
+
+        Returns
+        -------
+        pd.DataFrame
+            The edges, one row per edge. An empty DataFrame if no edge was appended.
+        """
+
+        if not len(self):
+            return pd.DataFrame()
+
+        return pd.DataFrame(self._buffers, columns=self.columns)
+
+
+def create_edge(drug: dict, article: dict) -> dict:
+    """
+    Create the edge of a drug referenced in an article.
+
+    Parameters
+    ----------
+    drug : dict
+        The drug info.
+    article : dict
+        The article info, which gives the journal and the date of the edge.
+
+    Returns
+    -------
+    dict
+        The edge attributes.
+    """
+
+    return {
+        "drug": drug,
+        "article": article,
+        "journal": article["journal"],
+        "relationship": "REFERENCED IN",
+        "date": article["date"],
+    }
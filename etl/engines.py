@@ -0,0 +1,511 @@
+"""
+This file contains the engines executing ETL plans: pandas, and DuckDB for multithreaded columnar runs.
+"""
+
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from etl.catalog import ARTICLES_TITLE_COLUMNS, DRUGS_NAME_COLUMN
+from etl.dates import DATE_FORMATS, NORMALIZED_DATE_FORMAT
+from etl.keys import SURROGATE_KEY_COLUMN, hash_keys
+
+if TYPE_CHECKING:
+    from etl.plan import Plan
+
+# the position of the rows in the order of the files, which keeps the order of the pandas engine
+ROW_POSITION_COLUMN = "row_position"
+# a word character is a letter, a digit or an underscore, as `\w` for the pandas engine
+NOT_WORD_CHARACTER_PATTERN = r"[^\pL\pN_]"
+
+
+class PandasEngine:
+    """
+    Engine running the plan with pandas DataFrames, one step after the other.
+    """
+
+    name = "pandas"
+
+    def execute(self, plan: "Plan") -> bool:
+        """
+        Execute a plan.
+
+        Parameters
+        ----------
+        plan : Plan
+            The plan.
+
+        Returns
+        -------
+        bool
+            True if the data was loaded.
+        """
+
+        return plan.etl._execute(plan)
+
+
+class DuckDBEngine:
+    """
+    Engine running the plan as SQL queries on an in-process DuckDB database.
+
+    CSV files are parsed by DuckDB, keeping the selected columns only. JSON files go through the tolerant reader.
+    Row filters, deduplication, types, dates and the drugs matching, as a join between drugs and titles,
+    run as multithreaded queries. Text cleaning runs as a vectorized function called by DuckDB.
+    The edges are then loaded by the same sinks as the pandas engine.
+
+    Unlike the pandas engine, dates which match none of the formats are kept as they are,
+    and runs cannot be incremental.
+    """
+
+    name = "duckdb"
+
+    def __init__(self):
+        _check_duckdb_is_installed()
+
+    def execute(self, plan: "Plan") -> bool:
+        """
+        Execute a plan.
+
+        Parameters
+        ----------
+        plan : Plan
+            The plan.
+
+        Returns
+        -------
+        bool
+            True if the data was loaded.
+        """
+
+        import duckdb
+
+        etl = plan.etl
+        if etl.incremental:
+            raise ValueError("Incremental runs are not supported by the duckdb engine.")
+
+        if_exists = "replace" if plan.if_exists == "y" else "append"
+        connection = duckdb.connect()
+        instrumentation = etl.instrumentation
+
+        try:
+            with instrumentation.capture(), instrumentation.stage("run"):
+                print("Extracting data from files...")
+                files = etl._select_files(plan.data_folder, if_exists)
+                with instrumentation.stage("extract") as record:
+                    for table_name, files_paths in files.items():
+                        self._extract_table(
+                            connection,
+                            table_name,
+                            files_paths,
+                            plan.columns.get(table_name),
+                        )
+                    record["rows_out"] = sum(
+                        _count_rows(connection, table_name) for table_name in files
+                    )
+
+                print("Transforming data...")
+                with instrumentation.stage("transform"):
+                    for table_name in files:
+                        with instrumentation.stage(table_name):
+                            self._transform_table(connection, plan, table_name)
+
+                with instrumentation.stage("matching") as record:
+                    data = self._match(connection, etl.word_boundary)
+                    record["rows_out"] = len(data)
+
+                return etl._load(data, if_exists)
+        finally:
+            connection.close()
+
+    def _extract_table(
+        self,
+        connection,
+        table_name: str,
+        files_paths: list[str],
+        columns: tuple[str, ...] | None,
+    ) -> None:
+        """
+        Load the files of a table into a DuckDB table of texts, numbering the rows in the order of the files.
+
+        Parameters
+        ----------
+        connection : duckdb.DuckDBPyConnection
+            The connection to the database.
+        table_name : str
+            The table name.
+        files_paths : list[str]
+            The paths of the files of the table.
+        columns : tuple[str, ...] | None
+            The columns to read. All columns are read if None.
+        """
+
+        import pyarrow as pa
+
+        from etl.readers import read_json
+
+        sources = {}
+        for position, file_path in enumerate(files_paths):
+            source = f"{table_name}_{position}"
+            if file_path.endswith(".csv"):
+                # short rows are padded and blank lines skipped, as pandas does
+                connection.execute(
+                    f"CREATE OR REPLACE TEMPORARY VIEW {quote_identifier(source)} AS SELECT * "
+                    f"FROM read_csv({quote_literal(file_path)}, header = true, all_varchar = true, "
+                    "null_padding = true) "
+                    "WHERE trim(concat_ws('', *COLUMNS(*)), ' \t\r\n') != ''"
+                )
+            else:
+                # missing values of string columns become NULL
+                connection.register(
+                    source,
+                    pa.Table.from_pandas(
+                        read_json(file_path, columns).astype("string"),
+                        preserve_index=False,
+                    ),
+                )
+            sources[source] = connection.table(source).columns
+
+        if columns is None:
+            columns = tuple(
+                dict.fromkeys(column for names in sources.values() for column in names)
+            )
+        else:
+            columns = tuple(
+                column
+                for column in columns
+                if any(column in names for names in sources.values())
+            )
+
+        connection.execute(
+            f"CREATE OR REPLACE TABLE {quote_identifier(table_name)} "
+            f"({', '.join(f'{quote_identifier(column)} VARCHAR' for column in columns)})"
+        )
+        # inserted one file after the other, so row ids follow the order of the files
+        for source, names in sources.items():
+            selected = [
+                quote_identifier(column)
+                if column in names
+                else f"NULL AS {quote_identifier(column)}"
+                for column in columns
+            ]
+            connection.execute(
+                f"INSERT INTO {quote_identifier(table_name)} "
+                f"SELECT {', '.join(selected)} FROM {quote_identifier(source)}"
+            )
+
+        connection.execute(
+            f"CREATE OR REPLACE TABLE {quote_identifier(table_name)} AS "
+            f"SELECT rowid AS {ROW_POSITION_COLUMN}, * FROM {quote_identifier(table_name)} ORDER BY rowid"
+        )
+
+    def _transform_table(self, connection, plan: "Plan", table_name: str) -> None:
+        """
+        Apply the row filters, the deduplication, the types, the dates normalization and the text cleaning to a table,
+        then add the surrogate keys.
+
+        Parameters
+        ----------
+        connection : duckdb.DuckDBPyConnection
+            The connection to the database.
+        plan : Plan
+            The plan.
+        table_name : str
+            The table name.
+        """
+
+        etl = plan.etl
+        table = quote_identifier(table_name)
+        columns = [
+            column
+            for column in connection.table(table_name).columns
+            if column != ROW_POSITION_COLUMN
+        ]
+
+        conditions = []
+        for row_filter in plan.row_filters.get(table_name, ()):
+            if not hasattr(row_filter, "to_sql"):
+                raise ValueError(
+                    f"Row filter {row_filter} is not supported by the duckdb engine."
+                )
+            conditions.append(row_filter.to_sql())
+
+        # a row is a duplicate if any of its keys appeared in an earlier row
+        duplicated_keys = [
+            f"({_normalize_key(key)} IS NOT NULL AND row_number() OVER "
+            f"(PARTITION BY {_normalize_key(key)} ORDER BY {ROW_POSITION_COLUMN}) > 1)"
+            for key in etl.deduplicator.keys.get(table_name, ())
+            if key in columns
+        ]
+
+        # missing values become "nan" texts, as with the pandas engine
+        typed_columns = [
+            f"coalesce({quote_identifier(column)}, 'nan') AS {quote_identifier(column)}"
+            for column in columns
+        ]
+
+        steps = {
+            "filters": f"SELECT * FROM {table} WHERE {' AND '.join(conditions) or 'true'}",
+        }
+        if duplicated_keys:
+            steps["keys"] = (
+                f"SELECT * FROM {table} QUALIFY NOT ({' OR '.join(duplicated_keys)})"
+            )
+        steps |= {
+            "types": f"SELECT * REPLACE ({', '.join(typed_columns)}) FROM {table}",
+            "duplicates": f"SELECT * FROM {table} QUALIFY row_number() OVER "
+            f"(PARTITION BY {', '.join(map(quote_identifier, columns))} ORDER BY {ROW_POSITION_COLUMN}) = 1",
+        }
+        if "date" in columns:
+            formats = f"[{', '.join(map(quote_literal, DATE_FORMATS))}]"
+            steps["dates"] = (
+                f"SELECT * REPLACE (coalesce(strftime(try_strptime(trim(date), {formats}), "
+                f"{quote_literal(NORMALIZED_DATE_FORMAT)}), date) AS date) FROM {table}"
+            )
+
+        cleaned_columns = []
+        for position, column in enumerate(columns):
+            steps_of_column = etl.text_cleaner.steps_per_column.get(
+                column, etl.text_cleaner.default_steps
+            )
+            if steps_of_column:
+                function_name = f"clean_{table_name}_{position}"
+                connection.create_function(
+                    function_name,
+                    _create_cleaning_function(etl.text_cleaner, steps_of_column),
+                    ["VARCHAR"],
+                    "VARCHAR",
+                    type="arrow",
+                )
+                cleaned_columns.append(
+                    f"{function_name}({quote_identifier(column)}) AS {quote_identifier(column)}"
+                )
+        if cleaned_columns:
+            steps["text_cleaning"] = (
+                f"SELECT * REPLACE ({', '.join(cleaned_columns)}) FROM {table}"
+            )
+
+        for step, query in steps.items():
+            with etl.instrumentation.stage(
+                step, rows_in=_count_rows(connection, table_name)
+            ) as record:
+                connection.execute(
+                    f"CREATE OR REPLACE TABLE {table} AS {query} ORDER BY {ROW_POSITION_COLUMN}"
+                )
+                record["rows_out"] = _count_rows(connection, table_name)
+
+        with etl.instrumentation.stage(
+            "surrogate_keys", rows_in=_count_rows(connection, table_name)
+        ) as record:
+            self._add_surrogate_key(
+                connection,
+                table_name,
+                etl.surrogate_keys.get(table_name, tuple(columns)),
+            )
+            record["rows_out"] = _count_rows(connection, table_name)
+
+    def _add_surrogate_key(
+        self, connection, table_name: str, key_columns: tuple[str, ...]
+    ) -> None:
+        """
+        Add the surrogate keys to a table, hashed as by the pandas engine over the whole table,
+        so collisions are detected across its files.
+
+        Parameters
+        ----------
+        connection : duckdb.DuckDBPyConnection
+            The connection to the database.
+        table_name : str
+            The table name.
+        key_columns : tuple[str, ...]
+            The business columns.
+        """
+
+        table = quote_identifier(table_name)
+        columns = connection.table(table_name).columns
+        selected = [ROW_POSITION_COLUMN] + [
+            column for column in key_columns if column in columns
+        ]
+        data = connection.execute(
+            f"SELECT {', '.join(map(quote_identifier, selected))} FROM {table}"
+        ).df()
+        keys = pd.DataFrame(
+            {
+                ROW_POSITION_COLUMN: data[ROW_POSITION_COLUMN],
+                SURROGATE_KEY_COLUMN: hash_keys(data, key_columns),
+            }
+        )
+
+        connection.register("surrogate_keys", keys)
+        try:
+            connection.execute(
+                f"CREATE OR REPLACE TABLE {table} AS "
+                f"SELECT {table}.{ROW_POSITION_COLUMN}, surrogate_keys.{SURROGATE_KEY_COLUMN}, "
+                f"{table}.* EXCLUDE ({ROW_POSITION_COLUMN}) "
+                f"FROM {table} JOIN surrogate_keys USING ({ROW_POSITION_COLUMN}) "
+                f"ORDER BY {ROW_POSITION_COLUMN}"
+            )
+        finally:
+            connection.unregister("surrogate_keys")
+
+    def _match(self, connection, word_boundary: bool) -> pd.DataFrame:
+        """
+        Join the drugs with the titles quoting them, as a graph-oriented DataFrame ordered by drug.
+
+        Parameters
+        ----------
+        connection : duckdb.DuckDBPyConnection
+            The connection to the database.
+        word_boundary : bool
+            If True, a drug is only referenced when its name appears as a whole word in the title.
+
+        Returns
+        -------
+        pd.DataFrame
+            The edges.
+        """
+
+        drug = f"lower(drugs.{quote_identifier(DRUGS_NAME_COLUMN)})"
+        edges = []
+        for table_name, title_column in ARTICLES_TITLE_COLUMNS.items():
+            title = f"lower(articles.{quote_identifier(title_column)})"
+            if word_boundary:
+                condition = (
+                    f"regexp_matches({title}, '(^|{NOT_WORD_CHARACTER_PATTERN})' "
+                    f"|| regexp_escape({drug}) || '($|{NOT_WORD_CHARACTER_PATTERN})')"
+                )
+            else:
+                condition = f"contains({title}, {drug})"
+
+            edges.append(
+                connection.execute(
+                    f"SELECT {_pack_record(connection, 'drugs', 'drugs')} AS drug, "
+                    f"{_pack_record(connection, table_name, 'articles')} AS article, "
+                    "articles.journal AS journal, "
+                    f"'REFERENCED IN' AS relationship, articles.date AS date, "
+                    f"drugs.{ROW_POSITION_COLUMN} AS drug_position "
+                    f"FROM drugs JOIN {quote_identifier(table_name)} AS articles ON {condition} "
+                    f"ORDER BY drugs.{ROW_POSITION_COLUMN}, articles.{ROW_POSITION_COLUMN}"
+                ).df()
+            )
+
+        # within a drug, PubMed articles come before clinical trials
+        data = pd.concat(edges, ignore_index=True)
+        data = data.iloc[data["drug_position"].argsort(kind="stable")]
+
+        return data.drop(columns="drug_position").reset_index(drop=True)
+
+
+ENGINES = {"pandas": PandasEngine, "duckdb": DuckDBEngine}
+
+
+def get_engine(name: str) -> PandasEngine | DuckDBEngine:
+    """
+    Get an engine by name.
+
+    Parameters
+    ----------
+    name : str
+        The engine name: "pandas" or "duckdb".
+
+    Returns
+    -------
+    PandasEngine | DuckDBEngine
+        The engine.
+    """
+
+    if name not in ENGINES:
+        raise ValueError(
+            f"Engine {name} is not supported. Use one of {tuple(ENGINES)}."
+        )
+
+    return ENGINES[name]()
+
+
+def _create_cleaning_function(text_cleaner, steps: tuple[str, ...]):
+    """
+    Create a vectorized DuckDB function cleaning texts.
+
+    Parameters
+    ----------
+    text_cleaner : TextCleaner
+        The text cleaner.
+    steps : tuple[str, ...]
+        The cleaning steps.
+
+    Returns
+    -------
+    Callable[[pa.Array], pa.Array]
+        The function, taking and returning Arrow arrays.
+    """
+
+    import pyarrow as pa
+
+    def clean(texts):
+        cleaned = text_cleaner.clean_column(texts.to_pandas(), steps)
+        return pa.array(cleaned, type=pa.string())
+
+    return clean
+
+
+def _pack_record(connection, table_name: str, alias: str) -> str:
+    """
+    Get the SQL expression of the rows of a table as records, without their position.
+    """
+
+    fields = [
+        f"{quote_identifier(column)} := {alias}.{quote_identifier(column)}"
+        for column in connection.table(table_name).columns
+        if column != ROW_POSITION_COLUMN
+    ]
+
+    return f"struct_pack({', '.join(fields)})"
+
+
+def _count_rows(connection, table_name: str) -> int:
+    """
+    Count the rows of a DuckDB table.
+    """
+
+    (count,) = connection.execute(
+        f"SELECT count(*) FROM {quote_identifier(table_name)}"
+    ).fetchone()
+
+    return count
+
+
+def _normalize_key(column: str) -> str:
+    """
+    Get the SQL expression of a normalized key: whitespace collapsed, lower case, NULL if empty.
+    """
+
+    return f"nullif(lower(trim(regexp_replace({quote_identifier(column)}, '\\s+', ' ', 'g'))), '')"
+
+
+def quote_identifier(identifier: str) -> str:
+    """
+    Quote a SQL identifier.
+    """
+
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def quote_literal(text: str) -> str:
+    """
+    Quote a SQL string literal.
+    """
+
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _check_duckdb_is_installed() -> None:
+    """
+    Check that DuckDB and pyarrow, used by its vectorized functions, are installed.
+    """
+
+    try:
+        import duckdb  # noqa: F401
+        import pyarrow  # noqa: F401
+    except ImportError as error:
+        raise ImportError(
+            "The duckdb engine requires duckdb and pyarrow. Install them with `pip install duckdb pyarrow`."
+        ) from error
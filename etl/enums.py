@@ -3,17 +3,22 @@ This file contains useful enums for the ETL class.
 """
 
 from enum import Enum
+from importlib.util import find_spec
+
+# Arrow-backed strings store texts in contiguous buffers instead of one Python object per row
+TEXT_TYPE = "string[pyarrow]" if find_spec("pyarrow") else "string"
 
 
 class ColumnTypesEnum(Enum):
     """
     Enum for the column types.
+    Columns with few distinct values, such as journals, are categorical.
     """
 
-    id = str
-    scientific_title = str
-    title = str
-    date = str
-    journal = str
-    atccode = str
-    drug = str
+    id = TEXT_TYPE
+    scientific_title = TEXT_TYPE
+    title = TEXT_TYPE
+    date = "category"
+    journal = "category"
+    atccode = "category"
+    drug = TEXT_TYPE
@@ -4,35 +4,418 @@ This file contains the ETL class, used to extract, transform, and load data from
 
 import os
 import sys
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
+import numpy as np
 import pandas as pd
 
 from tqdm import tqdm
 
+from etl.cache import CACHE_MAX_BYTES, InputCache, read_input_file
+from etl.catalog import ARTICLES_TITLE_COLUMNS, Catalog
+from etl.cleaning import TextCleaner
+from etl.database import DATABASE_FORMAT, read_database, write_database
+from etl.dates import DateNormalizer
+from etl.deduplication import Deduplicator
+from etl.edges import create_edge
 from etl.enums import ColumnTypesEnum
+from etl.matcher import DrugMatcher, ShardedDrugMatcher
+from etl.index import (
+    QueryIndex,
+    get_edges_postings_path,
+    get_index_path,
+    get_records_path,
+)
+from etl.keys import SURROGATE_KEY_COLUMN, SURROGATE_KEYS, get_record_key, hash_keys
+from etl.manifest import Manifest, get_manifest_path
+from etl.metrics import Instrumentation
+from etl.normalized import (
+    NORMALIZED_FORMATS,
+    build_normalized_tables,
+    denormalize_tables,
+    read_normalized_tables,
+    write_normalized_tables,
+)
+from etl.plan import DEFAULT_ROW_FILTERS, GRAPH_COLUMNS, Plan
+from etl.readers import get_usecols, iter_json_chunks, read_file, read_json
+from etl.sinks import OUTPUT_FORMATS, JsonSink
+from etl.spill import SpillingEdgeBuffer
 from etl.util import (
-    get_article_info_from_name,
-    get_drug_info_from_name,
+    get_article_key_from_info,
+    get_articles_keys,
+    get_memory_usage,
     remove_file_extension,
-    get_article_journal_from_data,
-    get_article_date_from_data,
 )
 
+LOAD_FORMATS = (*OUTPUT_FORMATS, *NORMALIZED_FORMATS, DATABASE_FORMAT)
+
 
 class ETL:
-    def __init__(self):
-        """ETL Instance. Extract, transform and load data to a graph-oriented JSON file."""
-        pass
+    def __init__(
+        self,
+        word_boundary: bool = False,
+        chunk_size: int | None = None,
+        workers: int = 1,
+        incremental: bool = False,
+        output_path: str = "data.json",
+        output_format: str = "json",
+        text_cleaning_steps: dict[str, tuple[str, ...]] | None = None,
+        report_memory: bool = False,
+        metrics_path: str | None = None,
+        profile: str | None = None,
+        callbacks: list[Callable[[dict], None]] | None = None,
+        write_index: bool = True,
+        deduplication_keys: dict[str, tuple[str, ...]] | None = None,
+        cache_path: str | None = None,
+        cache_max_bytes: int = CACHE_MAX_BYTES,
+        surrogate_keys: dict[str, tuple[str, ...]] | None = None,
+        max_edges_in_memory: int | None = None,
+        spill_path: str | None = None,
+    ):
+        """
+        ETL Instance. Extract, transform and load data to a graph-oriented JSON file.
+
+        Parameters
+        ----------
+        word_boundary : bool
+            If True, a drug is only referenced in an article when its name appears as a whole word in the title.
+        chunk_size : int | None
+            If set, articles are streamed from their files by chunks of this number of rows,
+            so memory is bounded by the chunk size and the drugs instead of the input size.
+        workers : int
+            The number of processes parsing files and matching articles in parallel.
+            1 runs everything in the current process.
+        incremental : bool
+            If True, only the article files added or changed since the previous run are processed,
+            and their edges are merged into the existing output.
+        output_path : str
+            The path to the output file.
+        output_format : str
+            "json" for an indented JSON array, "jsonl" for compact JSON Lines,
+            "parquet" or "feather" for normalized drugs, articles, journals and edges tables
+            written to the `output_path` folder, or "sqlite" for the same tables in the `output_path` database,
+            where runs appending files upsert their edges.
+        text_cleaning_steps : dict[str, tuple[str, ...]] | None
+            The text cleaning steps applied to each column, among "escapes", "control_characters",
+            "whitespace" and "unicode". All steps are applied to the text columns not in the dictionary.
+        report_memory : bool
+            If True, the memory used by each table before and after the transformations is printed.
+        metrics_path : str | None
+            If set, a JSON report of the wall time, CPU time, peak RSS and rows in and out of each stage
+            is written to this path at the end of each run.
+        profile : str | None
+            "cprofile" to save the cProfile statistics of each run to etl.prof,
+            or "tracemalloc" to add the peak traced memory of each stage to the metrics.
+        callbacks : list[Callable[[dict], None]] | None
+            Functions called with the metrics record of each stage when it ends.
+        write_index : bool
+            If True, a query index of the drugs, journals and dates of the edges is written next to the output.
+        deduplication_keys : dict[str, tuple[str, ...]] | None
+            The columns identifying the rows of each table, across files and chunks.
+            A row is dropped if any of its keys, whitespace and case aside, appeared in an earlier row.
+            Defaults to the id and the title of articles.
+        cache_path : str | None
+            If set, parsed input files are cached in this folder, keyed by their content,
+            so unchanged files are not parsed again by later runs. Files read by chunks are not cached.
+            The cache needs pyarrow, and is disabled with a warning if it is not installed.
+        cache_max_bytes : int
+            The maximum size of the cache. The least recently used files are evicted past it.
+        surrogate_keys : dict[str, tuple[str, ...]] | None
+            The business columns hashed into the surrogate key of each table, whitespace and case aside.
+            Defaults to the ATC code and the name of drugs, and to the id and the title of articles.
+        max_edges_in_memory : int | None
+            If set, matched edges are sorted and spilled to partition files on disk by batches of this size,
+            then merged back in order, without duplicated edges, while loaded.
+            JSON and JSON Lines outputs are then streamed from the partitions, without the query index.
+        spill_path : str | None
+            The folder in which the partitions are written. Defaults to the system temporary folder.
+        """
+
+        if output_format not in LOAD_FORMATS:
+            raise ValueError(
+                f"Output format {output_format} is not supported. Use one of {LOAD_FORMATS}."
+            )
 
-    def run(self, data_folder: str, if_exists: str) -> bool:
+        self.word_boundary = word_boundary
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.incremental = incremental
+        self.output_path = output_path
+        self.output_format = output_format
+        self.report_memory = report_memory
+        self.write_index = write_index
+        self.text_cleaner = TextCleaner(text_cleaning_steps)
+        self.date_normalizer = DateNormalizer()
+        self.deduplicator = Deduplicator(deduplication_keys)
+        self.surrogate_keys = (
+            SURROGATE_KEYS if surrogate_keys is None else surrogate_keys
+        )
+        self.input_cache = None
+        if cache_path:
+            try:
+                self.input_cache = InputCache(cache_path, cache_max_bytes)
+            except ImportError as error:
+                print(f"{error} The input cache is disabled.", file=sys.stderr)
+        self.cache_path = None if self.input_cache is None else cache_path
+        self.cache_max_bytes = cache_max_bytes
+        self.max_edges_in_memory = max_edges_in_memory
+        self.spill_path = spill_path
+        self.columns = GRAPH_COLUMNS
+        self.row_filters = DEFAULT_ROW_FILTERS
+        self.instrumentation = Instrumentation(
+            metrics_path, profile, callbacks=callbacks
+        )
+
+    def run(self, data_folder: str, if_exists: str, engine: str = "pandas") -> bool:
         """Run the ETL."""
 
-        if_exists = "replace" if if_exists == "y" else "append"
+        return self.plan(data_folder, if_exists, engine).execute()
+
+    def plan(self, data_folder: str, if_exists: str, engine: str = "pandas") -> Plan:
+        """
+        Get the lazy plan of a run, reading the columns used by the graph and dropping blank titles.
+        The plan can be restricted with `select`, `where` and `where_dates`, described with `explain`,
+        and run with `execute`.
 
-        data = self._extract(data_folder, if_exists)
-        data = self._transform(data)
+        Parameters
+        ----------
+        data_folder : str
+            The path to the folder containing the files to be extracted.
+        if_exists : str
+            "y" to keep the last file of each name, or "n" to append them.
+        engine : str
+            The engine executing the plan: "pandas", or "duckdb" to run the transformations
+            and the matching as multithreaded SQL queries.
+
+        Returns
+        -------
+        Plan
+            The plan.
+        """
+
+        return Plan(self, data_folder, if_exists, engine=engine)
+
+    def _execute(self, plan: Plan) -> bool:
+        """
+        Execute a plan.
 
-        return self._load(data)
+        Parameters
+        ----------
+        plan : Plan
+            The plan.
+
+        Returns
+        -------
+        bool
+            True if the data was loaded.
+        """
+
+        data_folder = plan.data_folder
+        if_exists = "replace" if plan.if_exists == "y" else "append"
+        self.deduplicator.reset()
+        self.columns = plan.columns
+        self.row_filters = plan.row_filters
+
+        try:
+            with self.instrumentation.capture(), self.instrumentation.stage("run"):
+                if self.incremental:
+                    return self._run_incrementally(data_folder, if_exists)
+
+                if self.chunk_size:
+                    return self._load(
+                        self._extract_and_transform_by_chunks(data_folder, if_exists),
+                        if_exists,
+                    )
+
+                data = self._extract(data_folder, if_exists)
+                data = self._transform(data)
+
+                return self._load(data, if_exists)
+        finally:
+            self.columns = GRAPH_COLUMNS
+            self.row_filters = DEFAULT_ROW_FILTERS
+
+    def _run_incrementally(self, folder_path: str, if_exists: str) -> bool:
+        """
+        Run the ETL on the article files added or changed since the previous run only.
+
+        The previous run is described by a manifest stored next to the output file.
+        Edges of the articles contributed by changed or deleted files are retracted from the output,
+        then the edges of the new and changed files are merged into it, ordered by drug.
+        Everything is processed again if the drugs or the ETL options changed.
+        Each article file is transformed on its own, so duplicates are only dropped within a file.
+
+        Parameters
+        ----------
+        folder_path : str
+            The path to the folder containing the files to be extracted.
+        if_exists : str
+            The action to be taken if several files have the same name.
+            Possible values: "append", "replace", "ignore".
+
+        Returns
+        -------
+        bool
+            True if the data was loaded.
+        """
+
+        manifest_path = get_manifest_path(self.output_path)
+        previous_manifest = (
+            Manifest.load(manifest_path)
+            if os.path.exists(self.output_path)
+            else Manifest()
+        )
+        manifest = Manifest(
+            options={
+                "if_exists": if_exists,
+                "word_boundary": self.word_boundary,
+                # a change of plan changes the rows kept from unchanged files too
+                "columns": {
+                    table_name: list(columns)
+                    for table_name, columns in self.columns.items()
+                },
+                "row_filters": {
+                    table_name: [str(row_filter) for row_filter in row_filters]
+                    for table_name, row_filters in self.row_filters.items()
+                },
+                # articles are tracked by surrogate key
+                "surrogate_keys": {
+                    table_name: list(columns)
+                    for table_name, columns in self.surrogate_keys.items()
+                },
+            }
+        )
+
+        files = self._select_files(folder_path, if_exists)
+        for files_paths in files.values():
+            for file_path in files_paths:
+                manifest.add_file(file_path, previous_manifest)
+
+        changed_files = manifest.get_changed_files(previous_manifest)
+        deleted_files = manifest.get_deleted_files(previous_manifest)
+
+        rebuild = manifest.options != previous_manifest.options or any(
+            remove_file_extension(file_path) not in ARTICLES_TITLE_COLUMNS
+            for file_path in changed_files + deleted_files
+        )
+        if rebuild:
+            print("Drugs or options changed. Processing all files...")
+            changed_files = list(manifest.files)
+        elif not changed_files and not deleted_files:
+            print("No file changed since the previous run.")
+            return True
+
+        # process articles in the order of a full run: PubMed articles, then clinical trials
+        tables_names = list(ARTICLES_TITLE_COLUMNS)
+        changed_files = sorted(
+            (
+                file_path
+                for file_path in changed_files
+                if remove_file_extension(file_path) in ARTICLES_TITLE_COLUMNS
+            ),
+            key=lambda file_path: tables_names.index(remove_file_extension(file_path)),
+        )
+
+        print(f"Processing {len(changed_files)} new or changed files...")
+
+        data = self._extract_files(
+            {
+                file_name: files_paths
+                for file_name, files_paths in files.items()
+                if file_name not in ARTICLES_TITLE_COLUMNS
+            }
+        )
+        for file_name in data:
+            data[file_name] = self._apply_technical_constraints(
+                data[file_name], file_name
+            )
+            data[file_name] = self._apply_functional_constraints_(
+                data[file_name], file_name
+            )
+
+        drugs_catalog = Catalog(data)
+        drug_nodes = data["drugs"]["drug"].tolist()
+        edges = self._create_edge_buffer()
+
+        unchanged_articles = {
+            article_key
+            for file_path, entry in manifest.files.items()
+            if file_path not in changed_files
+            for article_key in entry["articles"]
+        }
+
+        with self._create_matcher(drug_nodes) as matcher:
+            for file_path in tqdm(changed_files):
+                table_name = remove_file_extension(file_path)
+                articles_keys = []
+                chunks = (
+                    self._iter_chunks(file_path)
+                    if self.chunk_size
+                    else [self._read_file(file_path, self.columns.get(table_name))]
+                )
+                for chunk in chunks:
+                    chunk = self._filter_rows(chunk, table_name)
+                    chunk = self._apply_technical_constraints(chunk, table_name)
+                    chunk = self._apply_functional_constraints_(chunk, table_name)
+                    # articles already contributed by an unchanged file keep their edges
+                    chunk = chunk[~get_articles_keys(chunk).isin(unchanged_articles)]
+                    articles_keys += get_articles_keys(chunk).tolist()
+
+                    self._match_chunk(chunk, table_name, matcher, drugs_catalog, edges)
+
+                manifest.files[file_path]["articles"] = list(
+                    dict.fromkeys(articles_keys)
+                )
+
+        # the previous edges are read in memory, so only the matching is bounded by the memory budget
+        with edges:
+            new_edges = edges.to_dataframe()
+
+        if rebuild:
+            edges = new_edges
+        else:
+            retracted_articles = {
+                article_key
+                for file_path in changed_files + deleted_files
+                for article_key in previous_manifest.files.get(file_path, {}).get(
+                    "articles", []
+                )
+            } - unchanged_articles
+            edges = self._read_output()
+            if not edges.empty:
+                edges = edges[
+                    ~edges["article"]
+                    .map(get_article_key_from_info)
+                    .isin(retracted_articles)
+                ]
+            edges = pd.concat([edges, new_edges], ignore_index=True)
+
+            # keep the drug-then-article order of a full run
+            drugs_positions = {
+                drug_key: position
+                for position, drug_key in reversed(
+                    list(enumerate(data["drugs"][SURROGATE_KEY_COLUMN].tolist()))
+                )
+            }
+            if not edges.empty:
+                edges = edges.iloc[
+                    edges["drug"]
+                    .map(
+                        lambda drug: get_record_key(
+                            drug, self.surrogate_keys.get("drugs", ())
+                        )
+                    )
+                    .map(drugs_positions)
+                    .fillna(len(drug_nodes))
+                    .argsort(kind="stable")
+                ].reset_index(drop=True)
+
+        loaded = self._load(edges)
+        manifest.save(manifest_path)
+
+        return loaded
 
     def _extract(
         self, folder_path: str, if_exists: str = "append"
@@ -55,39 +438,28 @@ class ETL:
             You access the data of each file by using the file name as the key.
         """
 
-        data = {}
-
         print("Extracting data from files...")
 
-        for file in tqdm(os.listdir(folder_path)):
-            if file.endswith(".csv"):
-                data = self._extract_data_from_csv_(
-                    data, folder_path + "/" + file, if_exists
-                )
-            elif file.endswith(".json"):
-                data = self._extract_data_from_json_(
-                    data, folder_path + "/" + file, if_exists
-                )
-            else:
-                print(
-                    f"File format for {file} is not supported. Ignoring.",
-                    file=sys.stderr,
-                )
+        with self.instrumentation.stage("extract") as record:
+            data = self._extract_files(self._select_files(folder_path, if_exists))
+            record["rows_out"] = sum(len(table) for table in data.values())
 
         print("Data extracted successfully.")
 
         return data
 
-    def _transform(self, data: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    def _transform(
+        self, data: dict[str, pd.DataFrame]
+    ) -> pd.DataFrame | SpillingEdgeBuffer:
         """
         Apply transformations to the data.
         - Technical constraints:
             - Force column types
             - Drop duplicates
         - Functional constraints:
-            - Add a surrerogate key
             - Normalize date formats
             - Remove non utf_8 characters
+            - Add a surrerogate key
         - Drop primary key missing rows
         - Data structuration:
             - Create a graph oriented pandas DataFrame
@@ -99,15 +471,20 @@ class ETL:
 
         Returns
         -------
-        pd.DataFrame
-            The transformed data as a graph-oriented pandas DataFrame.
+        pd.DataFrame | SpillingEdgeBuffer
+            The transformed data as a graph-oriented pandas DataFrame,
+            or the edge buffer if the edges were spilled to disk.
         """
 
         print("Transforming data...")
 
-        for file_name in tqdm(data.keys()):
-            data[file_name] = self._apply_technical_constraints(data[file_name])
-            data[file_name] = self._apply_functional_constraints_(data[file_name])
+        if self.report_memory:
+            memory_usage_before = get_memory_usage(data)
+
+        data = self._apply_constraints(data)
+
+        if self.report_memory:
+            self._print_memory_report(memory_usage_before, get_memory_usage(data))
 
         final_data = self._create_graph_oriented_dataframe(data)
 
@@ -115,27 +492,475 @@ class ETL:
 
         return final_data
 
-    def _load(self, data: pd.DataFrame) -> bool:
+    def _apply_constraints(
+        self, data: dict[str, pd.DataFrame]
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Apply technical then functional constraints to each table.
+
+        Parameters
+        ----------
+        data : dict[str, pd.DataFrame]
+            The dictionary containing the data.
+
+        Returns
+        -------
+        dict[str, pd.DataFrame]
+            The dictionary containing the data with the applied constraints.
+        """
+
+        with self.instrumentation.stage("transform"):
+            for file_name in tqdm(data.keys()):
+                with self.instrumentation.stage(
+                    file_name, rows_in=len(data[file_name])
+                ) as record:
+                    data[file_name] = self._apply_technical_constraints(
+                        data[file_name], file_name
+                    )
+                    data[file_name] = self._apply_functional_constraints_(
+                        data[file_name], file_name
+                    )
+                    record["rows_out"] = len(data[file_name])
+
+        return data
+
+    def _extract_and_transform_by_chunks(
+        self, folder_path: str, if_exists: str = "append"
+    ) -> pd.DataFrame | SpillingEdgeBuffer:
+        """
+        Extract and transform the data, streaming articles by chunks of `chunk_size` rows.
+        Drugs are extracted and transformed as a whole, then each articles chunk goes through
+        technical constraints, functional constraints and drugs matching before the next one is read.
+
+        Articles are looked up within their own chunk. Identical rows are only dropped within a chunk,
+        while rows with the same keys are dropped across chunks.
+
+        Parameters
+        ----------
+        folder_path : str
+            The path to the folder containing the files to be extracted.
+        if_exists : str
+            The action to be taken if several files have the same name.
+            Possible values: "append", "replace", "ignore".
+
+        Returns
+        -------
+        pd.DataFrame | SpillingEdgeBuffer
+            The transformed data as a graph-oriented pandas DataFrame,
+            or the edge buffer if the edges were spilled to disk.
+        """
+
+        files = self._select_files(folder_path, if_exists)
+
+        print("Extracting and transforming drugs...")
+
+        data = self._extract_files(
+            {
+                file_name: files_paths
+                for file_name, files_paths in files.items()
+                if file_name not in ARTICLES_TITLE_COLUMNS
+            }
+        )
+        for file_name in data:
+            data[file_name] = self._apply_technical_constraints(
+                data[file_name], file_name
+            )
+            data[file_name] = self._apply_functional_constraints_(
+                data[file_name], file_name
+            )
+
+        drugs_catalog = Catalog(data)
+        drug_nodes = data["drugs"]["drug"].tolist()
+        edges = self._create_edge_buffer()
+
+        print("Extracting and transforming articles by chunks...")
+
+        with (
+            self._create_matcher(drug_nodes) as matcher,
+            self.instrumentation.stage("transform"),
+        ):
+            for table_name in ARTICLES_TITLE_COLUMNS:
+                for file_path in files.get(table_name, []):
+                    for chunk in tqdm(self._iter_chunks(file_path), desc=file_path):
+                        with self.instrumentation.stage(table_name, rows_in=len(chunk)):
+                            chunk = self._filter_rows(chunk, table_name)
+                            chunk = self._apply_technical_constraints(chunk, table_name)
+                            chunk = self._apply_functional_constraints_(
+                                chunk, table_name
+                            )
+
+                            self._match_chunk(
+                                chunk,
+                                table_name,
+                                matcher,
+                                drugs_catalog,
+                                edges,
+                            )
+
+        print("Data transformed successfully.")
+
+        return self._get_edges(edges)
+
+    def _match_chunk(
+        self,
+        chunk: pd.DataFrame,
+        table_name: str,
+        matcher: DrugMatcher | ShardedDrugMatcher,
+        drugs_catalog: Catalog,
+        edges: SpillingEdgeBuffer,
+    ) -> None:
+        """
+        Match the articles of a chunk against the drugs and add the resulting edges to the buffer,
+        sorted by drug then in the order of the articles.
+
+        Parameters
+        ----------
+        chunk : pd.DataFrame
+            The transformed articles chunk.
+        table_name : str
+            The name of the table the chunk belongs to: "pubmed" or "clinical_trials".
+        matcher : DrugMatcher | ShardedDrugMatcher
+            The drugs matcher.
+        drugs_catalog : Catalog
+            The catalog of the drugs.
+        edges : SpillingEdgeBuffer
+            The edges found so far.
+        """
+
+        articles_nodes = chunk[ARTICLES_TITLE_COLUMNS[table_name]].tolist()
+        articles_keys = chunk[SURROGATE_KEY_COLUMN].tolist()
+        with self.instrumentation.stage("matching", rows_in=len(chunk)) as record:
+            articles_per_drug = matcher.match(articles_nodes)
+            record["rows_out"] = sum(len(indexes) for indexes in articles_per_drug)
+
+        catalog = Catalog({table_name: chunk})
+        for drug_position, (drug_key, articles_indexes) in enumerate(
+            zip(
+                drugs_catalog.data["drugs"][SURROGATE_KEY_COLUMN].tolist(),
+                articles_per_drug,
+            )
+        ):
+            for article_index in articles_indexes:
+                edges.append(
+                    create_edge(
+                        drugs_catalog.get_record("drugs", drug_key),
+                        catalog.get_record(table_name, articles_keys[article_index]),
+                    ),
+                    (drug_position, len(edges)),
+                )
+
+    def _create_matcher(self, drugs: list[str]) -> DrugMatcher | ShardedDrugMatcher:
+        """
+        Create the drugs matcher, sharding articles over `workers` processes if it is greater than 1.
+
+        Parameters
+        ----------
+        drugs : list[str]
+            The drug names.
+
+        Returns
+        -------
+        DrugMatcher | ShardedDrugMatcher
+            The drugs matcher, to be used as a context manager.
+        """
+
+        if self.workers > 1:
+            return ShardedDrugMatcher(
+                drugs, word_boundary=self.word_boundary, workers=self.workers
+            )
+
+        return DrugMatcher(drugs, word_boundary=self.word_boundary)
+
+    def _select_files(self, folder_path: str, if_exists: str) -> dict[str, list[str]]:
+        """
+        List the files to extract from a folder, grouped by file name without extension.
+
+        Parameters
+        ----------
+        folder_path : str
+            The path to the folder containing the files to be extracted.
+        if_exists : str
+            The action to be taken if several files have the same name.
+            "append" keeps all of them, "replace" the last one and "ignore" the first one.
+
+        Returns
+        -------
+        dict[str, list[str]]
+            The paths of the files to extract for each file name, in alphabetical order
+            whatever the order of the folder entries.
+        """
+
+        files = {}
+
+        for file in sorted(os.listdir(folder_path)):
+            if not file.endswith((".csv", ".json", ".jsonl")):
+                print(
+                    f"File format for {file} is not supported. Ignoring.",
+                    file=sys.stderr,
+                )
+                continue
+
+            file_path = folder_path + "/" + file
+            file_name = remove_file_extension(file_path)
+            if file_name not in files:
+                files[file_name] = [file_path]
+                continue
+            match if_exists:
+                case "append":
+                    files[file_name].append(file_path)
+                case "replace":
+                    files[file_name] = [file_path]
+                case "ignore":
+                    pass
+
+        return files
+
+    def _iter_chunks(self, file_path: str) -> Iterator[pd.DataFrame]:
+        """
+        Read a file by chunks of `chunk_size` rows.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the file.
+
+        Returns
+        -------
+        Iterator[pd.DataFrame]
+            The chunks of the file.
+        """
+
+        columns = self.columns.get(remove_file_extension(file_path))
+
+        if file_path.endswith(".csv"):
+            yield from pd.read_csv(
+                file_path, chunksize=self.chunk_size, usecols=get_usecols(columns)
+            )
+        else:
+            yield from iter_json_chunks(file_path, self.chunk_size, columns)
+
+    def _read_file(
+        self, file_path: str, columns: tuple[str, ...] | None
+    ) -> pd.DataFrame:
         """
-        Load the data to a graph-oriented JSON file.
+        Read a whole file, from the input cache if enabled.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the file.
+        columns : tuple[str, ...] | None
+            The columns to keep. All columns are kept if None.
+
+        Returns
+        -------
+        pd.DataFrame
+            The content of the file.
+        """
+
+        if self.input_cache is None:
+            return read_file(file_path, columns)
+
+        return self.input_cache.read(file_path, columns)
+
+    def _extract_files(self, files: dict[str, list[str]]) -> dict[str, pd.DataFrame]:
+        """
+        Parse files, in parallel if `workers` is greater than 1, and concatenate the files sharing a name.
+
+        Parameters
+        ----------
+        files : dict[str, list[str]]
+            The paths of the files to extract for each file name, as returned by `_select_files`.
+
+        Returns
+        -------
+        dict[str, pd.DataFrame]
+            A dictionary containing the extracted data, in the same order whatever the number of workers.
+        """
+
+        files_paths = [file_path for paths in files.values() for file_path in paths]
+        columns = [
+            self.columns.get(remove_file_extension(file_path))
+            for file_path in files_paths
+        ]
+
+        if self.workers > 1:
+            with (
+                self.instrumentation.stage("files") as record,
+                ProcessPoolExecutor(max_workers=self.workers) as executor,
+            ):
+                dataframes = list(
+                    tqdm(
+                        # the ETL, with its callbacks and filters, is not sent to the workers
+                        executor.map(
+                            read_input_file,
+                            files_paths,
+                            columns,
+                            repeat(self.cache_path),
+                            repeat(self.cache_max_bytes),
+                        ),
+                        total=len(files_paths),
+                    )
+                )
+                record["rows_out"] = sum(len(dataframe) for dataframe in dataframes)
+        else:
+            dataframes = []
+            for file_path, file_columns in zip(tqdm(files_paths), columns):
+                with self.instrumentation.stage(os.path.basename(file_path)) as record:
+                    dataframes.append(self._read_file(file_path, file_columns))
+                    record["rows_out"] = len(dataframes[-1])
+
+        dataframes = iter(dataframes)
+        data = {}
+        for file_name, paths in files.items():
+            data[file_name] = self._filter_rows(
+                pd.concat([next(dataframes) for _ in paths]).reset_index(drop=True),
+                file_name,
+            )
+
+        return data
+
+    def _filter_rows(self, data: pd.DataFrame, table_name: str) -> pd.DataFrame:
+        """
+        Apply the row filters of a table, keeping the index of the rows so surrogate keys do not change.
 
         Parameters
         ----------
         data : pd.DataFrame
-            The data.
+            The rows of the table.
+        table_name : str
+            The table name.
+
+        Returns
+        -------
+        pd.DataFrame
+            The kept rows.
+        """
+
+        row_filters = self.row_filters.get(table_name, ())
+        if not row_filters or data.empty:
+            return data
+
+        with self.instrumentation.stage("filters", rows_in=len(data)) as record:
+            kept = pd.Series(True, index=data.index)
+            for row_filter in row_filters:
+                kept &= row_filter(data)
+            if not kept.all():
+                data = data.take(np.flatnonzero(kept.to_numpy(dtype=bool)))
+            record["rows_out"] = len(data)
+
+        return data
+
+    def _load(
+        self, data: pd.DataFrame | SpillingEdgeBuffer, if_exists: str = "replace"
+    ) -> bool:
+        """
+        Load the data to a graph-oriented JSON or JSON Lines file, to normalized columnar tables,
+        or to a SQLite database.
+        Files are written to a temporary path, renamed to the output path once complete,
+        and the database is loaded in a single transaction.
+        The query index is then written next to the output.
+
+        Spilled edges are merged from their partitions while they are written to a JSON or JSON Lines file,
+        without the query index, which needs the whole graph in memory.
+        They are merged into a DataFrame for the other outputs.
+
+        Parameters
+        ----------
+        data : pd.DataFrame | SpillingEdgeBuffer
+            The data, or the edge buffer if the edges were spilled to disk.
+        if_exists : str
+            "replace" or "append". Only used by the SQLite database, where appended edges are upserted.
+        """
+
+        if isinstance(data, SpillingEdgeBuffer):
+            with data:
+                if self.output_format not in OUTPUT_FORMATS:
+                    return self._load(data.to_dataframe(), if_exists)
+
+                return self._load_spilled_edges(data)
+
+        with self.instrumentation.stage("load", rows_in=len(data)) as record:
+            if self.output_format == DATABASE_FORMAT:
+                print("Loading data to SQLite database...")
+                write_database(data, self.output_path, if_exists)
+            elif self.output_format in NORMALIZED_FORMATS:
+                print(f"Loading data to {self.output_format} tables...")
+                write_normalized_tables(
+                    build_normalized_tables(data), self.output_path, self.output_format
+                )
+            else:
+                print("Loading data to JSON file...")
+                with JsonSink(self.output_path, self.output_format) as sink:
+                    sink.write_dataframe(data)
+            record["rows_out"] = len(data)
+
+        if self.write_index:
+            with self.instrumentation.stage("index", rows_in=len(data)):
+                QueryIndex.from_data(data).save(get_index_path(self.output_path))
+
+        print(f"Data loaded to {self.output_path} successfully.")
+
+        return True
+
+    def _load_spilled_edges(self, edges: SpillingEdgeBuffer) -> bool:
         """
+        Merge spilled edges into a JSON or JSON Lines file, holding one block of edges per partition in memory.
 
-        print("Loading data to JSON file...")
+        Parameters
+        ----------
+        edges : SpillingEdgeBuffer
+            The edge buffer.
+        """
 
-        data.to_json("data.json", orient="records", force_ascii=False, indent=4)
+        with self.instrumentation.stage("load", rows_in=len(edges)) as record:
+            print(f"Merging {len(edges.partitions)} partitions to JSON file...")
+            with JsonSink(self.output_path, self.output_format) as sink:
+                sink.write_records(edges.iter_edges())
+            record["rows_out"] = sink.records_count
 
-        print("Data loaded to data.json successfully.")
+        if self.write_index:
+            print(
+                "Warning: the query index is not written for spilled edges.",
+                file=sys.stderr,
+            )
+            index_path = get_index_path(self.output_path)
+            # an index of a previous output would not describe this one
+            for path in (
+                index_path,
+                get_edges_postings_path(index_path),
+                get_records_path(index_path),
+            ):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        print(f"Data loaded to {self.output_path} successfully.")
 
         return True
 
-    def _apply_technical_constraints(self, data: pd.DataFrame) -> pd.DataFrame:
+    def _read_output(self) -> pd.DataFrame:
+        """
+        Read the graph-oriented DataFrame loaded by a previous run.
+
+        Returns
+        -------
+        pd.DataFrame
+            The graph-oriented DataFrame.
+        """
+
+        if self.output_format == DATABASE_FORMAT:
+            return read_database(self.output_path)
+        if self.output_format in NORMALIZED_FORMATS:
+            return denormalize_tables(read_normalized_tables(self.output_path))
+
+        return read_json(self.output_path)
+
+    def _apply_technical_constraints(
+        self, data: pd.DataFrame, table_name: str
+    ) -> pd.DataFrame:
         """
         Apply technical constraints to the data.
+        - Drop duplicates by keys, across files and chunks
         - Force column types
         - Drop duplicates
 
@@ -143,6 +968,8 @@ class ETL:
         ----------
         data : pd.DataFrame
             The data.
+        table_name : str
+            The table name, which gives the deduplication keys.
 
         Returns
         -------
@@ -150,22 +977,33 @@ class ETL:
             The data with the applied constraints.
         """
 
-        data = self._force_column_types(data)
-        data = data.drop_duplicates()
+        with self.instrumentation.stage("keys", rows_in=len(data)) as record:
+            data = self.deduplicator.deduplicate(data, table_name)
+            record["rows_out"] = len(data)
+        with self.instrumentation.stage("types", rows_in=len(data)):
+            data = self._force_column_types(data)
+        with self.instrumentation.stage("duplicates", rows_in=len(data)) as record:
+            data = data.drop_duplicates()
+            record["rows_out"] = len(data)
 
         return data
 
-    def _apply_functional_constraints_(self, data: pd.DataFrame) -> pd.DataFrame:
+    def _apply_functional_constraints_(
+        self, data: pd.DataFrame, table_name: str | None = None
+    ) -> pd.DataFrame:
         """
         Apply functional constraints to the data.
-        - Add a surrerogate key
         - Normalize date formats
         - Remove non utf_8 characters
+        - Add a surrerogate key, from the cleaned business columns
 
         Parameters
         ----------
         data : pd.DataFrame
             The data.
+        table_name : str | None
+            The table name, which gives the business columns of the surrogate key.
+            All columns are hashed if None or if the table has no business columns.
 
         Returns
         -------
@@ -173,15 +1011,40 @@ class ETL:
             The data with the applied constraints.
         """
 
-        data = self._add_surrogate_key(data)
-        data = self._normalize_date_formats(data)
-        data = self._remove_non_utf_8_characters(data)
+        with self.instrumentation.stage("dates", rows_in=len(data)):
+            data = self._normalize_date_formats(data)
+        with self.instrumentation.stage("text_cleaning", rows_in=len(data)):
+            data = self._remove_non_utf_8_characters(data)
+        with self.instrumentation.stage("surrogate_keys", rows_in=len(data)):
+            data = self._add_surrogate_key(data, table_name)
 
         return data
 
+    def _print_memory_report(
+        self, memory_usage_before: dict[str, int], memory_usage_after: dict[str, int]
+    ) -> None:
+        """
+        Print the memory used by each table before and after the transformations.
+
+        Parameters
+        ----------
+        memory_usage_before : dict[str, int]
+            The number of bytes used by each extracted table.
+        memory_usage_after : dict[str, int]
+            The number of bytes used by each transformed table.
+        """
+
+        print("Memory usage by table:")
+        for table_name, bytes_before in memory_usage_before.items():
+            bytes_after = memory_usage_after[table_name]
+            print(
+                f"- {table_name}: {bytes_before:,} bytes -> {bytes_after:,} bytes "
+                f"({bytes_before / max(bytes_after, 1):.1f}x smaller)"
+            )
+
     def _create_graph_oriented_dataframe(
         self, data: dict[str, pd.DataFrame]
-    ) -> pd.DataFrame:
+    ) -> pd.DataFrame | SpillingEdgeBuffer:
         """
         Create a graph-oriented pandas DataFrame from the data.
 
@@ -192,8 +1055,8 @@ class ETL:
 
         Returns
         -------
-        pd.DataFrame
-            The graph-oriented pandas DataFrame.
+        pd.DataFrame | SpillingEdgeBuffer
+            The graph-oriented pandas DataFrame, or the edge buffer if the edges were spilled to disk.
         """
         drug_nodes = [drug for drug in data["drugs"]["drug"]]
         pubmed_articles_nodes = [
@@ -206,43 +1069,98 @@ class ETL:
 
         articles_nodes = pubmed_articles_nodes + clinical_trials_nodes
 
-        graph_dataframe = pd.DataFrame()
-        for drug in drug_nodes:
-            for article in articles_nodes:
-                if drug.lower() in article.lower():
-                    journal = get_article_journal_from_data(data, article)
-                    date = get_article_date_from_data(data, article)
-
-                    graph_dataframe = pd.concat(
-                        [
-                            graph_dataframe,
-                            pd.DataFrame(
-                                data=[
-                                    {
-                                        "drug": get_drug_info_from_name(drug, data),
-                                        "article": get_article_info_from_name(
-                                            article, data
-                                        ),
-                                        "journal": journal,
-                                        "relationship": "REFERENCED IN",
-                                        "date": date,
-                                    }
-                                ]
-                            ),
-                        ],
-                        ignore_index=True,
+        # scan each article once, then walk matches drug by drug to keep the output order
+        with (
+            self._create_matcher(drug_nodes) as matcher,
+            self.instrumentation.stage(
+                "matching", rows_in=len(articles_nodes)
+            ) as record,
+        ):
+            articles_per_drug = matcher.match(articles_nodes)
+            record["rows_out"] = sum(len(indexes) for indexes in articles_per_drug)
+
+        # edges join drugs and articles on their surrogate keys, not on their names
+        drugs_keys = data["drugs"][SURROGATE_KEY_COLUMN].tolist()
+        articles_keys = [
+            (table_name, key)
+            for table_name in ARTICLES_TITLE_COLUMNS
+            for key in data[table_name][SURROGATE_KEY_COLUMN].tolist()
+        ]
+
+        with self.instrumentation.stage("edges", rows_in=record["rows_out"]) as record:
+            catalog = Catalog(data)
+            edges = self._create_edge_buffer()
+            for drug_position, (drug_key, articles_indexes) in enumerate(
+                zip(drugs_keys, articles_per_drug)
+            ):
+                for article_index in articles_indexes:
+                    edges.append(
+                        create_edge(
+                            catalog.get_record("drugs", drug_key),
+                            catalog.get_record(*articles_keys[article_index]),
+                        ),
+                        (drug_position, len(edges)),
                     )
+            record["rows_out"] = len(edges)
+
+        return self._get_edges(edges)
+
+    def _create_edge_buffer(self) -> SpillingEdgeBuffer:
+        """
+        Create the buffer of the matched edges, spilled to disk past `max_edges_in_memory` edges.
+
+        Returns
+        -------
+        SpillingEdgeBuffer
+            The edge buffer.
+        """
+
+        return SpillingEdgeBuffer(
+            ["drug", "article", "journal", "relationship", "date"],
+            self.max_edges_in_memory,
+            self.spill_path,
+        )
+
+    def _get_edges(
+        self, edges: SpillingEdgeBuffer
+    ) -> pd.DataFrame | SpillingEdgeBuffer:
+        """
+        Get the transformed edges: the buffer itself if it was spilled, to be merged while loading,
+        or else the edges as a DataFrame.
+
+        Parameters
+        ----------
+        edges : SpillingEdgeBuffer
+            The edge buffer.
+
+        Returns
+        -------
+        pd.DataFrame | SpillingEdgeBuffer
+            The edges.
+        """
+
+        if edges.partitions:
+            print(
+                f"{len(edges):,} edges spilled to {len(edges.partitions)} partitions."
+            )
+            return edges
 
-        return graph_dataframe
+        with edges:
+            return edges.to_dataframe()
 
-    def _add_surrogate_key(self, data: pd.DataFrame) -> pd.DataFrame:
+    def _add_surrogate_key(
+        self, data: pd.DataFrame, table_name: str | None = None
+    ) -> pd.DataFrame:
         """
-        Add a surrogate key to the data.
+        Add a surrogate key to the data: a 64-bit hash of its business columns,
+        stable across files, chunks and runs. Tables without business columns are hashed on all their columns.
 
         Parameters
         ----------
         data : pd.DataFrame
             The data.
+        table_name : str | None
+            The table name.
 
         Returns
         -------
@@ -250,13 +1168,15 @@ class ETL:
             The data with the surrogate key.
         """
 
-        data.insert(0, "surrerogate_id", data.index)
+        columns = self.surrogate_keys.get(table_name, tuple(data.columns))
+        data.insert(0, SURROGATE_KEY_COLUMN, hash_keys(data, columns))
 
         return data
 
     def _normalize_date_formats(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Normalize dates to the format DD-MM-YYYY.
+        Each distinct date is parsed once per ETL instance, and unparseable dates are reported on stderr.
 
         Parameters
         ----------
@@ -269,21 +1189,26 @@ class ETL:
             The data with the normalized format dates.
         """
 
-        try:
-            data["date"] = (
-                pd.to_datetime(data["date"], dayfirst=True, format="mixed")
-                .apply(lambda x: x.strftime("%d-%m-%Y"))
-                .astype(str)
-            )
-        except KeyError:
-            # if date column is not present, do nothing
+        if "date" not in data.columns:
             return data
 
+        unparseable_dates_count = len(self.date_normalizer.unparseable_dates)
+        data["date"] = self.date_normalizer.normalize(data["date"])
+
+        if len(self.date_normalizer.unparseable_dates) > unparseable_dates_count:
+            print(
+                f"Warning: dates could not be parsed and were kept as is: "
+                f"{sorted(self.date_normalizer.unparseable_dates)}",
+                file=sys.stderr,
+            )
+
         return data
 
     def _remove_non_utf_8_characters(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Remove non utf_8 characters.
+        Literal escape sequences are decoded, or dropped if they are not valid UTF-8,
+        and the text around them is kept.
 
         Parameters
         ----------
@@ -296,11 +1221,7 @@ class ETL:
             The data with the removed non utf_8 characters.
         """
 
-        for column in data.columns:
-            if data[column].dtype == object:
-                data[column] = data[column].apply(lambda x: x.split("\\")[0])
-
-        return data
+        return self.text_cleaner.clean(data)
 
     def _force_column_types(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         """
@@ -318,82 +1239,9 @@ class ETL:
         """
 
         for column in dataframe:
-            dataframe[column] = dataframe[column].astype(ColumnTypesEnum[column].value)
+            # going through str first keeps missing values as "nan" texts
+            dataframe[column] = (
+                dataframe[column].astype(str).astype(ColumnTypesEnum[column].value)
+            )
 
         return dataframe
-
-    def _extract_data_from_csv_(
-        self, data: dict[str, pd.DataFrame], file_path: str, if_exists: str
-    ) -> pd.DataFrame:
-        """
-        Extract data from a CSV file.
-
-        Parameters
-        ----------
-        data : dict[str, pd.DataFrame]
-            The dictionary containing the data.
-        file_path : str
-            The path to the file.
-        if_exists : str
-            The action to be taken if the dataframe already exists in the dictionary.
-            Possible values: "append", "replace", "ignore".
-
-        Returns
-        -------
-        pd.DataFrame
-            The extracted data.
-        """
-
-        file_name = remove_file_extension(file_path)
-        if remove_file_extension(file_name) in data.keys():
-            match if_exists:
-                case "append":
-                    data[file_name] = pd.concat(
-                        [data[file_name], pd.read_csv(file_path)]
-                    ).reset_index(drop=True)
-                case "replace":
-                    data[file_name] = pd.read_csv(file_path)
-                case "ignore":
-                    pass
-        else:
-            data[file_name] = pd.read_csv(file_path)
-
-        return data
-
-    def _extract_data_from_json_(
-        self, data: dict[str, pd.DataFrame], file_path: str, if_exists: str
-    ) -> pd.DataFrame:
-        """
-        Extract data from a JSON file.
-
-        Parameters
-        ----------
-        data : dict[str, pd.DataFrame]
-            The dictionary containing the data.
-        file_path : str
-            The path to the file.
-        if_exists : str
-            The action to be taken if the dataframe already exists in the dictionary.
-            Possible values: "append", "replace", "ignore".
-
-        Returns
-        -------
-        pd.DataFrame
-            The extracted data.
-        """
-
-        file_name = remove_file_extension(file_path)
-        if remove_file_extension(file_name) in data.keys():
-            match if_exists:
-                case "append":
-                    data[file_name] = pd.concat(
-                        [data[file_name], pd.read_json(file_path)]
-                    ).reset_index(drop=True)
-                case "replace":
-                    data[file_name] = pd.read_json(file_path)
-                case "ignore":
-                    pass
-        else:
-            data[file_name] = pd.read_json(file_path)
-
-        return data
@@ -0,0 +1,651 @@
+"""
+This file contains the QueryIndex class, a sidecar index written next to the ETL output
+to answer questions about the graph without parsing the whole output.
+"""
+
+import json
+import os
+from typing import TYPE_CHECKING
+
+# pandas is only needed to build the index and to aggregate it, so loading it stays fast for the command line
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+INDEX_VERSION = 3
+RECORDS_TABLES = ("drugs", "articles")
+
+
+class QueryIndex:
+    def __init__(
+        self,
+        drug_names: list[str],
+        journals: list[str],
+        journal_drugs: dict[str, list[int]],
+        edges_postings: "EdgesPostings | FileEdgesPostings",
+    ):
+        """
+        Index over the edges of the graph.
+
+        Drugs, articles and journals are stored once, and referenced by their position in the edges and postings.
+        The journals postings, which rank the journals, are kept apart from the postings of the edges,
+        only read by the queries needing them. The drugs and articles records are read by the queries returning them.
+
+        Parameters
+        ----------
+        drug_names : list[str]
+            The name of each distinct drug. Several drugs, with different ATC codes, may share a name.
+        journals : list[str]
+            The distinct journals names.
+        journal_drugs : dict[str, list[int]]
+            The positions of the distinct drugs referenced by each journal, keyed by journal name.
+        edges_postings : EdgesPostings | FileEdgesPostings
+            The postings of the edges, and the drugs and articles records.
+        """
+
+        self.drug_names = drug_names
+        self.journals = journals
+        self.journal_drugs = journal_drugs
+        self.edges_postings = edges_postings
+
+        self._drugs_by_name: dict[str, list[int]] = {}
+        for position, name in enumerate(drug_names):
+            self._drugs_by_name.setdefault(name, []).append(position)
+
+    @property
+    def edges(self) -> dict[str, list[int]]:
+        """
+        The "drug", "article" and "journal" positions of each edge, in the order of the output.
+        """
+
+        return self.edges_postings.load().edges
+
+    @property
+    def drug_articles(self) -> list[list[int]]:
+        """
+        The positions of the distinct articles referencing each drug, by drug position.
+        """
+
+        return self.edges_postings.load().drug_articles
+
+    @property
+    def date_edges(self) -> dict[str, list[int]]:
+        """
+        The positions of the edges of each date. Edges without a date are left out.
+        """
+
+        return self.edges_postings.load().date_edges
+
+    @property
+    def records(self) -> "MemoryRecords | FileRecords":
+        """
+        The drugs and articles info, by position.
+        """
+
+        return self.edges_postings.load().records
+
+    @classmethod
+    def from_data(cls, data: "pd.DataFrame") -> "QueryIndex":
+        """
+        Build the index of the graph-oriented DataFrame.
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            The graph-oriented DataFrame, with one nested drug and article record per edge.
+
+        Returns
+        -------
+        QueryIndex
+            The index.
+        """
+
+        import pandas as pd
+
+        from etl.keys import SURROGATE_KEY_COLUMN
+        from etl.normalized import build_normalized_tables, records_by_key
+
+        tables = build_normalized_tables(data)
+        journals = tables["journals"]["journal"].tolist()
+
+        # postings hold positions in the node tables, which keep the order of first appearance
+        edges = pd.DataFrame(
+            {
+                "drug": _get_positions(
+                    tables["edges"]["drug_key"], tables["drugs"][SURROGATE_KEY_COLUMN]
+                ),
+                "article": _get_positions(
+                    tables["edges"]["article_key"],
+                    tables["articles"][SURROGATE_KEY_COLUMN],
+                ),
+                "journal": _get_positions(
+                    tables["edges"]["journal_key"], tables["journals"]["journal_key"]
+                ),
+                "date": tables["edges"]["date"],
+            }
+        )
+        drugs = records_by_key(tables["drugs"], SURROGATE_KEY_COLUMN).tolist()
+
+        # groups keep the order of first appearance, so postings follow the output order
+        drug_articles = edges.groupby("drug", sort=False)["article"].unique()
+        journal_drugs = edges.groupby("journal", sort=False)["drug"].unique()
+        date_edges = edges.groupby("date", sort=False, observed=True).indices
+
+        return cls(
+            drug_names=[drug.get("drug") for drug in drugs],
+            journals=journals,
+            journal_drugs={
+                journals[journal]: drugs_positions.tolist()
+                for journal, drugs_positions in journal_drugs.items()
+            },
+            edges_postings=EdgesPostings(
+                edges={
+                    "drug": edges["drug"].tolist(),
+                    "article": edges["article"].tolist(),
+                    "journal": edges["journal"].tolist(),
+                },
+                drug_articles=[
+                    drug_articles[drug].tolist() if drug in drug_articles else []
+                    for drug in range(len(drugs))
+                ],
+                date_edges={
+                    str(date): positions.tolist()
+                    for date, positions in date_edges.items()
+                },
+                records=MemoryRecords(
+                    {
+                        "drugs": drugs,
+                        "articles": records_by_key(
+                            tables["articles"], SURROGATE_KEY_COLUMN
+                        ).tolist(),
+                    }
+                ),
+            ),
+        )
+
+    @classmethod
+    def load(cls, index_path: str) -> "QueryIndex":
+        """
+        Load the journals postings of an index from a JSON file.
+        The postings of the edges and the records are read from their files when queried.
+
+        Parameters
+        ----------
+        index_path : str
+            The path to the index file.
+
+        Returns
+        -------
+        QueryIndex
+            The loaded index.
+        """
+
+        content = _read_postings(index_path)
+
+        return cls(
+            drug_names=content["drug_names"],
+            journals=content["journals"],
+            journal_drugs=content["journal_drugs"],
+            edges_postings=FileEdgesPostings(index_path),
+        )
+
+    def save(self, index_path: str) -> None:
+        """
+        Save the journals postings to a JSON file, and the postings of the edges and the records to files next to it,
+        replacing each atomically. The index file is replaced last, so it always references existing files.
+
+        Parameters
+        ----------
+        index_path : str
+            The path to the index file.
+        """
+
+        records_path = get_records_path(index_path)
+        temporary_path = records_path + ".tmp"
+        records_offsets = {}
+        with open(temporary_path, "wb") as f:
+            for table_name in RECORDS_TABLES:
+                records_offsets[table_name] = []
+                records = self.records.get(
+                    table_name, range(self.records.count(table_name))
+                )
+                for record in records:
+                    records_offsets[table_name].append(f.tell())
+                    f.write(json.dumps(record, ensure_ascii=False).encode() + b"\n")
+        os.replace(temporary_path, records_path)
+
+        _write_postings(
+            get_edges_postings_path(index_path),
+            {
+                "edges": self.edges,
+                "drug_articles": self.drug_articles,
+                "date_edges": self.date_edges,
+                "records_offsets": records_offsets,
+            },
+        )
+        _write_postings(
+            index_path,
+            {
+                "drug_names": self.drug_names,
+                "journals": self.journals,
+                "journal_drugs": self.journal_drugs,
+            },
+        )
+
+    def get_articles_citing(self, drug: str) -> list[dict]:
+        """
+        Get the articles referencing a drug.
+
+        Parameters
+        ----------
+        drug : str
+            The drug name. The articles of all the drugs sharing this name are merged.
+
+        Returns
+        -------
+        list[dict]
+            The distinct articles info, empty if the drug is not referenced.
+        """
+
+        positions = dict.fromkeys(
+            position
+            for drug_position in self._drugs_by_name.get(drug, [])
+            for position in self.drug_articles[drug_position]
+        )
+
+        return self.records.get("articles", positions)
+
+    def get_journal_drugs(self, journal: str) -> list[str]:
+        """
+        Get the distinct drugs referenced by a journal.
+
+        Parameters
+        ----------
+        journal : str
+            The journal name.
+
+        Returns
+        -------
+        list[str]
+            The drugs names, empty if the journal is not in the graph.
+        """
+
+        return [
+            self.drug_names[position]
+            for position in self.journal_drugs.get(journal, [])
+        ]
+
+    def get_edges_on(self, date: str) -> list[dict]:
+        """
+        Get the edges of a date.
+
+        Parameters
+        ----------
+        date : str
+            The date, in the normalized format of the output.
+
+        Returns
+        -------
+        list[dict]
+            The drug, article and journal of each edge.
+        """
+
+        positions = self.date_edges.get(date, [])
+        drugs = self.records.get(
+            "drugs", [self.edges["drug"][position] for position in positions]
+        )
+        articles = self.records.get(
+            "articles", [self.edges["article"][position] for position in positions]
+        )
+
+        return [
+            {
+                "drug": drug,
+                "article": article,
+                "journal": self.journals[self.edges["journal"][position]],
+                "date": date,
+            }
+            for position, drug, article in zip(positions, drugs, articles)
+        ]
+
+    def rank_journals(self) -> list[tuple[str, int]]:
+        """
+        Rank the journals by number of distinct drugs referenced.
+        Ties keep the order of the output.
+
+        Returns
+        -------
+        list[tuple[str, int]]
+            The journals names and their number of distinct drugs, from the most to the least.
+        """
+
+        return sorted(
+            ((journal, len(drugs)) for journal, drugs in self.journal_drugs.items()),
+            key=lambda ranking: ranking[1],
+            reverse=True,
+        )
+
+    def count_drugs_per_journal_per_month(self) -> "pd.DataFrame":
+        """
+        Count the distinct drugs referenced by each journal each month.
+        Edges with a date not in the normalized format are left out.
+
+        Returns
+        -------
+        pd.DataFrame
+            The "journal", "month" (YYYY-MM) and "drugs" count columns, sorted by journal and month.
+        """
+
+        import pandas as pd
+
+        from etl.dates import NORMALIZED_DATE_FORMAT
+
+        dates = pd.Series(list(self.date_edges))
+        months = (
+            pd.to_datetime(dates, format=NORMALIZED_DATE_FORMAT, errors="coerce")
+            .dt.strftime("%Y-%m")
+            .tolist()
+        )
+
+        edges_months = [None] * len(self.edges["drug"])
+        for month, positions in zip(months, self.date_edges.values()):
+            for position in positions:
+                edges_months[position] = month
+
+        edges = pd.DataFrame(
+            {
+                "journal": [self.journals[key] for key in self.edges["journal"]],
+                "month": edges_months,
+                "drug": self.edges["drug"],
+            }
+        ).dropna(subset=["month"])
+
+        return (
+            edges.groupby(["journal", "month"])["drug"]
+            .nunique()
+            .rename("drugs")
+            .reset_index()
+        )
+
+
+class EdgesPostings:
+    def __init__(
+        self,
+        edges: dict[str, list[int]],
+        drug_articles: list[list[int]],
+        date_edges: dict[str, list[int]],
+        records: "MemoryRecords | FileRecords",
+    ):
+        """
+        Postings of the edges of an index, with the drugs and articles records they reference.
+
+        Parameters
+        ----------
+        edges : dict[str, list[int]]
+            The "drug", "article" and "journal" positions of each edge, in the order of the output.
+        drug_articles : list[list[int]]
+            The positions of the distinct articles referencing each drug, by drug position.
+        date_edges : dict[str, list[int]]
+            The positions of the edges of each date. Edges without a date are left out.
+        records : MemoryRecords | FileRecords
+            The drugs and articles info, by position.
+        """
+
+        self.edges = edges
+        self.drug_articles = drug_articles
+        self.date_edges = date_edges
+        self.records = records
+
+    def load(self) -> "EdgesPostings":
+        """
+        Get the postings, already in memory.
+        """
+
+        return self
+
+
+class FileEdgesPostings:
+    def __init__(self, index_path: str):
+        """
+        Postings of the edges of a saved index, read from their JSON file by the first query needing them.
+
+        Parameters
+        ----------
+        index_path : str
+            The path to the index file.
+        """
+
+        self.index_path = index_path
+        self._postings: EdgesPostings | None = None
+
+    def load(self) -> EdgesPostings:
+        """
+        Read the postings, once.
+
+        Returns
+        -------
+        EdgesPostings
+            The postings, whose records are read from their file when queried.
+        """
+
+        if self._postings is None:
+            content = _read_postings(get_edges_postings_path(self.index_path))
+            self._postings = EdgesPostings(
+                edges=content["edges"],
+                drug_articles=content["drug_articles"],
+                date_edges=content["date_edges"],
+                records=FileRecords(
+                    get_records_path(self.index_path), content["records_offsets"]
+                ),
+            )
+
+        return self._postings
+
+
+class MemoryRecords:
+    def __init__(self, records: dict[str, list[dict]]):
+        """
+        Drugs and articles records of an index built in memory.
+
+        Parameters
+        ----------
+        records : dict[str, list[dict]]
+            The records of the "drugs" and "articles" tables, by position.
+        """
+
+        self.records = records
+
+    def count(self, table_name: str) -> int:
+        """
+        Count the records of a table.
+        """
+
+        return len(self.records[table_name])
+
+    def get(self, table_name: str, positions) -> list[dict]:
+        """
+        Get copies of the records at some positions of a table.
+
+        Parameters
+        ----------
+        table_name : str
+            "drugs" or "articles".
+        positions : Iterable[int]
+            The positions.
+
+        Returns
+        -------
+        list[dict]
+            The records.
+        """
+
+        return [dict(self.records[table_name][position]) for position in positions]
+
+
+class FileRecords:
+    def __init__(self, records_path: str, offsets: dict[str, list[int]]):
+        """
+        Drugs and articles records of a saved index, read from their JSON Lines file when queried.
+
+        Parameters
+        ----------
+        records_path : str
+            The path to the records file.
+        offsets : dict[str, list[int]]
+            The byte offset of each record of the "drugs" and "articles" tables in the file, by position.
+        """
+
+        self.records_path = records_path
+        self.offsets = offsets
+
+    def count(self, table_name: str) -> int:
+        """
+        Count the records of a table.
+        """
+
+        return len(self.offsets[table_name])
+
+    def get(self, table_name: str, positions) -> list[dict]:
+        """
+        Read the records at some positions of a table.
+
+        Parameters
+        ----------
+        table_name : str
+            "drugs" or "articles".
+        positions : Iterable[int]
+            The positions.
+
+        Returns
+        -------
+        list[dict]
+            The records.
+        """
+
+        records = []
+        with open(self.records_path, "rb") as f:
+            for position in positions:
+                f.seek(self.offsets[table_name][position])
+                records.append(json.loads(f.readline()))
+
+        return records
+
+
+def _get_positions(keys: "pd.Series", table_keys: "pd.Series") -> "np.ndarray":
+    """
+    Get the positions in a normalized table of the rows referenced by keys.
+
+    Parameters
+    ----------
+    keys : pd.Series
+        The referencing keys.
+    table_keys : pd.Series
+        The keys of the table.
+
+    Returns
+    -------
+    np.ndarray
+        The position of the row of each key.
+    """
+
+    import pandas as pd
+
+    return pd.Index(table_keys).get_indexer(keys)
+
+
+def _read_postings(postings_path: str) -> dict:
+    """
+    Read a postings file of an index, checking it was written by the current index version.
+
+    Parameters
+    ----------
+    postings_path : str
+        The path to the postings file.
+
+    Returns
+    -------
+    dict
+        The postings, without the version.
+    """
+
+    with open(postings_path, "r", encoding="UTF-8") as f:
+        content = json.load(f)
+
+    if content.pop("version", None) != INDEX_VERSION:
+        raise ValueError(
+            f"Index {postings_path} is outdated. Run the ETL again to rebuild it."
+        )
+
+    return content
+
+
+def _write_postings(postings_path: str, postings: dict) -> None:
+    """
+    Write a postings file of an index atomically, with the current index version.
+
+    Parameters
+    ----------
+    postings_path : str
+        The path to the postings file.
+    postings : dict
+        The postings.
+    """
+
+    temporary_path = postings_path + ".tmp"
+    with open(temporary_path, "w", encoding="UTF-8") as f:
+        json.dump({"version": INDEX_VERSION, **postings}, f, ensure_ascii=False)
+    os.replace(temporary_path, postings_path)
+
+
+def get_index_path(output_path: str) -> str:
+    """
+    Get the path of the query index of an output file or folder.
+
+    Parameters
+    ----------
+    output_path : str
+        The path to the output file or folder.
+
+    Returns
+    -------
+    str
+        The index path, next to the output.
+    """
+
+    return os.path.splitext(output_path.rstrip(os.sep))[0] + ".index.json"
+
+
+def get_records_path(index_path: str) -> str:
+    """
+    Get the path of the records file of a query index.
+
+    Parameters
+    ----------
+    index_path : str
+        The path to the index file.
+
+    Returns
+    -------
+    str
+        The records path, next to the index.
+    """
+
+    return os.path.splitext(index_path)[0] + ".records.jsonl"
+
+
+def get_edges_postings_path(index_path: str) -> str:
+    """
+    Get the path of the postings of the edges of a query index.
+
+    Parameters
+    ----------
+    index_path : str
+        The path to the index file.
+
+    Returns
+    -------
+    str
+        The postings path, next to the index.
+    """
+
+    return os.path.splitext(index_path)[0] + ".edges.json"
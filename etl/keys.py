@@ -0,0 +1,190 @@
+"""
+This file contains the functions computing the surrogate keys of drugs and articles,
+stable 64-bit integers derived from their business columns.
+"""
+
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+
+SURROGATE_KEY_COLUMN = "surrerogate_id"
+# the business columns of each table, whitespace and case aside
+SURROGATE_KEYS = {
+    "drugs": ("atccode", "drug"),
+    "pubmed": ("id", "title"),
+    "clinical_trials": ("id", "scientific_title"),
+}
+# a control character, dropped by text cleaning, so ("a b", "c") and ("a", "b c") give different keys
+KEY_SEPARATOR = "\x1f"
+
+
+def hash_keys(data: pd.DataFrame, columns: tuple[str, ...]) -> np.ndarray:
+    """
+    Compute the surrogate keys of the rows of a table.
+
+    Keys only depend on the normalized values of the business columns, so they are the same
+    whatever the file, the chunk or the run a row comes from. Missing columns count as empty texts.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The rows.
+    columns : tuple[str, ...]
+        The business columns.
+
+    Returns
+    -------
+    np.ndarray
+        The signed 64-bit keys, which fit in JSON, Parquet and SQLite integers.
+    """
+
+    texts = _get_key_texts(data, columns)
+    keys = (
+        pd.util.hash_pandas_object(texts, index=False, categorize=False)
+        .to_numpy()
+        .view(np.int64)
+    )
+    _check_collisions(keys, texts.to_numpy())
+
+    return keys
+
+
+def get_record_key(record: dict, columns: tuple[str, ...]) -> int:
+    """
+    Get the surrogate key of a drug or article record, computed again if the record does not hold it.
+
+    Parameters
+    ----------
+    record : dict
+        The record, as found in the output edges.
+    columns : tuple[str, ...]
+        The business columns.
+
+    Returns
+    -------
+    int
+        The surrogate key.
+    """
+
+    if SURROGATE_KEY_COLUMN in record:
+        return int(record[SURROGATE_KEY_COLUMN])
+
+    return int(hash_keys(pd.DataFrame([record]), columns)[0])
+
+
+def get_records_keys(
+    records: list[dict], get_columns: Callable[[dict], tuple[str, ...]]
+) -> list[int]:
+    """
+    Get the surrogate keys of drug or article records, computing in bulk those the records do not hold.
+
+    Parameters
+    ----------
+    records : list[dict]
+        The records, as found in the output edges.
+    get_columns : Callable[[dict], tuple[str, ...]]
+        The function giving the business columns of a record.
+
+    Returns
+    -------
+    list[int]
+        The surrogate key of each record.
+    """
+
+    keys = [record.get(SURROGATE_KEY_COLUMN) for record in records]
+
+    missing_positions: dict[tuple[str, ...], list[int]] = {}
+    for position, (record, key) in enumerate(zip(records, keys)):
+        if key is None:
+            missing_positions.setdefault(get_columns(record), []).append(position)
+    for columns, positions in missing_positions.items():
+        missing_keys = hash_keys(
+            pd.DataFrame([records[position] for position in positions]), columns
+        )
+        for position, key in zip(positions, missing_keys.tolist()):
+            keys[position] = key
+
+    return [int(key) for key in keys]
+
+
+def get_article_key_columns(article: dict) -> tuple[str, ...]:
+    """
+    Get the business columns of an article record, from the title column it holds.
+
+    Parameters
+    ----------
+    article : dict
+        The article record.
+
+    Returns
+    -------
+    tuple[str, ...]
+        The business columns.
+    """
+
+    if "scientific_title" in article:
+        return SURROGATE_KEYS["clinical_trials"]
+
+    return SURROGATE_KEYS["pubmed"]
+
+
+def _get_key_texts(data: pd.DataFrame, columns: tuple[str, ...]) -> pd.Series:
+    """
+    Join the normalized business columns of each row: whitespace collapsed and case folded.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The rows.
+    columns : tuple[str, ...]
+        The business columns.
+
+    Returns
+    -------
+    pd.Series
+        The key text of each row, with a default index.
+    """
+
+    texts = [
+        pd.Series(data[column].to_numpy(), dtype=object)
+        .astype(str)
+        .str.split()
+        .str.join(" ")
+        .str.casefold()
+        if column in data
+        else pd.Series("", index=range(len(data)), dtype=object)
+        for column in columns
+    ]
+
+    return texts[0].str.cat(texts[1:], sep=KEY_SEPARATOR)
+
+
+def _check_collisions(keys: np.ndarray, texts: np.ndarray) -> None:
+    """
+    Raise an error if different key texts have the same key.
+    Only rows sharing a key are compared, so the check is a sort of the keys when there is no duplicate.
+
+    Parameters
+    ----------
+    keys : np.ndarray
+        The keys.
+    texts : np.ndarray
+        The key texts.
+    """
+
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    same_keys = np.flatnonzero(sorted_keys[1:] == sorted_keys[:-1])
+    if not len(same_keys):
+        return
+
+    first_texts = texts[order[same_keys]]
+    second_texts = texts[order[same_keys + 1]]
+    collisions = first_texts != second_texts
+    if collisions.any():
+        raise ValueError(
+            "Surrogate keys collide for "
+            f"{list(zip(first_texts[collisions], second_texts[collisions]))[:5]}. "
+            "Add business columns to the keys of the table."
+        )
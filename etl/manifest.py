@@ -0,0 +1,192 @@
+"""
+This file contains the Manifest class, used to track the input files processed by previous ETL runs.
+"""
+
+import hashlib
+import json
+import os
+
+# bumped when the articles keys change, so older manifests trigger a full rebuild
+MANIFEST_VERSION = 2
+
+
+class Manifest:
+    def __init__(
+        self, files: dict[str, dict] | None = None, options: dict | None = None
+    ):
+        """
+        Persisted state of an ETL run.
+
+        For each input file, the manifest holds its size, modification time, content hash
+        and the keys of the articles it contributed to the output.
+
+        Parameters
+        ----------
+        files : dict[str, dict] | None
+            The entries of the input files, keyed by file path.
+        options : dict | None
+            The ETL options the output was built with. A change of options invalidates the output.
+        """
+
+        self.files = files or {}
+        self.options = options or {}
+
+    @classmethod
+    def load(cls, manifest_path: str) -> "Manifest":
+        """
+        Load a manifest from a JSON file. A missing or outdated file gives an empty manifest.
+
+        Parameters
+        ----------
+        manifest_path : str
+            The path to the manifest file.
+
+        Returns
+        -------
+        Manifest
+            The loaded manifest.
+        """
+
+        try:
+            with open(manifest_path, "r", encoding="UTF-8") as f:
+                content = json.load(f)
+        except FileNotFoundError:
+            return cls()
+
+        if content.get("version") != MANIFEST_VERSION:
+            return cls()
+
+        return cls(content["files"], content["options"])
+
+    def save(self, manifest_path: str) -> None:
+        """
+        Save the manifest to a JSON file, replacing it atomically.
+
+        Parameters
+        ----------
+        manifest_path : str
+            The path to the manifest file.
+        """
+
+        temporary_path = manifest_path + ".tmp"
+        with open(temporary_path, "w", encoding="UTF-8") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "options": self.options,
+                    "files": self.files,
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(temporary_path, manifest_path)
+
+    def add_file(self, file_path: str, previous: "Manifest") -> None:
+        """
+        Add the fingerprint of an input file to the manifest.
+        The content hash is reused from the previous manifest when size and modification time did not change.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the file.
+        previous : Manifest
+            The manifest of the previous run.
+        """
+
+        stat = os.stat(file_path)
+        entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+        previous_entry = previous.files.get(file_path)
+
+        if previous_entry and all(
+            previous_entry[key] == value for key, value in entry.items()
+        ):
+            entry["sha256"] = previous_entry["sha256"]
+        else:
+            entry["sha256"] = hash_file(file_path)
+
+        entry["articles"] = previous_entry["articles"] if previous_entry else []
+        self.files[file_path] = entry
+
+    def get_changed_files(self, previous: "Manifest") -> list[str]:
+        """
+        Get the files which are new or whose content changed since the previous run.
+
+        Parameters
+        ----------
+        previous : Manifest
+            The manifest of the previous run.
+
+        Returns
+        -------
+        list[str]
+            The paths of the new or changed files.
+        """
+
+        return [
+            file_path
+            for file_path, entry in self.files.items()
+            if previous.files.get(file_path, {}).get("sha256") != entry["sha256"]
+        ]
+
+    def get_deleted_files(self, previous: "Manifest") -> list[str]:
+        """
+        Get the files of the previous run which are not inputs anymore.
+
+        Parameters
+        ----------
+        previous : Manifest
+            The manifest of the previous run.
+
+        Returns
+        -------
+        list[str]
+            The paths of the deleted files.
+        """
+
+        return [
+            file_path for file_path in previous.files if file_path not in self.files
+        ]
+
+
+def hash_file(file_path: str, block_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 hash of a file content, reading it by blocks.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the file.
+    block_size : int
+        The number of bytes read at once.
+
+    Returns
+    -------
+    str
+        The hexadecimal digest.
+    """
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def get_manifest_path(output_path: str) -> str:
+    """
+    Get the path of the manifest of an output file.
+
+    Parameters
+    ----------
+    output_path : str
+        The path to the output file.
+
+    Returns
+    -------
+    str
+        The manifest path, next to the output file.
+    """
+
+    return os.path.splitext(output_path)[0] + ".manifest.json"
@@ -0,0 +1,297 @@
+"""
+This file contains the DrugMatcher class, used to find every drug quoted in an article title in a single scan.
+"""
+
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Self
+
+
+class DrugMatcher:
+    def __init__(self, drugs: Iterable[str], word_boundary: bool = False):
+        """
+        Aho-Corasick automaton built once from a list of drug names.
+
+        Matching is case-insensitive and gives the same results as `drug.lower() in article.lower()`.
+
+        Parameters
+        ----------
+        drugs : Iterable[str]
+            The drug names. Their position in the iterable is the index returned by `find`.
+        word_boundary : bool
+            If True, a drug only matches when it is not surrounded by other word characters.
+        """
+
+        self.drugs = list(drugs)
+        self.word_boundary = word_boundary
+
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._outputs: list[list[int]] = [[]]
+
+        self._patterns_lengths: list[int] = []
+        self._patterns_drugs: list[list[int]] = []
+        self._empty_pattern_drugs: list[int] = []
+
+        patterns_ids: dict[str, int] = {}
+        for drug_index, drug in enumerate(self.drugs):
+            pattern = drug.lower()
+            if not pattern:
+                self._empty_pattern_drugs.append(drug_index)
+                continue
+            if pattern not in patterns_ids:
+                patterns_ids[pattern] = len(self._patterns_lengths)
+                self._patterns_lengths.append(len(pattern))
+                self._patterns_drugs.append([])
+                self._add_pattern(pattern, patterns_ids[pattern])
+            self._patterns_drugs[patterns_ids[pattern]].append(drug_index)
+
+        self._build_failure_links()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def find(self, text: str) -> list[int]:
+        """
+        Find all drugs quoted in a text.
+
+        Parameters
+        ----------
+        text : str
+            The text to scan, usually an article title.
+
+        Returns
+        -------
+        list[int]
+            The sorted indexes of the drugs found in the text.
+        """
+
+        text = text.lower()
+        found_patterns = set()
+
+        state = 0
+        for position, character in enumerate(text):
+            while state and character not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(character, 0)
+
+            for pattern_id in self._outputs[state]:
+                if pattern_id in found_patterns:
+                    continue
+                if self.word_boundary and not self._is_on_word_boundaries(
+                    text, position + 1 - self._patterns_lengths[pattern_id], position
+                ):
+                    continue
+                found_patterns.add(pattern_id)
+
+        drugs_indexes = [
+            drug_index
+            for pattern_id in found_patterns
+            for drug_index in self._patterns_drugs[pattern_id]
+        ]
+        if not self.word_boundary:
+            drugs_indexes += self._empty_pattern_drugs
+
+        return sorted(drugs_indexes)
+
+    def match(self, texts: Iterable[str]) -> list[list[int]]:
+        """
+        Find the texts quoting each drug, scanning each text once.
+
+        Parameters
+        ----------
+        texts : Iterable[str]
+            The texts to scan, usually article titles.
+
+        Returns
+        -------
+        list[list[int]]
+            For each drug, the increasing indexes of the texts quoting it.
+        """
+
+        texts_per_drug = [[] for _ in self.drugs]
+        for text_index, text in enumerate(texts):
+            for drug_index in self.find(text):
+                texts_per_drug[drug_index].append(text_index)
+
+        return texts_per_drug
+
+    def _add_pattern(self, pattern: str, pattern_id: int) -> None:
+        """
+        Add a pattern to the trie of the automaton.
+
+        Parameters
+        ----------
+        pattern : str
+            The lowercased pattern.
+        pattern_id : int
+            The pattern id.
+        """
+
+        state = 0
+        for character in pattern:
+            next_state = self._goto[state].get(character)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][character] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+
+        self._outputs[state].append(pattern_id)
+
+    def _build_failure_links(self) -> None:
+        """
+        Compute the failure links of the automaton with a breadth-first traversal of the trie.
+        Outputs of the failure state are merged into each state so `find` never walks the links to report a match.
+        """
+
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for character, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail_state = self._fail[state]
+                while fail_state and character not in self._goto[fail_state]:
+                    fail_state = self._fail[fail_state]
+                self._fail[next_state] = self._goto[fail_state].get(character, 0)
+                self._outputs[next_state] = (
+                    self._outputs[next_state] + self._outputs[self._fail[next_state]]
+                )
+
+    def _is_on_word_boundaries(self, text: str, start: int, end: int) -> bool:
+        """
+        Check that a match is not preceded nor followed by a word character.
+
+        Parameters
+        ----------
+        text : str
+            The scanned text.
+        start : int
+            The position of the first character of the match.
+        end : int
+            The position of the last character of the match.
+
+        Returns
+        -------
+        bool
+            True if the match is a whole word.
+        """
+
+        before = text[start - 1] if start > 0 else " "
+        after = text[end + 1] if end + 1 < len(text) else " "
+
+        return not _is_word_character(before) and not _is_word_character(after)
+
+
+class ShardedDrugMatcher:
+    def __init__(
+        self,
+        drugs: Iterable[str],
+        word_boundary: bool = False,
+        workers: int = 2,
+        shards_per_worker: int = 4,
+    ):
+        """
+        Drugs matcher spreading texts over a pool of processes.
+
+        Each process builds its own DrugMatcher once from the drugs, then matches shards of texts.
+        Results are merged in shards order, so `match` returns exactly what DrugMatcher.match returns.
+        Use it as a context manager to shut the processes down.
+
+        Parameters
+        ----------
+        drugs : Iterable[str]
+            The drug names. Their position in the iterable is the index used in `match` results.
+        word_boundary : bool
+            If True, a drug only matches when it is not surrounded by other word characters.
+        workers : int
+            The number of processes.
+        shards_per_worker : int
+            The number of shards given to each process per call to `match`, to balance the load.
+        """
+
+        self.drugs = list(drugs)
+        self.word_boundary = word_boundary
+        self.workers = workers
+        self.shards_per_worker = shards_per_worker
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialize_worker_matcher,
+            initargs=(self.drugs, word_boundary),
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._executor.shutdown()
+
+    def match(self, texts: Iterable[str]) -> list[list[int]]:
+        """
+        Find the texts quoting each drug, matching shards of texts in parallel.
+
+        Parameters
+        ----------
+        texts : Iterable[str]
+            The texts to scan, usually article titles.
+
+        Returns
+        -------
+        list[list[int]]
+            For each drug, the increasing indexes of the texts quoting it.
+        """
+
+        texts = list(texts)
+        shard_size = max(1, -(-len(texts) // (self.workers * self.shards_per_worker)))
+        shards_starts = range(0, len(texts), shard_size)
+
+        shards_results = self._executor.map(
+            _match_shard,
+            (texts[start : start + shard_size] for start in shards_starts),
+        )
+
+        texts_per_drug = [[] for _ in self.drugs]
+        for start, shard_texts_per_drug in zip(shards_starts, shards_results):
+            for drug_texts, shard_drug_texts in zip(
+                texts_per_drug, shard_texts_per_drug
+            ):
+                drug_texts.extend(start + index for index in shard_drug_texts)
+
+        return texts_per_drug
+
+
+_worker_matcher: DrugMatcher | None = None
+
+
+def _initialize_worker_matcher(drugs: list[str], word_boundary: bool) -> None:
+    """
+    Build the drugs matcher of a worker process, once for all the shards it will match.
+    """
+
+    global _worker_matcher
+    _worker_matcher = DrugMatcher(drugs, word_boundary=word_boundary)
+
+
+def _match_shard(texts: list[str]) -> list[list[int]]:
+    """
+    Match a shard of texts with the matcher of the worker process.
+    """
+
+    return _worker_matcher.match(texts)
+
+
+def _is_word_character(character: str) -> bool:
+    """
+    Check if a character is a word character, as `\\w` in regular expressions.
+    """
+
+    return character.isalnum() or character == "_"
@@ -0,0 +1,208 @@
+"""
+This file contains the Instrumentation class, used to record metrics of each ETL stage and to profile runs.
+"""
+
+import cProfile
+import json
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+TRACEMALLOC_TOP_COUNT = 20
+
+
+class Instrumentation:
+    def __init__(
+        self,
+        metrics_path: str | None = None,
+        profile: str | None = None,
+        profile_path: str = "etl.prof",
+        callbacks: list[Callable[[dict], None]] | None = None,
+    ):
+        """
+        Instrumentation of the ETL stages.
+
+        Each stage records its wall time, CPU time, the peak RSS of the process and the rows going in and out.
+        Stages can be nested: a stage named "dates" run within the "transform" stage is recorded as "transform/dates".
+        Records of stages run several times, such as one per chunk, are summed in the report.
+
+        Parameters
+        ----------
+        metrics_path : str | None
+            If set, the JSON metrics report is written to this path at the end of each capture.
+        profile : str | None
+            "cprofile" to save the cProfile statistics of the captures to `profile_path`,
+            "tracemalloc" to record the peak traced memory of each stage and the top allocations in the report.
+        profile_path : str
+            The path to the cProfile statistics, readable with `pstats`.
+        callbacks : list[Callable[[dict], None]] | None
+            Functions called with the record of each stage when it ends.
+        """
+
+        if profile is not None and profile not in PROFILE_MODES:
+            raise ValueError(
+                f"Profile mode {profile} is not supported. Use one of {PROFILE_MODES}."
+            )
+
+        self.metrics_path = metrics_path
+        self.profile = profile
+        self.profile_path = profile_path
+        self.callbacks = callbacks or []
+        self.stages: dict[str, dict] = {}
+        self.tracemalloc_top: list[str] = []
+
+        self._stack: list[str] = []
+        self._traced_peaks: list[int] = []
+
+    @contextmanager
+    def capture(self) -> Iterator[None]:
+        """
+        Capture a run: start the profiler if any, then write the metrics report and the profile once complete.
+        """
+
+        self.stages = {}
+        profiler = cProfile.Profile() if self.profile == "cprofile" else None
+        if profiler:
+            profiler.enable()
+        if self.profile == "tracemalloc":
+            tracemalloc.start()
+
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(self.profile_path)
+            if self.profile == "tracemalloc":
+                self.tracemalloc_top = [
+                    str(statistic)
+                    for statistic in tracemalloc.take_snapshot().statistics("lineno")[
+                        :TRACEMALLOC_TOP_COUNT
+                    ]
+                ]
+                tracemalloc.stop()
+            if self.metrics_path:
+                self.save(self.metrics_path)
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int | None = None) -> Iterator[dict]:
+        """
+        Record the metrics of a stage.
+        The yielded record can be completed by the stage, for instance with the number of rows going out.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage.
+        rows_in : int | None
+            The number of rows going into the stage.
+
+        Yields
+        ------
+        dict
+            The record of the stage.
+        """
+
+        self._stack.append(name)
+        record = {"stage": "/".join(self._stack), "rows_in": rows_in, "rows_out": None}
+        # stages are reported in the order they started, so parents come before their sub-stages
+        self.stages.setdefault(record["stage"], {"stage": record["stage"], "calls": 0})
+
+        is_tracing = tracemalloc.is_tracing()
+        if is_tracing:
+            memory_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            self._traced_peaks.append(0)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield record
+        finally:
+            record["wall_seconds"] = time.perf_counter() - wall_start
+            record["cpu_seconds"] = time.process_time() - cpu_start
+            record["peak_rss_bytes"] = _get_peak_rss()
+            if is_tracing:
+                # sub-stages reset the peak, so their own peaks are taken into account
+                peak = max(tracemalloc.get_traced_memory()[1], self._traced_peaks.pop())
+                record["peak_traced_bytes"] = peak - memory_before
+                if self._traced_peaks:
+                    self._traced_peaks[-1] = max(self._traced_peaks[-1], peak)
+            self._stack.pop()
+
+            self._add_record(record)
+            for callback in self.callbacks:
+                callback(record)
+
+    def report(self) -> dict:
+        """
+        Get the metrics report.
+
+        Returns
+        -------
+        dict
+            The summed metrics of each stage, in the order they started, and the top allocations when tracing.
+        """
+
+        report = {"stages": list(self.stages.values())}
+        if self.profile == "tracemalloc":
+            report["tracemalloc_top"] = self.tracemalloc_top
+
+        return report
+
+    def save(self, metrics_path: str) -> None:
+        """
+        Write the metrics report to a JSON file.
+
+        Parameters
+        ----------
+        metrics_path : str
+            The path to the metrics file.
+        """
+
+        with open(metrics_path, "w", encoding="UTF-8") as f:
+            json.dump(self.report(), f, indent=4)
+
+    def _add_record(self, record: dict) -> None:
+        """
+        Sum a stage record into the metrics of the stage.
+
+        Parameters
+        ----------
+        record : dict
+            The record of the stage.
+        """
+
+        stage = self.stages[record["stage"]]
+        stage["calls"] += 1
+        for key, value in record.items():
+            if key in ("stage", "calls") or value is None:
+                continue
+            if key in ("peak_rss_bytes", "peak_traced_bytes"):
+                stage[key] = max(stage.get(key, 0), value)
+            else:
+                stage[key] = stage.get(key, 0) + value
+
+
+def _get_peak_rss() -> int | None:
+    """
+    Get the peak resident set size of the process, in bytes.
+
+    Returns
+    -------
+    int | None
+        The peak RSS, None if it cannot be measured on this platform.
+    """
+
+    if resource is None:
+        return None
+
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
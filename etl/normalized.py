@@ -0,0 +1,279 @@
+"""
+This file contains functions to load the graph as normalized drugs, articles, journals and edges tables
+stored in a columnar format (Parquet or Arrow IPC), and to read them back.
+"""
+
+import os
+import shutil
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+
+from etl.keys import (
+    SURROGATE_KEY_COLUMN,
+    SURROGATE_KEYS,
+    get_article_key_columns,
+    get_records_keys,
+)
+
+NORMALIZED_FORMATS = {"parquet": ".parquet", "feather": ".arrow"}
+TABLES_NAMES = ("drugs", "articles", "journals", "edges")
+
+
+def build_normalized_tables(data: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Split the graph-oriented DataFrame into drugs, articles, journals and edges tables.
+    Each drug, article and journal is stored once, and edges reference them by surrogate key.
+    Drugs and articles are keyed by their surrogate ids, and journals by the hash of their name,
+    so the tables written by different runs can be joined.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The graph-oriented DataFrame, with one nested drug and article record per edge.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame]
+        The normalized tables.
+    """
+
+    if data.empty:
+        return {
+            "drugs": pd.DataFrame({SURROGATE_KEY_COLUMN: pd.Series(dtype="int64")}),
+            "articles": pd.DataFrame({SURROGATE_KEY_COLUMN: pd.Series(dtype="int64")}),
+            "journals": pd.DataFrame(
+                {"journal_key": pd.Series(dtype="int64"), "journal": []}
+            ),
+            "edges": pd.DataFrame(
+                {
+                    "drug_key": pd.Series(dtype="int64"),
+                    "article_key": pd.Series(dtype="int64"),
+                    "journal_key": pd.Series(dtype="int64"),
+                    "relationship": [],
+                    "date": [],
+                }
+            ),
+        }
+
+    drugs_keys, drugs = _get_keyed_records(
+        data["drug"], lambda drug: SURROGATE_KEYS["drugs"]
+    )
+    articles_keys, articles = _get_keyed_records(
+        data["article"], get_article_key_columns
+    )
+    journals_keys = (
+        pd.util.hash_pandas_object(data["journal"], index=False)
+        .to_numpy()
+        .view(np.int64)
+    )
+    first_journals = ~pd.Series(journals_keys).duplicated().to_numpy()
+
+    return {
+        "drugs": drugs,
+        "articles": articles,
+        "journals": pd.DataFrame(
+            {
+                "journal_key": journals_keys[first_journals],
+                "journal": data["journal"].to_numpy()[first_journals],
+            }
+        ),
+        "edges": pd.DataFrame(
+            {
+                "drug_key": drugs_keys,
+                "article_key": articles_keys,
+                "journal_key": journals_keys,
+                "relationship": data["relationship"].astype("category").to_numpy(),
+                "date": data["date"].to_numpy(),
+            }
+        ),
+    }
+
+
+def write_normalized_tables(
+    tables: dict[str, pd.DataFrame], output_path: str, table_format: str = "parquet"
+) -> None:
+    """
+    Write the normalized tables to a folder, one file per table.
+    Tables are written to a temporary folder, which replaces the output folder once complete.
+
+    Parameters
+    ----------
+    tables : dict[str, pd.DataFrame]
+        The normalized tables.
+    output_path : str
+        The path to the output folder.
+    table_format : str
+        "parquet" or "feather" (Arrow IPC).
+    """
+
+    if table_format not in NORMALIZED_FORMATS:
+        raise ValueError(
+            f"Table format {table_format} is not supported. Use one of {tuple(NORMALIZED_FORMATS)}."
+        )
+    _check_pyarrow_is_installed()
+
+    output_path = output_path.rstrip("/")
+    temporary_path = f"{output_path}.{os.getpid()}.tmp"
+    os.makedirs(temporary_path)
+
+    try:
+        for table_name, table in tables.items():
+            file_path = os.path.join(
+                temporary_path, table_name + NORMALIZED_FORMATS[table_format]
+            )
+            if table_format == "parquet":
+                table.to_parquet(file_path, index=False)
+            else:
+                table.reset_index(drop=True).to_feather(file_path)
+    except BaseException:
+        shutil.rmtree(temporary_path)
+        raise
+
+    if os.path.isdir(output_path):
+        shutil.rmtree(output_path)
+    os.replace(temporary_path, output_path)
+
+
+def read_normalized_tables(
+    input_path: str, columns: dict[str, list[str]] | None = None
+) -> dict[str, pd.DataFrame]:
+    """
+    Read normalized tables written by `write_normalized_tables`.
+
+    Parameters
+    ----------
+    input_path : str
+        The path to the folder containing the tables.
+    columns : dict[str, list[str]] | None
+        The columns to read for each table. All columns are read for tables not in the dictionary.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame]
+        The normalized tables.
+    """
+
+    _check_pyarrow_is_installed()
+    columns = columns or {}
+
+    tables = {}
+    for file in sorted(os.listdir(input_path)):
+        table_name, extension = os.path.splitext(file)
+        file_path = os.path.join(input_path, file)
+        if extension == NORMALIZED_FORMATS["parquet"]:
+            tables[table_name] = pd.read_parquet(
+                file_path, columns=columns.get(table_name)
+            )
+        elif extension == NORMALIZED_FORMATS["feather"]:
+            tables[table_name] = pd.read_feather(
+                file_path, columns=columns.get(table_name)
+            )
+
+    return tables
+
+
+def denormalize_tables(tables: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Join normalized tables back into the graph-oriented DataFrame written to data.json.
+
+    Parameters
+    ----------
+    tables : dict[str, pd.DataFrame]
+        The normalized tables.
+
+    Returns
+    -------
+    pd.DataFrame
+        The graph-oriented DataFrame, with one nested drug and article record per edge.
+    """
+
+    edges = tables["edges"]
+    if edges.empty:
+        return pd.DataFrame()
+
+    drugs = records_by_key(tables["drugs"], SURROGATE_KEY_COLUMN)
+    articles = records_by_key(tables["articles"], SURROGATE_KEY_COLUMN)
+    journals = tables["journals"].set_index("journal_key")["journal"]
+
+    return pd.DataFrame(
+        {
+            "drug": edges["drug_key"].map(drugs).to_numpy(),
+            "article": edges["article_key"].map(articles).to_numpy(),
+            "journal": edges["journal_key"].map(journals).to_numpy(),
+            "relationship": edges["relationship"].astype(str).to_numpy(),
+            "date": edges["date"].to_numpy(),
+        }
+    )
+
+
+def _get_keyed_records(
+    records: pd.Series, get_columns: Callable[[dict], tuple[str, ...]]
+) -> tuple[list[int], pd.DataFrame]:
+    """
+    Get the surrogate key of each record of a Series of dictionaries, and the table of the distinct records.
+    Keys the records do not hold are computed from their business columns, and the first record of a key is kept.
+
+    Parameters
+    ----------
+    records : pd.Series
+        The records.
+    get_columns : Callable[[dict], tuple[str, ...]]
+        The function giving the business columns of a record.
+
+    Returns
+    -------
+    tuple[list[int], pd.DataFrame]
+        The key of each record, and the table of the distinct records, with their key as first column.
+    """
+
+    records = records.tolist()
+    keys = get_records_keys(records, get_columns)
+
+    table = pd.DataFrame(records)
+    if SURROGATE_KEY_COLUMN in table:
+        table = table.drop(columns=SURROGATE_KEY_COLUMN)
+    table.insert(0, SURROGATE_KEY_COLUMN, np.array(keys, dtype=np.int64))
+    table = table.drop_duplicates(SURROGATE_KEY_COLUMN).reset_index(drop=True)
+
+    return keys, table
+
+
+def records_by_key(table: pd.DataFrame, key_column: str) -> pd.Series:
+    """
+    Rebuild the dictionaries of a normalized table, without the columns missing from each record.
+
+    Parameters
+    ----------
+    table : pd.DataFrame
+        The normalized table.
+    key_column : str
+        The name of the surrogate key column, kept in the records.
+
+    Returns
+    -------
+    pd.Series
+        The records, indexed by surrogate key.
+    """
+
+    records = [
+        {column: value for column, value in record.items() if not pd.isna(value)}
+        for record in table.to_dict("records")
+    ]
+
+    return pd.Series(records, index=table[key_column])
+
+
+def _check_pyarrow_is_installed() -> None:
+    """
+    Raise an explicit error if pyarrow, needed by Parquet and Arrow IPC files, is not installed.
+    """
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as error:
+        raise ImportError(
+            "pyarrow is required to write and read normalized tables. "
+            "Install it with `pip install pyarrow`."
+        ) from error
@@ -0,0 +1,376 @@
+"""
+This file contains the Plan class, a lazy description of an ETL run which can be composed and explained
+before it is executed, and the row filters pushed down before the transformations.
+"""
+
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from etl.catalog import ARTICLES_TITLE_COLUMNS, DRUGS_NAME_COLUMN
+from etl.dates import NORMALIZED_DATE_FORMAT, DateNormalizer
+from etl.engines import ENGINES, get_engine, quote_identifier, quote_literal
+
+if TYPE_CHECKING:
+    from etl.etl import ETL
+
+# the columns of each table used by the graph, the other ones are not read
+GRAPH_COLUMNS = {
+    "drugs": ("atccode", "drug"),
+    "pubmed": ("id", "title", "date", "journal"),
+    "clinical_trials": ("id", "scientific_title", "date", "journal"),
+}
+
+
+class NonBlankFilter:
+    def __init__(self, column: str):
+        """
+        Keep the rows with a non-blank value in a column.
+
+        Parameters
+        ----------
+        column : str
+            The column.
+        """
+
+        self.column = column
+
+    def __str__(self) -> str:
+        return f"{self.column} is not blank"
+
+    def __call__(self, data: pd.DataFrame) -> pd.Series:
+        """
+        Get the mask of the kept rows.
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            The rows.
+
+        Returns
+        -------
+        pd.Series
+            True for the kept rows.
+        """
+
+        return data[self.column].astype("string").str.strip().fillna("") != ""
+
+    def to_sql(self) -> str:
+        """
+        Get the SQL condition of the kept rows, for the duckdb engine.
+
+        Returns
+        -------
+        str
+            The condition.
+        """
+
+        return f"coalesce(trim({quote_identifier(self.column)}), '') != ''"
+
+
+class DateRangeFilter:
+    def __init__(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        column: str = "date",
+    ):
+        """
+        Keep the rows dated within a range, bounds included.
+        Dates are normalized first, so any of the input formats can be compared.
+        Rows with a date which cannot be parsed are dropped.
+
+        Parameters
+        ----------
+        start : str | None
+            The first date kept, in the normalized format. No lower bound if None.
+        end : str | None
+            The last date kept, in the normalized format. No upper bound if None.
+        column : str
+            The date column.
+        """
+
+        self.start = start
+        self.end = end
+        self.column = column
+        self.date_normalizer = DateNormalizer()
+
+    def __str__(self) -> str:
+        return f"{self.column} between {self.start or '...'} and {self.end or '...'}"
+
+    def __call__(self, data: pd.DataFrame) -> pd.Series:
+        """
+        Get the mask of the kept rows.
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            The rows.
+
+        Returns
+        -------
+        pd.Series
+            True for the kept rows.
+        """
+
+        dates = pd.to_datetime(
+            self.date_normalizer.normalize(data[self.column]).astype("string"),
+            format=NORMALIZED_DATE_FORMAT,
+            errors="coerce",
+        )
+        kept = dates.notna()
+        if self.start:
+            kept &= dates >= pd.to_datetime(self.start, format=NORMALIZED_DATE_FORMAT)
+        if self.end:
+            kept &= dates <= pd.to_datetime(self.end, format=NORMALIZED_DATE_FORMAT)
+
+        return kept
+
+    def to_sql(self) -> str:
+        """
+        Get the SQL condition of the kept rows, for the duckdb engine.
+
+        Returns
+        -------
+        str
+            The condition.
+        """
+
+        formats = ", ".join(map(quote_literal, self.date_normalizer.formats))
+        date = f"try_strptime(trim({quote_identifier(self.column)}), [{formats}])"
+        conditions = [f"{date} IS NOT NULL"]
+        if self.start:
+            conditions.append(
+                f"{date} >= strptime({quote_literal(self.start)}, {quote_literal(NORMALIZED_DATE_FORMAT)})"
+            )
+        if self.end:
+            conditions.append(
+                f"{date} <= strptime({quote_literal(self.end)}, {quote_literal(NORMALIZED_DATE_FORMAT)})"
+            )
+
+        return " AND ".join(conditions)
+
+
+# blank titles cannot reference a drug, and a blank drug name would match every title
+DEFAULT_ROW_FILTERS = {
+    "drugs": (NonBlankFilter(DRUGS_NAME_COLUMN),),
+    **{
+        table_name: (NonBlankFilter(title_column),)
+        for table_name, title_column in ARTICLES_TITLE_COLUMNS.items()
+    },
+}
+
+
+class Plan:
+    def __init__(
+        self,
+        etl: "ETL",
+        data_folder: str,
+        if_exists: str,
+        columns: dict[str, tuple[str, ...]] | None = None,
+        row_filters: dict[str, tuple] | None = None,
+        engine: str = "pandas",
+    ):
+        """
+        Lazy plan of an ETL run: extract, transform, match and load.
+
+        Nothing is read until the plan is executed. Column selections are pushed down to the readers,
+        so other columns are not parsed, and row filters are applied right after extraction,
+        before the constraints and the matching.
+        Composing methods return a new plan and leave this one unchanged.
+
+        Parameters
+        ----------
+        etl : ETL
+            The ETL executing the plan.
+        data_folder : str
+            The path to the folder containing the files to be extracted.
+        if_exists : str
+            "y" to keep the last file of each name, or "n" to append them.
+        columns : dict[str, tuple[str, ...]] | None
+            The columns read from each table. Defaults to the columns used by the graph.
+        row_filters : dict[str, tuple] | None
+            The filters of each table, each a callable giving the mask of the kept rows.
+            Defaults to dropping blank titles and drug names.
+        engine : str
+            The engine executing the plan: "pandas", or "duckdb" to run the transformations
+            and the matching as multithreaded SQL queries.
+        """
+
+        self.etl = etl
+        self.data_folder = data_folder
+        self.if_exists = if_exists
+        self.columns = dict(GRAPH_COLUMNS if columns is None else columns)
+        self.row_filters = dict(
+            DEFAULT_ROW_FILTERS if row_filters is None else row_filters
+        )
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Engine {engine} is not supported. Use one of {tuple(ENGINES)}."
+            )
+        self.engine = engine
+
+    def select(self, table_name: str, columns: list[str]) -> "Plan":
+        """
+        Only read some columns of a table, besides the columns the graph needs, which are always read.
+
+        Parameters
+        ----------
+        table_name : str
+            The table name.
+        columns : list[str]
+            The columns to read.
+
+        Returns
+        -------
+        Plan
+            The new plan.
+        """
+
+        # the edges need the ids, titles, dates and journals of articles, and the drugs info
+        required_columns = GRAPH_COLUMNS.get(table_name, ())
+
+        return self._copy(
+            columns={
+                **self.columns,
+                table_name: (
+                    *required_columns,
+                    *(column for column in columns if column not in required_columns),
+                ),
+            }
+        )
+
+    def where(self, table_name: str, row_filter) -> "Plan":
+        """
+        Filter the rows of a table before they are transformed.
+
+        Parameters
+        ----------
+        table_name : str
+            The table name.
+        row_filter : Callable[[pd.DataFrame], pd.Series]
+            The filter, giving the mask of the kept rows. Its `__str__` describes it in `explain`.
+
+        Returns
+        -------
+        Plan
+            The new plan.
+        """
+
+        return self._copy(
+            row_filters={
+                **self.row_filters,
+                table_name: (*self.row_filters.get(table_name, ()), row_filter),
+            }
+        )
+
+    def where_dates(self, start: str | None = None, end: str | None = None) -> "Plan":
+        """
+        Only keep the articles dated within a range, bounds included.
+
+        Parameters
+        ----------
+        start : str | None
+            The first date kept, in the normalized format. No lower bound if None.
+        end : str | None
+            The last date kept, in the normalized format. No upper bound if None.
+
+        Returns
+        -------
+        Plan
+            The new plan.
+        """
+
+        plan = self
+        for table_name in ARTICLES_TITLE_COLUMNS:
+            plan = plan.where(table_name, DateRangeFilter(start, end))
+
+        return plan
+
+    def explain(self) -> str:
+        """
+        Describe the steps of the plan, without reading any file.
+
+        Returns
+        -------
+        str
+            The description of the plan, one step per line.
+        """
+
+        etl = self.etl
+        if_exists = "replace" if self.if_exists == "y" else "append"
+        files = etl._select_files(self.data_folder, if_exists)
+
+        if etl.incremental:
+            mode = "new or changed files only"
+        elif etl.chunk_size and self.engine == "pandas":
+            mode = f"by chunks of {etl.chunk_size} rows"
+        else:
+            mode = "whole files"
+        lines = [f"1. Extract from {self.data_folder} ({if_exists}, {mode})"]
+        for table_name, files_paths in files.items():
+            columns = self.columns.get(table_name)
+            filters = self.row_filters.get(table_name, ())
+            lines.append(
+                f"   - {table_name}: {', '.join(files_paths)}"
+                f" | columns: {', '.join(columns) if columns is not None else 'all'}"
+                f" | where: {' and '.join(map(str, filters)) if filters else 'all rows'}"
+            )
+
+        keys = [
+            f"{table_name} ({', '.join(columns)})"
+            for table_name, columns in etl.deduplicator.keys.items()
+        ]
+        surrogate_keys = [
+            f"{table_name} ({', '.join(columns)})"
+            for table_name, columns in etl.surrogate_keys.items()
+        ]
+        lines.append(
+            f"2. Transform with the {self.engine} engine: keys deduplication"
+            f"{' of ' + ', '.join(keys) if keys else ''}, types, duplicates, "
+            "dates, text cleaning, surrogate keys"
+            f"{' of ' + ', '.join(surrogate_keys) if surrogate_keys else ''}"
+        )
+        matching = "whole words" if etl.word_boundary else "substrings"
+        lines.append(
+            f"3. Match drugs in titles ({matching}, {etl.workers} workers)"
+            if self.engine == "pandas"
+            else f"3. Match drugs in titles ({matching}, as a join)"
+        )
+        lines.append(
+            f"4. Load to {etl.output_path} ({etl.output_format})"
+            f"{' with its query index' if etl.write_index else ''}"
+        )
+
+        return "\n".join(lines)
+
+    def execute(self) -> bool:
+        """
+        Execute the plan.
+
+        Returns
+        -------
+        bool
+            True if the data was loaded.
+        """
+
+        return get_engine(self.engine).execute(self)
+
+    def _copy(self, **changes) -> "Plan":
+        """
+        Copy the plan with some changes.
+
+        Returns
+        -------
+        Plan
+            The new plan.
+        """
+
+        arguments = {
+            "columns": self.columns,
+            "row_filters": self.row_filters,
+            "engine": self.engine,
+            **changes,
+        }
+
+        return Plan(self.etl, self.data_folder, self.if_exists, **arguments)
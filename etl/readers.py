@@ -0,0 +1,283 @@
+"""
+This file contains incremental readers, used to extract large files without loading them whole in memory.
+"""
+
+import json
+from collections.abc import Callable, Iterator
+from typing import TextIO
+
+import pandas as pd
+
+BLOCK_SIZE = 1 << 16
+
+
+def iter_json_records(file_path: str, block_size: int = BLOCK_SIZE) -> Iterator[dict]:
+    """
+    Read the records of a JSON array or JSON Lines file one by one.
+
+    The file is read by blocks of `block_size` characters and each record is decoded as soon as it is complete.
+    Trailing commas before a closing bracket or brace, as in upstream exports, are tolerated.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the file.
+    block_size : int
+        The number of characters read from the file at once.
+
+    Returns
+    -------
+    Iterator[dict]
+        The records of the file.
+    """
+
+    decoder = json.JSONDecoder()
+
+    with open(file_path, "r", encoding="UTF-8") as file:
+        buffer = ""
+        position = 0
+        end_of_file = False
+        in_array = None
+
+        while True:
+            position = _skip_separators(buffer, position)
+
+            if position == len(buffer):
+                if end_of_file:
+                    return
+                buffer, position, end_of_file = _read_block(
+                    file, buffer, position, block_size
+                )
+                continue
+
+            if in_array is None:
+                in_array = buffer[position] == "["
+                position += in_array
+                continue
+            if in_array and buffer[position] == "]":
+                return
+
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                trailing_comma = _find_trailing_comma(buffer, error.pos)
+                if trailing_comma is not None:
+                    buffer = buffer[:trailing_comma] + buffer[trailing_comma + 1 :]
+                    continue
+                if end_of_file:
+                    raise
+                # the record may be truncated: read the next block and decode again
+                buffer, position, end_of_file = _read_block(
+                    file, buffer, position, block_size
+                )
+                continue
+
+            yield record
+
+
+def iter_json_chunks(
+    file_path: str, chunk_size: int, columns: tuple[str, ...] | None = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a JSON array or JSON Lines file by chunks of `chunk_size` records.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the file.
+    chunk_size : int
+        The number of records per chunk.
+    columns : tuple[str, ...] | None
+        The columns to keep. All columns are kept if None.
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+        The chunks of the file.
+    """
+
+    records = []
+
+    for record in _project_records(iter_json_records(file_path), columns):
+        records.append(record)
+        if len(records) == chunk_size:
+            yield pd.DataFrame.from_records(records)
+            records = []
+
+    if records:
+        yield pd.DataFrame.from_records(records)
+
+
+def read_json(file_path: str, columns: tuple[str, ...] | None = None) -> pd.DataFrame:
+    """
+    Read a JSON array or JSON Lines file into a DataFrame, decoding its records incrementally.
+    Values are kept as they are in the file: unlike `pd.read_json`, dates are not converted.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the file.
+    columns : tuple[str, ...] | None
+        The columns to keep. All columns are kept if None.
+
+    Returns
+    -------
+    pd.DataFrame
+        The records of the file.
+    """
+
+    return pd.DataFrame.from_records(
+        list(_project_records(iter_json_records(file_path), columns))
+    )
+
+
+def read_file(file_path: str, columns: tuple[str, ...] | None = None) -> pd.DataFrame:
+    """
+    Read a CSV, JSON array or JSON Lines file into a DataFrame.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the file.
+    columns : tuple[str, ...] | None
+        The columns to keep, in the order of the file. Missing columns are ignored.
+        All columns are kept if None.
+
+    Returns
+    -------
+    pd.DataFrame
+        The content of the file.
+    """
+
+    if file_path.endswith(".csv"):
+        return pd.read_csv(file_path, usecols=get_usecols(columns))
+
+    return read_json(file_path, columns)
+
+
+def get_usecols(columns: tuple[str, ...] | None) -> Callable[[str], bool] | None:
+    """
+    Get the `usecols` argument of `pd.read_csv` keeping some columns, so the other ones are not parsed.
+
+    Parameters
+    ----------
+    columns : tuple[str, ...] | None
+        The columns to keep. All columns are kept if None.
+
+    Returns
+    -------
+    Callable[[str], bool] | None
+        The columns filter, which ignores missing columns unlike a list.
+    """
+
+    if columns is None:
+        return None
+
+    return frozenset(columns).__contains__
+
+
+def _project_records(
+    records: Iterator[dict], columns: tuple[str, ...] | None
+) -> Iterator[dict]:
+    """
+    Drop the keys of the records which are not in the kept columns.
+
+    Parameters
+    ----------
+    records : Iterator[dict]
+        The records.
+    columns : tuple[str, ...] | None
+        The columns to keep. All columns are kept if None.
+
+    Returns
+    -------
+    Iterator[dict]
+        The projected records.
+    """
+
+    if columns is None:
+        yield from records
+        return
+
+    for record in records:
+        yield {key: value for key, value in record.items() if key in columns}
+
+
+def _read_block(
+    file: TextIO, buffer: str, position: int, block_size: int
+) -> tuple[str, int, bool]:
+    """
+    Read the next block of a file, dropping the already decoded part of the buffer.
+
+    Parameters
+    ----------
+    file : TextIO
+        The file being read.
+    buffer : str
+        The characters read from the file.
+    position : int
+        The position of the first character not decoded yet.
+    block_size : int
+        The number of characters to read.
+
+    Returns
+    -------
+    tuple[str, int, bool]
+        The new buffer, the new position and whether the end of the file was reached.
+    """
+
+    block = file.read(block_size)
+
+    return buffer[position:] + block, 0, not block
+
+
+def _skip_separators(buffer: str, position: int) -> int:
+    """
+    Skip the whitespaces and commas separating two records.
+
+    Parameters
+    ----------
+    buffer : str
+        The characters read from the file.
+    position : int
+        The current position in the buffer.
+
+    Returns
+    -------
+    int
+        The position of the next meaningful character, or the buffer length.
+    """
+
+    while position < len(buffer) and (
+        buffer[position].isspace() or buffer[position] == ","
+    ):
+        position += 1
+
+    return position
+
+
+def _find_trailing_comma(buffer: str, error_position: int) -> int | None:
+    """
+    Find a trailing comma right before a closing bracket or brace which failed decoding.
+
+    Parameters
+    ----------
+    buffer : str
+        The characters read from the file.
+    error_position : int
+        The position where decoding failed.
+
+    Returns
+    -------
+    int | None
+        The position of the trailing comma, or None if the error is not caused by a trailing comma.
+    """
+
+    if error_position >= len(buffer) or buffer[error_position] not in "]}":
+        return None
+
+    position = error_position - 1
+    while position >= 0 and buffer[position].isspace():
+        position -= 1
+
+    return position if position >= 0 and buffer[position] == "," else None
@@ -0,0 +1,133 @@
+"""
+This file contains the JsonSink class, used to stream the graph records to a JSON or JSON Lines file.
+"""
+
+import json
+import os
+from collections.abc import Iterable
+from typing import Self
+
+import numpy as np
+import pandas as pd
+
+OUTPUT_FORMATS = ("json", "jsonl")
+
+
+class JsonSink:
+    def __init__(self, output_path: str, output_format: str = "json"):
+        """
+        Streaming writer of graph records.
+
+        Records are written one by one to a temporary file next to the output file,
+        which is atomically renamed to the output path once the sink is closed without error.
+        Readers of the output file never see a half-written file.
+
+        Parameters
+        ----------
+        output_path : str
+            The path to the output file.
+        output_format : str
+            "json" for an indented JSON array, as written by `DataFrame.to_json(orient="records", indent=4)`,
+            or "jsonl" for compact JSON Lines, one record per line.
+        """
+
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Output format {output_format} is not supported. Use one of {OUTPUT_FORMATS}."
+            )
+
+        self.output_path = output_path
+        self.output_format = output_format
+        self.records_count = 0
+
+        self._temporary_path = f"{output_path}.{os.getpid()}.tmp"
+        self._file = None
+
+    def __enter__(self) -> Self:
+        self._file = open(self._temporary_path, "w", encoding="UTF-8")
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        try:
+            if exc_type is None and self.output_format == "json":
+                self._file.write("\n]" if self.records_count else "[]")
+        finally:
+            self._file.close()
+
+        if exc_type is None:
+            os.replace(self._temporary_path, self.output_path)
+        else:
+            os.remove(self._temporary_path)
+
+    def write(self, record: dict) -> None:
+        """
+        Write a record to the output file.
+
+        Parameters
+        ----------
+        record : dict
+            The record.
+        """
+
+        if self.output_format == "jsonl":
+            self._file.write(
+                json.dumps(
+                    record,
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                    default=_to_json_serializable,
+                )
+            )
+            self._file.write("\n")
+        else:
+            serialized_record = json.dumps(
+                record,
+                ensure_ascii=False,
+                indent=4,
+                separators=(",", ":"),
+                default=_to_json_serializable,
+            )
+            self._file.write("[\n    " if not self.records_count else ",\n    ")
+            self._file.write(serialized_record.replace("\n", "\n    "))
+
+        self.records_count += 1
+
+    def write_records(self, records: Iterable[dict]) -> None:
+        """
+        Write records to the output file.
+
+        Parameters
+        ----------
+        records : Iterable[dict]
+            The records.
+        """
+
+        for record in records:
+            self.write(record)
+
+    def write_dataframe(self, data: pd.DataFrame) -> None:
+        """
+        Write the rows of a DataFrame to the output file, one record at a time.
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            The data.
+        """
+
+        columns = data.columns.tolist()
+        self.write_records(
+            dict(zip(columns, row))
+            for row in zip(*(data[column] for column in columns))
+        )
+
+
+def _to_json_serializable(value):
+    """
+    Convert the numpy scalars pandas leaves in records to Python values.
+    """
+
+    if isinstance(value, np.generic):
+        return value.item()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,227 @@
+"""
+This file contains the SpillingEdgeBuffer class, used to accumulate graph edges in a bounded amount of memory
+by spilling sorted partitions to disk, merged back in order when the edges are loaded.
+"""
+
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+import weakref
+from collections.abc import Iterator
+from operator import itemgetter
+from typing import Self
+
+import pandas as pd
+
+from etl.edges import EdgeBuffer
+from etl.keys import SURROGATE_KEY_COLUMN
+
+# edges are written and read back by blocks, so merging keeps one block per partition in memory
+SPILL_BLOCK_SIZE = 1024
+
+
+class SpillingEdgeBuffer:
+    def __init__(
+        self,
+        columns: list[str],
+        max_edges: int | None = None,
+        spill_folder: str | None = None,
+    ):
+        """
+        Accumulator of edges sorted by key, spilling to disk past a number of edges in memory.
+
+        Once `max_edges` edges are buffered, they are sorted and written to a partition file.
+        Edges are then read back by an external k-way merge of the partitions and of the edges left in memory,
+        in the order of their sort keys. Within a group of edges sharing the first item of their sort keys,
+        such as the edges of a drug, an edge linking the same drug and article as an earlier one is dropped.
+
+        Parameters
+        ----------
+        columns : list[str]
+            The edge attributes, in the order of the DataFrame columns.
+        max_edges : int | None
+            The number of edges kept in memory before spilling them. Edges are never spilled if None.
+        spill_folder : str | None
+            The folder in which the temporary partitions folder is created. Defaults to the system temporary folder.
+        """
+
+        if max_edges is not None and max_edges < 1:
+            raise ValueError("The maximum number of edges in memory must be positive.")
+
+        self.columns = columns
+        self.max_edges = max_edges
+        self.spill_folder = spill_folder
+        self.partitions: list[str] = []
+
+        self._buffer: list[tuple[tuple, dict]] = []
+        self._edges_count = 0
+        self._partitions_folder = None
+        self._finalizer = None
+
+    def __len__(self) -> int:
+        return self._edges_count
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def append(self, edge: dict, sort_key: tuple) -> None:
+        """
+        Append an edge to the buffer, spilling the buffer if it is full.
+
+        Parameters
+        ----------
+        edge : dict
+            The edge attributes. Every column of the buffer must be present.
+        sort_key : tuple
+            The position of the edge in the output, such as the position of its drug then the order of arrival.
+        """
+
+        self._buffer.append((sort_key, edge))
+        self._edges_count += 1
+
+        if self.max_edges is not None and len(self._buffer) >= self.max_edges:
+            self.spill()
+
+    def spill(self) -> None:
+        """
+        Sort the buffered edges and write them to a new partition file.
+        """
+
+        if not self._buffer:
+            return
+
+        if self._partitions_folder is None:
+            self._partitions_folder = tempfile.mkdtemp(
+                prefix="etl-edges-", dir=self.spill_folder
+            )
+            # partitions are removed even if the buffer is never closed, for instance if the run fails
+            self._finalizer = weakref.finalize(
+                self, shutil.rmtree, self._partitions_folder, ignore_errors=True
+            )
+
+        self._buffer.sort(key=itemgetter(0))
+        partition_path = os.path.join(
+            self._partitions_folder, f"{len(self.partitions)}.pickle"
+        )
+        with open(partition_path, "wb") as f:
+            for start in range(0, len(self._buffer), SPILL_BLOCK_SIZE):
+                pickle.dump(
+                    self._buffer[start : start + SPILL_BLOCK_SIZE],
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+        self.partitions.append(partition_path)
+        self._buffer = []
+
+    def iter_edges(self) -> Iterator[dict]:
+        """
+        Iterate over the edges in the order of their sort keys, merging the partitions and the buffered edges.
+
+        Yields
+        ------
+        dict
+            The edges, without the duplicated ones.
+        """
+
+        self._buffer.sort(key=itemgetter(0))
+        sorted_edges = heapq.merge(
+            *(_read_partition(partition_path) for partition_path in self.partitions),
+            self._buffer,
+            key=itemgetter(0),
+        )
+
+        group = None
+        seen_keys = set()
+        for sort_key, edge in sorted_edges:
+            if sort_key[0] != group:
+                group = sort_key[0]
+                seen_keys = set()
+            edge_key = _get_edge_key(edge)
+            if edge_key in seen_keys:
+                continue
+            seen_keys.add(edge_key)
+            yield edge
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Materialize the merged edges into a pandas DataFrame.
+
+        Returns
+        -------
+        pd.DataFrame
+            The edges, one row per edge. An empty DataFrame if no edge was appended.
+        """
+
+        edges = EdgeBuffer(self.columns)
+        for edge in self.iter_edges():
+            edges.append(edge)
+
+        return edges.to_dataframe()
+
+    def close(self) -> None:
+        """
+        Remove the partition files and forget the buffered edges.
+        """
+
+        if self._finalizer is not None:
+            self._finalizer()
+        self._partitions_folder = None
+        self._finalizer = None
+        self.partitions = []
+        self._buffer = []
+        self._edges_count = 0
+
+
+def _read_partition(partition_path: str) -> Iterator[tuple[tuple, dict]]:
+    """
+    Read the sorted edges of a partition, one block at a time.
+
+    Parameters
+    ----------
+    partition_path : str
+        The path to the partition file.
+
+    Yields
+    ------
+    tuple[tuple, dict]
+        The sort key and the attributes of each edge.
+    """
+
+    with open(partition_path, "rb") as f:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            yield from block
+
+
+def _get_edge_key(edge: dict) -> tuple:
+    """
+    Get the key identifying an edge: the surrogate keys of its drug and article, and its relationship.
+    Nodes without surrogate keys are identified by their content.
+    """
+
+    return (
+        _get_node_key(edge.get("drug")),
+        _get_node_key(edge.get("article")),
+        edge.get("relationship"),
+    )
+
+
+def _get_node_key(node) -> object:
+    """
+    Get the key identifying a drug or article record.
+    """
+
+    if isinstance(node, dict):
+        if SURROGATE_KEY_COLUMN in node:
+            return node[SURROGATE_KEY_COLUMN]
+        return repr(sorted(node.items()))
+
+    return node
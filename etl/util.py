@@ -1,5 +1,8 @@
 import pandas as pd
 
+from etl.catalog import Catalog
+from etl.keys import SURROGATE_KEY_COLUMN, get_article_key_columns, get_record_key
+
 
 def remove_file_extension(file_name: str) -> str:
     """
@@ -15,7 +18,7 @@ def remove_file_extension(file_name: str) -> str:
 
 
 def get_article_journal_from_data(
-    data: dict[str, pd.DataFrame], article_name: str
+    data: dict[str, pd.DataFrame], article_name: str, catalog: Catalog | None = None
 ) -> str:
     """
     Get the journal name from its name
@@ -24,23 +27,23 @@ def get_article_journal_from_data(
     ----------
     article_name : str
         The article name.
+    catalog : Catalog | None
+        The catalog of `data`, to reuse its indexes across lookups. Built for this lookup if None.
 
     Returns
     -------
     str
         The journal name.
     """
-    try:
-        return data["pubmed"][data["pubmed"]["title"] == article_name][
-            "journal"
-        ].values[0]
-    except IndexError:
-        return data["clinical_trials"][
-            data["clinical_trials"]["scientific_title"] == article_name
-        ]["journal"].values[0]
+    if catalog is None:
+        catalog = Catalog(data)
+
+    return catalog.get_article_journal(article_name)
 
 
-def get_article_date_from_data(data: dict[str, pd.DataFrame], article_name: str) -> str:
+def get_article_date_from_data(
+    data: dict[str, pd.DataFrame], article_name: str, catalog: Catalog | None = None
+) -> str:
     """
     Get the date of the article from its name
 
@@ -48,21 +51,23 @@ def get_article_date_from_data(data: dict[str, pd.DataFrame], article_name: str)
     ----------
     article_name : str
         The article name.
+    catalog : Catalog | None
+        The catalog of `data`, to reuse its indexes across lookups. Built for this lookup if None.
 
     Returns
     -------
     str
         The date of the article.
     """
-    try:
-        return data["pubmed"][data["pubmed"]["title"] == article_name]["date"].values[0]
-    except IndexError:
-        return data["clinical_trials"][
-            data["clinical_trials"]["scientific_title"] == article_name
-        ]["date"].values[0]
+    if catalog is None:
+        catalog = Catalog(data)
+
+    return catalog.get_article_date(article_name)
 
 
-def get_drug_info_from_name(drug: str, data: pd.DataFrame) -> dict[str, str]:
+def get_drug_info_from_name(
+    drug: str, data: pd.DataFrame, catalog: Catalog | None = None
+) -> dict[str, str]:
     """
     Get the drug info from its name
 
@@ -72,16 +77,23 @@ def get_drug_info_from_name(drug: str, data: pd.DataFrame) -> dict[str, str]:
         The drug name.
     data : pd.DataFrame
         The dataframe containing the drug info.
+    catalog : Catalog | None
+        The catalog of `data`, to reuse its indexes across lookups. Built for this lookup if None.
 
     Returns
     -------
     dict[str, str]
         The drug info.
     """
-    return data["drugs"][data["drugs"]["drug"] == drug].to_dict("records")[0]
+    if catalog is None:
+        catalog = Catalog(data)
 
+    return catalog.get_drug_info(drug)
 
-def get_article_info_from_name(article: str, data: pd.DataFrame) -> dict[str, str]:
+
+def get_article_info_from_name(
+    article: str, data: pd.DataFrame, catalog: Catalog | None = None
+) -> dict[str, str]:
     """
     Get the article info from its name
 
@@ -91,15 +103,95 @@ def get_article_info_from_name(article: str, data: pd.DataFrame) -> dict[str, st
         The article name.
     data : pd.DataFrame
         The dataframe containing the article info.
+    catalog : Catalog | None
+        The catalog of `data`, to reuse its indexes across lookups. Built for this lookup if None.
 
     Returns
     -------
     dict[str, str]
         The article info.
     """
-    try:
-        return data["clinical_trials"][
-            data["clinical_trials"]["scientific_title"] == article
-        ].to_dict("records")[0]
-    except IndexError:
-        return data["pubmed"][data["pubmed"]["title"] == article].to_dict("records")[0]
+    if catalog is None:
+        catalog = Catalog(data)
+
+    return catalog.get_article_info(article)
+
+
+def get_articles_keys(data: pd.DataFrame) -> pd.Series:
+    """
+    Get the keys identifying the articles of a table across runs: their surrogate keys.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The transformed articles.
+
+    Returns
+    -------
+    pd.Series
+        The articles keys.
+    """
+
+    return data[SURROGATE_KEY_COLUMN]
+
+
+def get_article_key_from_info(article: dict[str, str]) -> int:
+    """
+    Get the key identifying an article across runs from its info, as found in the output edges.
+
+    Parameters
+    ----------
+    article : dict[str, str]
+        The article info.
+
+    Returns
+    -------
+    int
+        The article key.
+    """
+
+    return get_record_key(article, get_article_key_columns(article))
+
+
+def apply_to_categories(values: pd.Series, function) -> pd.Series:
+    """
+    Apply a function transforming a Series to the categories of a categorical Series, instead of to every row.
+
+    Parameters
+    ----------
+    values : pd.Series
+        The categorical Series.
+    function : Callable[[pd.Series], pd.Series]
+        The function transforming a Series of values.
+
+    Returns
+    -------
+    pd.Series
+        The categorical Series with transformed values. Categories transformed to the same value are merged.
+    """
+
+    categories = pd.Series(values.cat.categories, dtype=object)
+    mapping = pd.Series(function(categories).to_numpy(), index=categories.to_numpy())
+
+    return values.map(mapping).astype("category")
+
+
+def get_memory_usage(data: dict[str, pd.DataFrame]) -> dict[str, int]:
+    """
+    Get the memory used by each table, including the Python objects it holds.
+
+    Parameters
+    ----------
+    data : dict[str, pd.DataFrame]
+        The tables.
+
+    Returns
+    -------
+    dict[str, int]
+        The number of bytes used by each table.
+    """
+
+    return {
+        table_name: int(table.memory_usage(deep=True).sum())
+        for table_name, table in data.items()
+    }
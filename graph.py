@@ -1,98 +1,214 @@
 """
-This script allows you to draw a graph of the data from a data.json file generated by the ETL process.
-Run it with: `python graph.py`
+This script allows you to draw a graph of the data from a data.json file generated by the ETL process,
+or to export it to a GraphML, GEXF or edge list file.
+Run it with: `python graph.py`, or `python graph.py --export graph.graphml --top 500` for large outputs.
 """
 
-import matplotlib.pyplot as plt
+import argparse
+import os
+import sys
+
 import networkx as nx
 import pandas as pd
 
+from etl.normalized import denormalize_tables, read_normalized_tables
+
+EXPORT_FORMATS = (".graphml", ".gexf", ".edgelist")
+# spring layouts and labels become unreadable and slow past this size
+MAX_DRAWN_NODES = 1000
 
-def load_data() -> pd.DataFrame:
+
+def load_data(path: str = "data.json") -> pd.DataFrame:
     """
-    Loads the data.json file.
+    Loads the data.json file, or the folder of normalized tables written with a Parquet or Feather output format.
     """
-    with open("data.json", "r", encoding="UTF-8") as f:
+    if os.path.isdir(path):
+        return denormalize_tables(read_normalized_tables(path))
+
+    with open(path, "r", encoding="UTF-8") as f:
         return pd.read_json(f, convert_dates=False)
 
 
 def create_pandas_edgelist(data: pd.DataFrame) -> pd.DataFrame:
     """
     Creates a pandas edgelist DataFrame from the data.json file.
+
+    Each row gives a drug -> article edge, or a drug -> journal edge when the article has no scientific title,
+    then a drug -> journal edge. The nested drug and article records are flattened in a single pass.
+    """
+    if data.empty:
+        return pd.DataFrame(columns=["source", "target", "relationship", "date"])
+
+    sources = [drug["drug"] for drug in data["drug"]]
+    journals = data["journal"].tolist()
+    articles_targets = [
+        article.get("scientific_title", journal)
+        for article, journal in zip(data["article"], journals)
+    ]
+    relationships = data["relationship"].tolist()
+    dates = data["date"].tolist()
+
+    return pd.DataFrame(
+        {
+            "source": sources + sources,
+            "target": articles_targets + journals,
+            "relationship": relationships + relationships,
+            "date": dates + dates,
+        }
+    )
+
+
+def select_data(
+    data: pd.DataFrame,
+    drugs: list[str] | None = None,
+    journals: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Keeps the rows of the data.json file referencing the chosen drugs and journals.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The data.json file into a pandas DataFrame.
+    drugs : list[str] | None
+        The drugs to keep, case insensitive. All drugs are kept if None.
+    journals : list[str] | None
+        The journals to keep. All journals are kept if None.
+
+    Returns
+    -------
+    pd.DataFrame
+        The selected rows.
     """
-    pandas_edgelist = pd.DataFrame()
-
-    for _, row in data.iterrows():
-        try:
-            pandas_edgelist = pd.concat(
-                [
-                    pandas_edgelist,
-                    pd.DataFrame(
-                        data=[
-                            {
-                                "source": row["drug"]["drug"],
-                                "target": row["article"]["scientific_title"],
-                                "relationship": row["relationship"],
-                                "date": row["date"],
-                            }
-                        ]
-                    ),
-                ],
-                ignore_index=True,
-            )
-        except KeyError:
-            pandas_edgelist = pd.concat(
-                [
-                    pandas_edgelist,
-                    pd.DataFrame(
-                        data=[
-                            {
-                                "source": row["drug"]["drug"],
-                                "target": row["journal"],
-                                "relationship": row["relationship"],
-                                "date": row["date"],
-                            }
-                        ]
-                    ),
-                ],
-                ignore_index=True,
-            )
-
-    for _, row in data.iterrows():
-        pandas_edgelist = pd.concat(
-            [
-                pandas_edgelist,
-                pd.DataFrame(
-                    data=[
-                        {
-                            "source": row["drug"]["drug"],
-                            "target": row["journal"],
-                            "relationship": row["relationship"],
-                            "date": row["date"],
-                        }
-                    ]
-                ),
-            ],
-            ignore_index=True,
+    if data.empty:
+        return data
+
+    selection = pd.Series(True, index=data.index)
+    if drugs:
+        drug_names = pd.Series(
+            [drug["drug"] for drug in data["drug"]], index=data.index
         )
+        selection &= drug_names.str.upper().isin([drug.upper() for drug in drugs])
+    if journals:
+        selection &= data["journal"].isin(journals)
+
+    return data[selection]
 
-    return pandas_edgelist
 
+def keep_top_nodes(graph: nx.DiGraph, top: int) -> nx.DiGraph:
+    """
+    Keeps the nodes with the highest degree in a graph.
+
+    Parameters
+    ----------
+    graph : nx.DiGraph
+        The graph.
+    top : int
+        The number of nodes to keep.
 
-def graph() -> bool:
+    Returns
+    -------
+    nx.DiGraph
+        The subgraph induced by the kept nodes.
     """
-    Draws a graph of the data.json file.
+    degrees = pd.Series(dict(graph.degree()), dtype="int64")
+    # stable sort, so ties keep the insertion order of the nodes
+    nodes = degrees.sort_values(ascending=False, kind="stable").index[:top]
+
+    return graph.subgraph(nodes).copy()
+
+
+def create_graph(
+    data: pd.DataFrame,
+    drugs: list[str] | None = None,
+    journals: list[str] | None = None,
+    top: int | None = None,
+) -> nx.DiGraph:
+    """
+    Creates the directed graph of the data.json file, optionally restricted to a subgraph.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The data.json file into a pandas DataFrame.
+    drugs : list[str] | None
+        Only keep the edges of these drugs.
+    journals : list[str] | None
+        Only keep the edges of articles published in these journals.
+    top : int | None
+        Only keep this number of nodes, with the highest degree.
+
+    Returns
+    -------
+    nx.DiGraph
+        The graph.
     """
-    data = load_data()
     graph = nx.from_pandas_edgelist(
-        create_pandas_edgelist(data), edge_attr=True, create_using=nx.DiGraph()
+        create_pandas_edgelist(select_data(data, drugs, journals)),
+        edge_attr=True,
+        create_using=nx.DiGraph(),
     )
+    if top is not None:
+        graph = keep_top_nodes(graph, top)
+
+    return graph
+
+
+def export_graph(graph: nx.DiGraph, path: str) -> None:
+    """
+    Exports a graph to a file, in the format given by its extension.
+
+    Parameters
+    ----------
+    graph : nx.DiGraph
+        The graph.
+    path : str
+        The path to the file: .graphml, .gexf or .edgelist (tab-separated, with the edge attributes).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Export format {extension} is not supported. Use one of {EXPORT_FORMATS}."
+        )
+
+    # GraphML and GEXF only accept strings and numbers as attributes
+    missing_dates = {
+        (source, target): ""
+        for source, target, date in graph.edges(data="date")
+        if pd.isna(date)
+    }
+    if missing_dates:
+        graph = graph.copy()
+        nx.set_edge_attributes(graph, missing_dates, "date")
+
+    if extension == ".graphml":
+        nx.write_graphml(graph, path)
+    elif extension == ".gexf":
+        nx.write_gexf(graph, path)
+    else:
+        # node names contain spaces
+        nx.write_edgelist(graph, path, delimiter="\t", data=["relationship", "date"])
+
+
+def draw_graph(graph: nx.DiGraph) -> None:
+    """
+    Draws a graph with matplotlib.
+    """
+    # imported here so exports work on headless machines without a display backend
+    import matplotlib.pyplot as plt
+
+    if graph.number_of_nodes() > MAX_DRAWN_NODES:
+        print(
+            f"Warning: drawing {graph.number_of_nodes()} nodes will be slow and unreadable. "
+            "Use --top, --drugs or --journals to draw a subgraph, or --export.",
+            file=sys.stderr,
+        )
 
     pos = nx.spring_layout(graph)
 
     edge_labels = dict(
         [
-            ((n1, n2), f'{attributes["relationship"]} the {attributes["date"]}')
+            ((n1, n2), f"{attributes['relationship']} the {attributes['date']}")
             for n1, n2, attributes in graph.edges(data=True)
         ]
     )
@@ -104,9 +220,59 @@ def graph() -> bool:
 
     plt.show()
 
+
+def graph(
+    path: str = "data.json",
+    export_path: str | None = None,
+    drugs: list[str] | None = None,
+    journals: list[str] | None = None,
+    top: int | None = None,
+) -> bool:
+    """
+    Draws a graph of the data.json file, or exports it to a file if `export_path` is set.
+    """
+    graph = create_graph(load_data(path), drugs, journals, top)
+
+    if export_path:
+        export_graph(graph, export_path)
+        print(
+            f"Graph of {graph.number_of_nodes()} nodes and {graph.number_of_edges()} edges exported to {export_path}."
+        )
+    else:
+        draw_graph(graph)
+
     return True
 
 
+def parse_arguments(arguments: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parses the command line arguments of the script.
+    """
+    parser = argparse.ArgumentParser(description="Draw or export the ETL graph.")
+    parser.add_argument(
+        "path",
+        nargs="?",
+        default="data.json",
+        help="The data.json file or the folder of normalized tables.",
+    )
+    parser.add_argument(
+        "--export",
+        dest="export_path",
+        help=f"Export the graph to this file instead of drawing it. Formats: {', '.join(EXPORT_FORMATS)}.",
+    )
+    parser.add_argument("--drugs", nargs="+", help="Only keep these drugs.")
+    parser.add_argument(
+        "--journals", nargs="+", help="Only keep articles of these journals."
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        help="Only keep this number of nodes, with the highest degree.",
+    )
+
+    return parser.parse_args(arguments)
+
+
 if __name__ == "__main__":
-    if graph():
+    if graph(**vars(parse_arguments())):
         print("Graph created successfully.")
@@ -1,52 +1,80 @@
 """
 This file contains the main function.
-Launch the program with the following command: `python main.py`
+Launch the program with the following command: `python main.py`,
+which accepts the options of `python -m etl run`, such as `--data-folder data --if-exists y`.
 """
 
-import pandas as pd
+import argparse
+import sys
+from typing import TYPE_CHECKING
 
-from etl.etl import ETL
+from etl.cli import parse_arguments, rank_journals, run
 
+# pandas and the ETL are imported when they are used, so the command line starts fast
+if TYPE_CHECKING:
+    import pandas as pd
 
-def main() -> bool:
+
+def main(arguments: list[str] | None = None) -> int:
     """
     Main function.
+    Run the ETL without prompting, then print the journal which quotes the most amount of drugs.
+
+    Parameters
+    ----------
+    arguments : list[str] | None
+        The options of `python -m etl run`. Defaults to `sys.argv`.
+
+    Returns
+    -------
+    int
+        The exit code.
     """
-    data_folder = input("Enter the path to the data folder: ")
-    if_exists = input("Do you want to overwrite the existing data? (y/[n]): ")
+    arguments = parse_arguments(
+        ["run", *(sys.argv[1:] if arguments is None else arguments)]
+    )
+    exit_code = run(arguments)
+    if exit_code:
+        return exit_code
 
-    return ETL().run(data_folder, if_exists)
+    return rank_journals(
+        argparse.Namespace(output=arguments.output, format=arguments.format, limit=1)
+    )
 
 
 def get_journal_which_quotes_the_most_amount_of_drugs(
-    data: pd.DataFrame,
+    data: "pd.DataFrame | str",
 ) -> tuple[str, int]:
     """
     Get the journal which quotes the most amount of drugs.
 
     Parameters
     ----------
-    data : pd.DataFrame
-        The data.json file into a pandas DataFrame.
+    data : pd.DataFrame | str
+        The data.json file into a pandas DataFrame,
+        or the path to the SQLite database loaded with `output_format="sqlite"`, queried through its indexes.
 
     Returns
     -------
     tuple[str, int]
         The journal name and the amount of drugs.
     """
-    ranking = data.groupby("journal").count()["drug"].sort_values(ascending=False)
-    return ranking.index[0], ranking.values[0]
+    if isinstance(data, str):
+        from etl.database import rank_journals as rank_database_journals
 
+        return rank_database_journals(data, limit=1)[0]
 
-if __name__ == "__main__":
-    if main():
-        print("ETL completed successfully.")
+    from etl.enums import ColumnTypesEnum
 
-    most_prolific_journal, nb_of_drugs = (
-        get_journal_which_quotes_the_most_amount_of_drugs(pd.read_json("data.json"))
-    )
-    print(
-        'The journal which quotes the most amount of drugs is "{}" with {} different drugs.'.format(
-            most_prolific_journal, nb_of_drugs
-        )
+    journals = data["journal"].astype(ColumnTypesEnum.journal.value)
+    drugs = data["drug"].str.get("drug")
+    ranking = (
+        drugs.groupby(journals, observed=True, sort=False)
+        .nunique()
+        .sort_values(ascending=False, kind="stable")
     )
+    return ranking.index[0], ranking.values[0]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
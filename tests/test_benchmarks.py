@@ -0,0 +1,61 @@
+import filecmp
+
+import pandas as pd
+
+from benchmarks.generator import generate_dataset
+from benchmarks.suite import STAGES, benchmark, compare_with_baseline
+from etl.readers import read_file
+
+
+def test_generated_dataset_is_deterministic(tmp_path):
+    generate_dataset(str(tmp_path / "first"), 300, drugs_count=20)
+    generate_dataset(str(tmp_path / "second"), 300, drugs_count=20)
+
+    comparison = filecmp.dircmp(tmp_path / "first", tmp_path / "second")
+    assert sorted(comparison.same_files) == [
+        "clinical_trials.csv",
+        "drugs.csv",
+        "pubmed.csv",
+        "pubmed.json",
+    ]
+    assert not comparison.diff_files
+
+
+def test_generated_dataset_has_data_folder_shapes(tmp_path):
+    generate_dataset(str(tmp_path), 1000, drugs_count=20)
+
+    for file_name in ["drugs.csv", "pubmed.csv", "pubmed.json", "clinical_trials.csv"]:
+        columns = read_file(f"data/{file_name}").columns.tolist()
+        assert read_file(str(tmp_path / file_name)).columns.tolist() == columns
+
+    drugs = pd.read_csv(tmp_path / "drugs.csv")
+    pubmed = pd.read_csv(tmp_path / "pubmed.csv")
+    assert len(drugs) == 20
+    assert len(pubmed) + len(read_file(str(tmp_path / "pubmed.json"))) == 500
+
+
+def test_benchmark_measures_every_stage(tmp_path):
+    generate_dataset(str(tmp_path / "data"), 200, drugs_count=10)
+
+    results = benchmark(str(tmp_path / "data"), str(tmp_path / "data.json"), repeat=1)
+
+    assert tuple(results) == STAGES
+    assert all(measures["seconds"] >= 0 for measures in results.values())
+    assert results["extract"]["peak_bytes"] > 0
+    assert (tmp_path / "data.json").exists()
+
+
+def test_slower_stage_is_a_regression():
+    baseline = {
+        "extract": {"seconds": 1.0, "peak_bytes": 1000},
+        "load": {"seconds": 1.0, "peak_bytes": 1000},
+    }
+    results = {
+        "extract": {"seconds": 1.1, "peak_bytes": 1100},
+        "load": {"seconds": 2.0, "peak_bytes": 2000},
+    }
+
+    regressions = compare_with_baseline(results, baseline, tolerance=0.25)
+
+    assert len(regressions) == 2
+    assert all(regression.startswith("load: ") for regression in regressions)
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from etl.catalog import Catalog
+from etl.util import get_drug_info_from_name
+
+
+@pytest.fixture
+def catalog():
+    """Fixture holding an article published in both sources and a duplicated title"""
+    return Catalog(
+        {
+            "pubmed": pd.DataFrame(
+                {
+                    "id": ["1", "2", "3"],
+                    "title": ["Article 1", "Article 2", "Article 1"],
+                    "date": ["01-01-2019", "02-01-2019", "03-01-2019"],
+                    "journal": ["Journal 1", "Journal 2", "Journal 3"],
+                }
+            ),
+            "clinical_trials": pd.DataFrame(
+                {
+                    "id": ["NCT1", "NCT2"],
+                    "scientific_title": ["Article 2", "Article 3"],
+                    "date": ["01-01-2020", "02-01-2020"],
+                    "journal": ["Journal 4", "Journal 5"],
+                }
+            ),
+            "drugs": pd.DataFrame({"atccode": ["A04AD"], "drug": ["DIPHENHYDRAMINE"]}),
+        }
+    )
+
+
+def test_get_article_journal_and_date_look_up_pubmed_first(catalog):
+    assert catalog.get_article_journal("Article 2") == "Journal 2"
+    assert catalog.get_article_date("Article 2") == "02-01-2019"
+    assert catalog.get_article_journal("Article 3") == "Journal 5"
+
+
+def test_get_article_info_looks_up_clinical_trials_first(catalog):
+    assert catalog.get_article_info("Article 2") == {
+        "id": "NCT1",
+        "scientific_title": "Article 2",
+        "date": "01-01-2020",
+        "journal": "Journal 4",
+    }
+
+
+def test_duplicated_title_returns_first_row(catalog):
+    assert catalog.get_article_info("Article 1")["id"] == "1"
+    assert catalog.get_article_journal("Article 1") == "Journal 1"
+
+
+def test_get_drug_info(catalog):
+    assert catalog.get_drug_info("DIPHENHYDRAMINE") == {
+        "atccode": "A04AD",
+        "drug": "DIPHENHYDRAMINE",
+    }
+
+
+def test_unknown_names_raise_index_error(catalog):
+    with pytest.raises(IndexError):
+        catalog.get_article_info("Unknown article")
+    with pytest.raises(IndexError):
+        catalog.get_drug_info("UNKNOWN")
+
+
+def test_lookups_see_tables_edited_in_place(catalog):
+    data = catalog.data
+
+    assert get_drug_info_from_name("DIPHENHYDRAMINE", data, catalog)["atccode"] == (
+        "A04AD"
+    )
+    data["drugs"].loc[0, "atccode"] = "R01AD"
+
+    assert get_drug_info_from_name("DIPHENHYDRAMINE", data)["atccode"] == "R01AD"
@@ -0,0 +1,136 @@
+import subprocess
+import sys
+
+import pytest
+
+import main as main_script
+from etl.cli import main
+from etl.etl import ETL
+
+HEAVY_MODULES = ("pandas", "numpy", "tqdm", "networkx", "matplotlib", "pyarrow")
+# cumulative import time of the command line, in microseconds, with a wide margin for slow machines
+IMPORT_TIME_BUDGET = 300_000
+
+
+def measure_imports(statement):
+    """Import modules in a fresh interpreter, returning the cumulative import time of each module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.removeprefix("import time:").split("|")
+        import_times[module.strip()] = int(cumulative)
+
+    return import_times
+
+
+@pytest.mark.parametrize(
+    "statement", ["import etl.cli", "import main", "import etl.index"]
+)
+def test_startup_does_not_import_heavy_modules(statement):
+    import_times = measure_imports(statement)
+
+    assert not [module for module in HEAVY_MODULES if module in import_times]
+
+
+def test_startup_import_time():
+    import_times = measure_imports("import etl.cli")
+
+    assert import_times["etl.cli"] < IMPORT_TIME_BUDGET
+
+
+def test_help_runs_without_the_etl():
+    result = subprocess.run(
+        [sys.executable, "-m", "etl", "--help"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert result.returncode == 0
+    assert "run" in result.stdout and "journals" in result.stdout
+
+
+def test_run_subcommand(tmp_path, capsys):
+    expected_path = str(tmp_path / "expected.json")
+    ETL(output_path=expected_path).run("data", "y")
+    output_path = str(tmp_path / "data.json")
+
+    exit_code = main(
+        [
+            "run",
+            "--data-folder",
+            "data",
+            "--if-exists",
+            "y",
+            "--output",
+            output_path,
+            "--workers",
+            "2",
+        ]
+    )
+
+    assert exit_code == 0
+    with (
+        open(expected_path, encoding="UTF-8") as expected,
+        open(output_path, encoding="UTF-8") as output,
+    ):
+        assert output.read() == expected.read()
+
+    assert main(["journals", "--output", output_path, "--limit", "2"]) == 0
+    printed = capsys.readouterr().out.splitlines()
+    assert printed[-2] == (
+        'The journal "Journal of emergency nursing" quotes 2 different drugs.'
+    )
+    assert printed[-1].endswith("quotes 2 different drugs.")
+
+
+def test_main_script_runs_without_prompting(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda *_: pytest.fail("input was called"))
+    database_path = str(tmp_path / "data.db")
+
+    assert main_script.main(["--output", database_path, "--format", "sqlite"]) == 0
+    assert capsys.readouterr().out.splitlines()[-1] == (
+        'The journal "Journal of emergency nursing" quotes 2 different drugs.'
+    )
+
+
+def test_journals_without_index(tmp_path, capsys):
+    assert main(["journals", "--output", str(tmp_path / "data.json")]) == 1
+    assert "No query index" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        ["run", "--if-exists", "maybe"],
+        ["run", "--format", "csv"],
+        ["run", "--engine", "spark"],
+        ["journals", "--format", "csv"],
+    ],
+)
+def test_invalid_arguments(arguments):
+    with pytest.raises(SystemExit) as error:
+        main(arguments)
+
+    assert error.value.code == 2
+
+
+def test_cli_output_formats_match_the_etl():
+    from etl.cli import ENGINES, OUTPUT_FORMATS
+    from etl.engines import ENGINES as ETL_ENGINES
+    from etl.etl import LOAD_FORMATS
+
+    assert set(OUTPUT_FORMATS) == set(LOAD_FORMATS)
+    assert set(ENGINES) == set(ETL_ENGINES)
+
+
+def test_unsupported_output_format_raises_value_error():
+    with pytest.raises(ValueError, match="parquet"):
+        ETL(output_format="csv")
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from etl.enums import TEXT_TYPE
+from etl.etl import ETL
+from etl.util import apply_to_categories, get_memory_usage
+
+
+def test_columns_get_compact_types():
+    data = pd.DataFrame(
+        {
+            "id": [1, 2],
+            "title": ["A title", "Another title"],
+            "date": ["01/01/2019", "01/01/2019"],
+            "journal": ["Journal", "Journal"],
+        }
+    )
+
+    data = ETL()._force_column_types(data)
+
+    assert data["id"].dtype == TEXT_TYPE
+    assert data["title"].dtype == TEXT_TYPE
+    assert isinstance(data["journal"].dtype, pd.CategoricalDtype)
+    assert data["journal"].cat.categories.tolist() == ["Journal"]
+    assert data["id"].tolist() == ["1", "2"]
+
+
+def test_missing_values_are_kept_as_text():
+    data = pd.DataFrame(
+        {"id": [float("nan"), "NCT1"], "journal": [float("nan"), "Journal"]}
+    )
+
+    data = ETL()._force_column_types(data)
+
+    assert data["id"].tolist() == ["nan", "NCT1"]
+    assert data["journal"].tolist() == ["nan", "Journal"]
+
+
+def test_compact_types_use_less_memory():
+    # without pyarrow, texts fall back to Python objects, which do not save memory
+    pytest.importorskip("pyarrow")
+    pubmed = pd.read_csv("data/pubmed.csv")
+    pubmed = pd.concat([pubmed] * 100, ignore_index=True)
+
+    memory_usage_before = get_memory_usage({"pubmed": pubmed})["pubmed"]
+    pubmed = ETL()._force_column_types(pubmed)
+
+    assert get_memory_usage({"pubmed": pubmed})["pubmed"] * 2 < memory_usage_before
+
+
+def test_apply_to_categories_merges_categories():
+    values = pd.Series(["Journal ", "Journal", "Other", "Journal "], dtype="category")
+
+    values = apply_to_categories(values, lambda categories: categories.str.strip())
+
+    assert values.tolist() == ["Journal", "Journal", "Other", "Journal"]
+    assert values.cat.categories.tolist() == ["Journal", "Other"]
+
+
+def test_categorical_columns_are_cleaned_and_normalized():
+    data = pd.DataFrame(
+        {
+            "date": pd.Series(["1 January 2020", "01/01/2020"], dtype="category"),
+            "journal": pd.Series(["Journal\\xc3\\x28", "Journal"], dtype="category"),
+        }
+    )
+
+    data = ETL()._apply_functional_constraints_(data)
+
+    assert data["date"].tolist() == ["01-01-2020", "01-01-2020"]
+    assert data["journal"].tolist() == ["Journal", "Journal"]
+    assert isinstance(data["journal"].dtype, pd.CategoricalDtype)
+
+
+def test_memory_report(tmp_path, capsys):
+    ETL(report_memory=True, output_path=str(tmp_path / "data.json")).run("data", "n")
+
+    output = capsys.readouterr().out
+    assert "Memory usage by table:" in output
+    assert "- pubmed: " in output
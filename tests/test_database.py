@@ -0,0 +1,123 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from etl.database import rank_journals, read_database, write_database
+from etl.etl import ETL
+from etl.readers import read_json
+from main import get_journal_which_quotes_the_most_amount_of_drugs
+
+
+@pytest.fixture
+def edges():
+    """Fixture holding graph edges sharing drugs, articles and journals"""
+    pubmed_article = {"id": "1", "title": "A", "journal": "J1", "date": "01-01-2020"}
+    trial_article = {
+        "id": "NCT1",
+        "scientific_title": "B",
+        "journal": "J2",
+        "date": "02-01-2020",
+    }
+    return pd.DataFrame(
+        {
+            "drug": [
+                {"atccode": "A01", "drug": "ETHANOL"},
+                {"atccode": "A01", "drug": "ETHANOL"},
+                {"atccode": "B01", "drug": "ATROPINE"},
+            ],
+            "article": [pubmed_article, trial_article, pubmed_article],
+            "journal": ["J1", "J2", "J1"],
+            "relationship": ["REFERENCED IN", "REFERENCED IN", "REFERENCED IN"],
+            "date": ["01-01-2020", "02-01-2020", "01-01-2020"],
+        }
+    )
+
+
+def count_rows(database_path, table_name):
+    with sqlite3.connect(database_path) as connection:
+        return connection.execute(f"SELECT count(*) FROM {table_name}").fetchone()[0]
+
+
+def test_database_round_trip(tmp_path, edges):
+    database_path = str(tmp_path / "data.db")
+
+    write_database(edges, database_path)
+
+    pd.testing.assert_frame_equal(read_database(database_path), edges)
+    assert count_rows(database_path, "drugs") == 2
+    assert count_rows(database_path, "articles") == 2
+    assert count_rows(database_path, "journals") == 2
+
+
+def test_database_uses_wal_and_indexes(tmp_path, edges):
+    database_path = str(tmp_path / "data.db")
+
+    write_database(edges, database_path)
+
+    with sqlite3.connect(database_path) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT count(DISTINCT drug_key) FROM edges GROUP BY journal_key"
+        ).fetchall()
+    assert "edges_journal_drug" in str(plan)
+
+
+def test_appended_edges_are_upserted(tmp_path, edges):
+    database_path = str(tmp_path / "data.db")
+
+    write_database(edges, database_path)
+    updated = edges.iloc[[0]].assign(date="03-01-2020")
+    write_database(updated, database_path, if_exists="append")
+
+    loaded = read_database(database_path)
+    assert len(loaded) == 3
+    assert loaded["date"].tolist() == ["03-01-2020", "02-01-2020", "01-01-2020"]
+
+
+def test_replaced_database_only_keeps_last_edges(tmp_path, edges):
+    database_path = str(tmp_path / "data.db")
+
+    write_database(edges, database_path)
+    write_database(edges.iloc[[1]], database_path, if_exists="replace")
+
+    assert len(read_database(database_path)) == 1
+    assert count_rows(database_path, "drugs") == 1
+
+
+def test_failed_load_leaves_database_unchanged(tmp_path, edges):
+    database_path = str(tmp_path / "data.db")
+    write_database(edges, database_path)
+
+    broken = edges.assign(drug=[{"atccode": "A01"}] * 3)
+    with pytest.raises(KeyError):
+        write_database(broken, database_path)
+
+    pd.testing.assert_frame_equal(read_database(database_path), edges)
+
+
+def test_rank_journals(tmp_path, edges):
+    database_path = str(tmp_path / "data.db")
+    write_database(edges, database_path)
+
+    assert rank_journals(database_path) == [("J1", 2), ("J2", 1)]
+    assert get_journal_which_quotes_the_most_amount_of_drugs(database_path) == (
+        "J1",
+        2,
+    )
+
+
+@pytest.mark.parametrize("if_exists", ["y", "n"])
+def test_etl_sqlite_output(tmp_path, if_exists):
+    json_path = str(tmp_path / "data.json")
+    database_path = str(tmp_path / "data.db")
+
+    ETL(output_path=json_path).run("data", if_exists)
+    for _ in range(2):
+        ETL(output_path=database_path, output_format="sqlite").run("data", if_exists)
+
+    data = read_json(json_path)
+    pd.testing.assert_frame_equal(read_database(database_path), data)
+    assert get_journal_which_quotes_the_most_amount_of_drugs(
+        database_path
+    ) == get_journal_which_quotes_the_most_amount_of_drugs(data)
@@ -0,0 +1,61 @@
+import pandas as pd
+
+from etl.dates import DateNormalizer
+from etl.etl import ETL
+
+
+def test_dates_are_normalized_day_first():
+    dates = pd.Series(["01/02/2019", "2020-01-03", "1 January 2020", "25/05/2020"])
+
+    normalized_dates = DateNormalizer().normalize(dates)
+
+    assert normalized_dates.tolist() == [
+        "01-02-2019",
+        "03-01-2020",
+        "01-01-2020",
+        "25-05-2020",
+    ]
+
+
+def test_dates_match_mixed_format_inference():
+    dates = pd.Series(
+        ["1/2/2019", "2020-01-03", "3 Feb 2021", "2020.01.04", "01-02-2020"]
+    )
+
+    expected = pd.to_datetime(dates, dayfirst=True, format="mixed").dt.strftime(
+        "%d-%m-%Y"
+    )
+
+    assert DateNormalizer().normalize(dates).tolist() == expected.tolist()
+
+
+def test_each_distinct_date_is_parsed_once(monkeypatch):
+    normalizer = DateNormalizer()
+    parsed_texts = []
+    parse = normalizer._parse
+    monkeypatch.setattr(
+        normalizer, "_parse", lambda texts: parsed_texts.extend(texts) or parse(texts)
+    )
+
+    normalizer.normalize(pd.Series(["01/01/2019", "01/01/2019", "2020-01-01"]))
+    normalizer.normalize(pd.Series(["2020-01-01", "02/01/2019"]))
+
+    assert parsed_texts == ["01/01/2019", "2020-01-01", "02/01/2019"]
+
+
+def test_missing_dates_are_kept_missing():
+    normalized_dates = DateNormalizer().normalize(pd.Series(["01/01/2019", None]))
+
+    assert normalized_dates[0] == "01-01-2019"
+    assert pd.isna(normalized_dates[1])
+
+
+def test_unparseable_dates_are_reported(capsys):
+    data = pd.DataFrame({"date": ["01/01/2019", "not a date"]})
+
+    etl = ETL()
+    data = etl._normalize_date_formats(data)
+
+    assert data["date"].tolist() == ["01-01-2019", "not a date"]
+    assert etl.date_normalizer.unparseable_dates == {"not a date"}
+    assert "not a date" in capsys.readouterr().err
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+from etl.deduplication import Deduplicator, HashedKeySet
+from etl.etl import ETL
+from etl.readers import read_json
+
+
+def test_rows_with_same_normalized_title_are_dropped():
+    data = pd.DataFrame(
+        {
+            "id": ["1", "2", "3"],
+            "title": ["Aspirin  and pain", " aspirin and PAIN ", "Other"],
+        }
+    )
+
+    result = Deduplicator().deduplicate(data, "pubmed")
+
+    assert result["id"].tolist() == ["1", "3"]
+    assert result.index.tolist() == [0, 2]
+
+
+def test_missing_keys_are_not_duplicates():
+    data = pd.DataFrame(
+        {
+            "id": ["1", "", np.nan, "1"],
+            "title": ["A", "B", "C", ""],
+        }
+    )
+
+    result = Deduplicator().deduplicate(data, "pubmed")
+
+    assert result["title"].tolist() == ["A", "B", "C"]
+
+
+def test_deduplication_with_copy_on_write():
+    data = pd.DataFrame({"id": ["1", None, "1 "], "title": ["A", "B", " a"]})
+
+    with pd.option_context("mode.copy_on_write", True):
+        result = Deduplicator().deduplicate(data, "pubmed")
+
+    assert result["title"].tolist() == ["A", "B"]
+
+
+def test_duplicates_are_dropped_across_chunks():
+    deduplicator = Deduplicator()
+    first_chunk = pd.DataFrame({"id": ["1", "2"], "scientific_title": ["A", "B"]})
+    second_chunk = pd.DataFrame({"id": ["3", "2"], "scientific_title": ["a", "C"]})
+
+    deduplicator.deduplicate(first_chunk, "clinical_trials")
+    result = deduplicator.deduplicate(second_chunk, "clinical_trials")
+
+    assert result.empty
+    assert deduplicator.nbytes == 8 * 6
+
+    deduplicator.reset()
+    assert len(deduplicator.deduplicate(second_chunk, "clinical_trials")) == 2
+
+
+def test_tables_without_keys_are_untouched():
+    data = pd.DataFrame({"atccode": ["A", "A"], "drug": ["X", "X"]})
+
+    assert Deduplicator().deduplicate(data, "drugs") is data
+    assert Deduplicator({"pubmed": ("title",)}).deduplicate(data, "drugs") is data
+
+
+def test_hashed_key_set():
+    key_set = HashedKeySet()
+    assert not key_set.contains(np.array([1, 2], dtype=np.uint64)).any()
+
+    key_set.add(np.array([5, 1, 5], dtype=np.uint64))
+
+    assert len(key_set) == 2
+    assert key_set.contains(np.array([1, 2, 5, 9], dtype=np.uint64)).tolist() == [
+        True,
+        False,
+        True,
+        False,
+    ]
+
+
+def test_hashed_key_set_merges_a_logarithmic_number_of_runs():
+    key_set = HashedKeySet()
+    chunks = np.arange(1024 * 100, dtype=np.uint64).reshape(1024, 100)
+
+    for chunk in chunks:
+        key_set.add(chunk)
+        key_set.add(chunk[:10])
+
+    assert len(key_set) == chunks.size
+    assert len(key_set._runs) <= 11
+    assert key_set.contains(chunks[::7, 3]).all()
+    assert not key_set.contains(np.array([chunks.size], dtype=np.uint64)).any()
+
+
+def test_etl_drops_articles_repeated_across_files(tmp_path):
+    data_folder = tmp_path / "data"
+    data_folder.mkdir()
+    pd.DataFrame({"atccode": ["A"], "drug": ["ASPIRIN"]}).to_csv(
+        data_folder / "drugs.csv", index=False
+    )
+    pd.DataFrame(
+        {
+            "id": [1],
+            "title": ["Aspirin for pain"],
+            "date": ["01/01/2020"],
+            "journal": ["J"],
+        }
+    ).to_csv(data_folder / "pubmed.csv", index=False)
+    pd.DataFrame(
+        {
+            "id": [""],
+            "title": ["Aspirin  for pain "],
+            "date": ["01/01/2020"],
+            "journal": ["J"],
+        }
+    ).to_json(data_folder / "pubmed.json", orient="records")
+    pd.DataFrame(
+        {
+            "id": ["NCT1"],
+            "scientific_title": ["Placebo"],
+            "date": ["1 January 2020"],
+            "journal": ["J"],
+        }
+    ).to_csv(data_folder / "clinical_trials.csv", index=False)
+    output_path = str(tmp_path / "data.json")
+
+    ETL(output_path=output_path).run(str(data_folder), "n")
+    assert len(read_json(output_path)) == 1
+
+    ETL(output_path=output_path, deduplication_keys={}).run(str(data_folder), "n")
+    assert len(read_json(output_path)) == 2
@@ -0,0 +1,51 @@
+import pytest
+
+from etl.matcher import DrugMatcher, ShardedDrugMatcher
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Diphenhydramine hydrochloride helps symptoms of ciguatera fish poisoning.",
+        "Comparison of pressure BETAMETHASONE release, upper trapezius ATROPINE muscle.",
+        "Rapid reacquisition of contextual fear: tetracycline acute ethanol withdrawal.",
+        "Methanol and ethanol intoxication",
+        "No drug in this title",
+        "",
+    ],
+)
+def test_find_gives_same_results_as_substring_search(text):
+    drugs = ["DIPHENHYDRAMINE", "TETRACYCLINE", "ETHANOL", "METHANOL", "ATROPINE"]
+    drugs += ["BETAMETHASONE", "ETHAN"]
+
+    expected = [
+        index for index, drug in enumerate(drugs) if drug.lower() in text.lower()
+    ]
+
+    assert DrugMatcher(drugs).find(text) == expected
+
+
+def test_find_returns_every_index_of_a_duplicated_drug():
+    matcher = DrugMatcher(["ETHANOL", "ATROPINE", "ethanol"])
+
+    assert matcher.find("Acute ethanol withdrawal") == [0, 2]
+
+
+def test_find_with_word_boundary():
+    matcher = DrugMatcher(["ETHANOL", "ETHAN"], word_boundary=True)
+
+    assert matcher.find("Acute ethanol withdrawal") == [0]
+    assert matcher.find("Methanol intoxication") == []
+    assert matcher.find("ethanol-induced damage") == [0]
+
+
+def test_sharded_matcher_gives_same_results_as_matcher():
+    drugs = ["ETHANOL", "ATROPINE", "ETHAN", "ethanol", "TETRACYCLINE"]
+    texts = [
+        f"Article {index} on {drugs[index % len(drugs)].lower()}" for index in range(50)
+    ]
+    texts += ["Acute ethanol withdrawal and atropine", "No drug"]
+
+    with ShardedDrugMatcher(drugs, workers=2) as matcher:
+        assert matcher.match(texts) == DrugMatcher(drugs).match(texts)
+        assert matcher.match([]) == [[] for _ in drugs]
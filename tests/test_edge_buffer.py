@@ -0,0 +1,31 @@
+import pandas as pd
+
+from etl.edges import EdgeBuffer
+
+
+def test_to_dataframe_keeps_edges_order_and_columns():
+    edges = EdgeBuffer(["source", "target"])
+    edges.append({"target": "Article 1", "source": "DRUG 1"})
+    edges.extend({"source": ["DRUG 2", "DRUG 3"], "target": ["Article 2", "Article 3"]})
+
+    assert len(edges) == 3
+    pd.testing.assert_frame_equal(
+        edges.to_dataframe(),
+        pd.DataFrame(
+            {
+                "source": ["DRUG 1", "DRUG 2", "DRUG 3"],
+                "target": ["Article 1", "Article 2", "Article 3"],
+            }
+        ),
+    )
+
+
+def test_to_dataframe_keeps_dictionaries_as_cells():
+    edges = EdgeBuffer(["drug", "date"])
+    edges.append({"drug": {"drug": "ETHANOL"}, "date": "01-01-2020"})
+
+    assert edges.to_dataframe()["drug"][0] == {"drug": "ETHANOL"}
+
+
+def test_empty_buffer_gives_empty_dataframe():
+    assert EdgeBuffer(["source", "target"]).to_dataframe().empty
@@ -0,0 +1,94 @@
+import pytest
+
+from etl.etl import ETL
+from etl.plan import Plan
+
+pytest.importorskip("duckdb")
+
+
+def read_output(output_path):
+    with open(output_path, "r", encoding="UTF-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("if_exists", ["y", "n"])
+@pytest.mark.parametrize("word_boundary", [False, True])
+def test_duckdb_engine_gives_the_pandas_output(tmp_path, if_exists, word_boundary):
+    outputs = {}
+    for engine in ["pandas", "duckdb"]:
+        output_path = str(tmp_path / f"{engine}.json")
+        ETL(output_path=output_path, word_boundary=word_boundary).run(
+            "data", if_exists, engine=engine
+        )
+        outputs[engine] = read_output(output_path)
+
+    assert outputs["duckdb"] == outputs["pandas"]
+
+
+def test_duckdb_engine_applies_plan_filters(tmp_path):
+    outputs = {}
+    for engine in ["pandas", "duckdb"]:
+        output_path = str(tmp_path / f"{engine}.json")
+        ETL(output_path=output_path).plan("data", "n", engine=engine).where_dates(
+            "01-01-2020", "31-01-2020"
+        ).execute()
+        outputs[engine] = read_output(output_path)
+
+    assert outputs["duckdb"] == outputs["pandas"]
+
+
+def test_duckdb_engine_deduplicates_keys(tmp_path):
+    data_folder = tmp_path / "data"
+    data_folder.mkdir()
+    (data_folder / "drugs.csv").write_text("atccode,drug\nA01,ASPIRIN\n")
+    (data_folder / "pubmed.csv").write_text(
+        "id,title,date,journal\n"
+        "1,Aspirin and pain,01/01/2020,Journal A\n"
+        "1,Aspirin  and PAIN,01/01/2020,Journal B\n"
+        "2,Aspirin for all,1 January 2020,Journal C\n"
+    )
+    (data_folder / "clinical_trials.csv").write_text(
+        "id,scientific_title,date,journal\n"
+    )
+
+    outputs = {}
+    for engine in ["pandas", "duckdb"]:
+        output_path = str(tmp_path / f"{engine}.json")
+        ETL(output_path=output_path).run(str(data_folder), "n", engine=engine)
+        outputs[engine] = read_output(output_path)
+
+    assert outputs["duckdb"] == outputs["pandas"]
+    assert "Journal B" not in outputs["duckdb"]
+
+
+def test_duckdb_engine_records_stages(tmp_path):
+    stages = []
+    ETL(
+        output_path=str(tmp_path / "data.json"),
+        callbacks=[lambda record: stages.append(record["stage"])],
+    ).run("data", "n", engine="duckdb")
+
+    assert "run/extract" in stages
+    assert "run/transform/pubmed/keys" in stages
+    assert "run/matching" in stages
+    assert "run/load" in stages
+
+
+def test_duckdb_engine_rejects_incremental_runs(tmp_path):
+    etl = ETL(output_path=str(tmp_path / "data.json"), incremental=True)
+
+    with pytest.raises(ValueError):
+        etl.run("data", "n", engine="duckdb")
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        Plan(ETL(), "data", "n", engine="spark")
+
+
+def test_explain_names_the_engine():
+    explanation = ETL(chunk_size=10).plan("data", "n", engine="duckdb").explain()
+
+    assert explanation.splitlines()[0] == "1. Extract from data (append, whole files)"
+    assert "2. Transform with the duckdb engine" in explanation
+    assert "as a join" in explanation
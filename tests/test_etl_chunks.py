@@ -0,0 +1,36 @@
+import os
+
+import pandas as pd
+import pytest
+
+from etl.etl import ETL
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+@pytest.mark.parametrize("if_exists", ["append", "replace", "ignore"])
+def test_chunked_run_gives_same_graph_as_full_run(chunk_size, if_exists):
+    etl = ETL()
+    expected = etl._transform(etl._extract("data", if_exists))
+
+    result = ETL(chunk_size=chunk_size)._extract_and_transform_by_chunks(
+        "data", if_exists
+    )
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_select_files_follows_if_exists(tmp_path):
+    for file in ["pubmed.csv", "pubmed.json", "drugs.csv", "notes.txt"]:
+        (tmp_path / file).touch()
+    folder = str(tmp_path)
+    listed = [file for file in sorted(os.listdir(folder)) if file.startswith("pubmed")]
+
+    files = ETL()._select_files(folder, "append")
+    assert files["pubmed"] == [folder + "/" + file for file in listed]
+    assert files["drugs"] == [folder + "/drugs.csv"]
+    assert "notes" not in files
+
+    assert ETL()._select_files(folder, "replace")["pubmed"] == [
+        folder + "/" + listed[-1]
+    ]
+    assert ETL()._select_files(folder, "ignore")["pubmed"] == [folder + "/" + listed[0]]
@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+import pytest
+
+from etl.etl import ETL
+
+
+@pytest.mark.parametrize("if_exists", ["append", "replace", "ignore"])
+def test_parallel_extract_gives_same_data_as_serial_extract(if_exists):
+    expected = ETL()._extract("data", if_exists)
+
+    result = ETL(workers=2)._extract("data", if_exists)
+
+    assert list(result.keys()) == list(expected.keys())
+    for file_name, dataframe in expected.items():
+        pd.testing.assert_frame_equal(result[file_name], dataframe)
+
+
+def test_extract_appends_files_sharing_a_name():
+    data = ETL()._extract("data", "append")
+
+    assert len(data["pubmed"]) == 13
+    assert data["pubmed"].index.tolist() == list(range(13))
+
+
+def test_files_are_selected_in_alphabetical_order(monkeypatch):
+    expected = ETL()._select_files("data", "append")
+    listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda path: listdir(path)[::-1])
+
+    assert ETL()._select_files("data", "append") == expected
+    assert expected["pubmed"] == ["data/pubmed.csv", "data/pubmed.json"]
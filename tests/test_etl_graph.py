@@ -0,0 +1,18 @@
+import pytest
+
+from etl.etl import ETL
+
+
+@pytest.mark.parametrize("chunk_size", [None, 2])
+def test_parallel_graph_is_identical_to_serial_graph(chunk_size):
+    expected = ETL()._transform(ETL()._extract("data", "append"))
+
+    etl = ETL(workers=2, chunk_size=chunk_size)
+    if chunk_size:
+        result = etl._extract_and_transform_by_chunks("data", "append")
+    else:
+        result = etl._transform(etl._extract("data", "append"))
+
+    assert result.to_json(orient="records", force_ascii=False) == expected.to_json(
+        orient="records", force_ascii=False
+    )
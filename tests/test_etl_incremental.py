@@ -0,0 +1,48 @@
+import json
+import shutil
+
+import pytest
+
+from etl.etl import ETL
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """Fixture copying the data folder into a temporary working directory"""
+    shutil.copytree("data", tmp_path / "data")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def load_edges(path):
+    with open(path, encoding="UTF-8") as f:
+        return sorted(
+            (edge["drug"]["drug"], edge["article"]["id"], edge["date"])
+            for edge in json.load(f)
+        )
+
+
+def test_incremental_run_gives_same_edges_as_full_run(workspace):
+    ETL(incremental=True).run("data", "n")
+    assert (workspace / "data.manifest.json").exists()
+
+    clinical_trials = (workspace / "data/clinical_trials.csv").read_text()
+    (workspace / "data/clinical_trials.csv").write_text(
+        clinical_trials.rsplit("\n", 1)[0]
+    )
+    (workspace / "data/pubmed.json").unlink()
+
+    ETL(incremental=True).run("data", "n")
+    incremental_edges = load_edges(workspace / "data.json")
+
+    ETL().run("data", "n")
+    assert incremental_edges == load_edges(workspace / "data.json")
+
+
+def test_incremental_run_skips_unchanged_files(workspace, capsys):
+    ETL(incremental=True).run("data", "n")
+    (workspace / "data/drugs.csv").touch()
+
+    ETL(incremental=True).run("data", "n")
+
+    assert "No file changed since the previous run." in capsys.readouterr().out
@@ -0,0 +1,98 @@
+import networkx as nx
+import pandas as pd
+import pytest
+
+from graph import (
+    create_graph,
+    create_pandas_edgelist,
+    export_graph,
+    keep_top_nodes,
+    load_data,
+    select_data,
+)
+
+
+def create_edgelist_row_by_row(data: pd.DataFrame) -> pd.DataFrame:
+    rows = []
+    for _, row in data.iterrows():
+        try:
+            target = row["article"]["scientific_title"]
+        except KeyError:
+            target = row["journal"]
+        rows.append([row["drug"]["drug"], target, row["relationship"], row["date"]])
+    for _, row in data.iterrows():
+        rows.append(
+            [row["drug"]["drug"], row["journal"], row["relationship"], row["date"]]
+        )
+
+    return pd.DataFrame(rows, columns=["source", "target", "relationship", "date"])
+
+
+def test_edgelist_matches_row_by_row_construction():
+    data = load_data("data.json")
+
+    pd.testing.assert_frame_equal(
+        create_pandas_edgelist(data), create_edgelist_row_by_row(data)
+    )
+
+
+def test_edgelist_of_empty_data_is_empty():
+    edgelist = create_pandas_edgelist(pd.DataFrame())
+
+    assert edgelist.empty
+    assert edgelist.columns.tolist() == ["source", "target", "relationship", "date"]
+
+
+def test_select_data_by_drugs_and_journals():
+    data = load_data("data.json")
+
+    selected = select_data(data, drugs=["tetracycline"])
+    assert {drug["drug"] for drug in selected["drug"]} == {"TETRACYCLINE"}
+
+    selected = select_data(
+        data, drugs=["TETRACYCLINE"], journals=["Psychopharmacology"]
+    )
+    assert selected["journal"].unique().tolist() == ["Psychopharmacology"]
+    assert len(selected) < len(select_data(data, drugs=["TETRACYCLINE"]))
+
+
+def test_keep_top_nodes_keeps_highest_degrees():
+    graph = nx.DiGraph([("A", "x"), ("A", "y"), ("A", "z"), ("B", "x"), ("C", "w")])
+
+    top_graph = keep_top_nodes(graph, 2)
+
+    assert set(top_graph.nodes) == {"A", "x"}
+    assert list(top_graph.edges) == [("A", "x")]
+
+
+def test_create_graph_caps_nodes():
+    graph = create_graph(load_data("data.json"), top=5)
+
+    assert graph.number_of_nodes() == 5
+
+
+@pytest.mark.parametrize("extension", [".graphml", ".gexf", ".edgelist"])
+def test_export_graph(tmp_path, extension):
+    graph = create_graph(load_data("data.json"))
+    path = str(tmp_path / f"graph{extension}")
+
+    export_graph(graph, path)
+
+    if extension == ".graphml":
+        exported = nx.read_graphml(path)
+    elif extension == ".gexf":
+        exported = nx.read_gexf(path)
+    else:
+        exported = nx.read_edgelist(
+            path,
+            delimiter="\t",
+            data=[("relationship", str), ("date", str)],
+            create_using=nx.DiGraph(),
+        )
+    assert exported.number_of_nodes() == graph.number_of_nodes()
+    assert exported.number_of_edges() == graph.number_of_edges()
+
+
+def test_export_graph_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_graph(nx.DiGraph(), str(tmp_path / "graph.png"))
@@ -0,0 +1,151 @@
+import os
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+from etl.cache import InputCache
+from etl.etl import ETL
+from etl.readers import read_file
+
+pytest.importorskip("pyarrow")
+
+
+def write_csv(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def test_cached_file_is_read_as_parsed(tmp_path):
+    cache = InputCache(str(tmp_path / "cache"))
+
+    for file_path in [
+        "data/pubmed.csv",
+        "data/pubmed.json",
+        "data/clinical_trials.csv",
+    ]:
+        parsed = read_file(file_path)
+
+        assert cache.read(file_path).equals(parsed)
+        cached = cache.read(file_path)
+
+        assert cached.dtypes.equals(parsed.dtypes)
+        assert cached.astype(str).equals(parsed.astype(str))
+    assert (cache.hits, cache.misses) == (3, 3)
+
+
+def test_json_nulls_and_missing_keys_are_kept_apart(tmp_path):
+    file_path = tmp_path / "pubmed.json"
+    file_path.write_text(
+        '[{"id": 1, "title": null}, {"id": "2"}, {"id": 3, "title": "A"}]'
+    )
+    cache = InputCache(str(tmp_path / "cache"))
+
+    cache.read(str(file_path))
+    cached = cache.read(str(file_path))
+
+    assert cached["title"][0] is None
+    assert pd.isna(cached["title"][1]) and cached["title"][1] is not None
+    assert cached.astype(str).equals(read_file(str(file_path)).astype(str))
+
+
+def test_changed_file_or_columns_are_parsed_again(tmp_path):
+    file_path = write_csv(tmp_path / "drugs.csv", {"atccode": ["A"], "drug": ["X"]})
+    cache = InputCache(str(tmp_path / "cache"))
+
+    cache.read(file_path)
+    cache.read(file_path, ("drug",))
+    write_csv(tmp_path / "drugs.csv", {"atccode": ["A"], "drug": ["Y"]})
+    data = cache.read(file_path)
+
+    assert cache.misses == 3
+    assert data["drug"].tolist() == ["Y"]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache_folder = tmp_path / "cache"
+    paths = [
+        write_csv(tmp_path / f"{name}.csv", {"drug": [name * 100] * 100})
+        for name in "abc"
+    ]
+    cache = InputCache(str(cache_folder))
+    cache.read(paths[0])
+    entry_size = cache.nbytes
+    cache.max_bytes = 2 * entry_size
+
+    cache.read(paths[1])
+    time.sleep(0.01)
+    cache.read(paths[0])
+    time.sleep(0.01)
+    cache.read(paths[2])
+
+    assert cache.nbytes <= cache.max_bytes
+    cache.read(paths[0])
+    cache.read(paths[1])
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_invalidate(tmp_path):
+    first = write_csv(tmp_path / "drugs.csv", {"drug": ["X"]})
+    second = write_csv(tmp_path / "pubmed.csv", {"title": ["Y"]})
+    cache = InputCache(str(tmp_path / "cache"))
+    cache.read(first)
+    cache.read(first, ("drug",))
+    cache.read(second)
+
+    cache.invalidate(first)
+    assert len(os.listdir(tmp_path / "cache")) == 1
+
+    cache.invalidate()
+    assert cache.nbytes == 0
+
+
+def test_etl_output_is_the_same_with_the_cache(tmp_path):
+    output_path = str(tmp_path / "data.json")
+    ETL(output_path=output_path).run("data", "n")
+    with open(output_path, encoding="UTF-8") as f:
+        expected = f.read()
+
+    for workers in [1, 1, 2]:
+        etl = ETL(
+            output_path=output_path,
+            workers=workers,
+            cache_path=str(tmp_path / "cache"),
+        )
+        etl.run("data", "n")
+        with open(output_path, encoding="UTF-8") as f:
+            assert f.read() == expected
+
+    assert ETL(cache_path=str(tmp_path / "cache")).input_cache.nbytes > 0
+
+
+def test_workers_do_not_need_to_pickle_the_etl(tmp_path):
+    output_path = str(tmp_path / "data.json")
+    ETL(output_path=output_path).run("data", "n")
+    with open(output_path, encoding="UTF-8") as f:
+        expected = f.read()
+    records = []
+
+    etl = ETL(
+        output_path=output_path,
+        workers=2,
+        callbacks=[lambda record: records.append(record)],
+        cache_path=str(tmp_path / "cache"),
+    )
+    assert (
+        etl.plan("data", "n").where("drugs", lambda data: data["drug"] != "").execute()
+    )
+
+    with open(output_path, encoding="UTF-8") as f:
+        assert f.read() == expected
+    assert records
+
+
+def test_cache_is_disabled_without_pyarrow(tmp_path, monkeypatch, capsys):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    etl = ETL(cache_path=str(tmp_path / "cache"))
+
+    assert etl.input_cache is None and etl.cache_path is None
+    assert "The input cache is disabled." in capsys.readouterr().err
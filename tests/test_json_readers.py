@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from etl.readers import iter_json_chunks, iter_json_records
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1 << 16])
+def test_iter_json_records_reads_array_by_blocks(block_size):
+    with open("data/pubmed.json", encoding="UTF-8") as file:
+        expected = json.load(file)
+
+    assert list(iter_json_records("data/pubmed.json", block_size)) == expected
+
+
+@pytest.mark.parametrize("block_size", [1, 1 << 16])
+def test_iter_json_records_tolerates_trailing_commas(tmp_path, block_size):
+    file_path = tmp_path / "pubmed.json"
+    file_path.write_text('[\n{"id": 1, "tags": ["a", "b",],},\n{"id": "2,}"},\n]\n')
+
+    assert list(iter_json_records(str(file_path), block_size)) == [
+        {"id": 1, "tags": ["a", "b"]},
+        {"id": "2,}"},
+    ]
+
+
+def test_iter_json_records_reads_json_lines(tmp_path):
+    file_path = tmp_path / "pubmed.jsonl"
+    file_path.write_text('{"id": 1}\n{"id": 2}\n\n')
+
+    assert list(iter_json_records(str(file_path))) == [{"id": 1}, {"id": 2}]
+
+
+def test_iter_json_records_raises_on_invalid_json(tmp_path):
+    file_path = tmp_path / "pubmed.json"
+    file_path.write_text('[{"id": }]')
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_records(str(file_path)))
+
+
+def test_iter_json_chunks():
+    chunks = list(iter_json_chunks("data/pubmed.json", 2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert chunks[0]["date"].tolist() == ["01/01/2020", "01/01/2020"]
@@ -0,0 +1,66 @@
+import json
+
+import pandas as pd
+import pytest
+
+from etl.sinks import JsonSink
+
+
+@pytest.fixture
+def edges():
+    """Fixture holding graph edges with nested drug and article records"""
+    return pd.DataFrame(
+        {
+            "drug": [{"surrerogate_id": 0, "drug": "ÉTHANOL"}, {"drug": "ATROPINE"}],
+            "article": [{"id": "1", "title": "A"}, {"id": "2", "title": "B"}],
+            "surrerogate_id": pd.Series([3, 4], dtype="int64"),
+            "date": ["01-01-2020", "02-01-2020"],
+        }
+    )
+
+
+def test_json_output_is_identical_to_pandas_output(tmp_path, edges):
+    output_path = tmp_path / "data.json"
+
+    with JsonSink(str(output_path)) as sink:
+        sink.write_dataframe(edges)
+
+    assert output_path.read_text(encoding="UTF-8") == edges.to_json(
+        orient="records", force_ascii=False, indent=4
+    )
+
+
+def test_empty_json_output(tmp_path):
+    output_path = tmp_path / "data.json"
+
+    with JsonSink(str(output_path)) as sink:
+        sink.write_dataframe(pd.DataFrame())
+
+    assert json.loads(output_path.read_text()) == []
+
+
+def test_jsonl_output(tmp_path, edges):
+    output_path = tmp_path / "data.jsonl"
+
+    with JsonSink(str(output_path), "jsonl") as sink:
+        sink.write_dataframe(edges)
+
+    lines = output_path.read_text(encoding="UTF-8").splitlines()
+    assert [json.loads(line) for line in lines] == edges.to_dict("records")
+
+
+def test_failed_write_keeps_previous_output(tmp_path):
+    output_path = tmp_path / "data.json"
+    output_path.write_text("[]")
+
+    with pytest.raises(TypeError), JsonSink(str(output_path)) as sink:
+        sink.write({"drug": "ETHANOL"})
+        sink.write({"drug": object()})
+
+    assert output_path.read_text() == "[]"
+    assert list(tmp_path.iterdir()) == [output_path]
+
+
+def test_unsupported_format_raises_value_error(tmp_path):
+    with pytest.raises(ValueError):
+        JsonSink(str(tmp_path / "data.csv"), "csv")
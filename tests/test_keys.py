@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.database import read_database, write_database
+from etl.etl import ETL
+from etl.keys import (
+    SURROGATE_KEY_COLUMN,
+    SURROGATE_KEYS,
+    get_article_key_columns,
+    get_record_key,
+    hash_keys,
+)
+from etl.readers import read_json
+
+
+def test_keys_only_depend_on_normalized_business_columns():
+    data = pd.DataFrame(
+        {
+            "id": ["1", " 1", "2", "1"],
+            "title": ["Aspirin  use", "ASPIRIN use ", "Aspirin use", "Aspirin use"],
+            "journal": ["J1", "J2", "J1", "J1"],
+        }
+    )
+
+    keys = hash_keys(data, ("id", "title"))
+
+    assert keys.dtype == np.int64
+    assert keys[0] == keys[1] == keys[3] != keys[2]
+    assert hash_keys(data.iloc[::-1], ("id", "title"))[::-1].tolist() == keys.tolist()
+
+
+def test_columns_are_not_concatenated_ambiguously():
+    data = pd.DataFrame({"id": ["1 2", "1"], "title": ["3", "2 3"]})
+
+    keys = hash_keys(data, ("id", "title"))
+
+    assert keys[0] != keys[1]
+
+
+def test_collisions_are_detected(monkeypatch):
+    monkeypatch.setattr(
+        pd.util,
+        "hash_pandas_object",
+        lambda values, index, categorize: pd.Series(
+            np.zeros(len(values), dtype=np.uint64)
+        ),
+    )
+
+    assert hash_keys(pd.DataFrame({"drug": ["A", "a"]}), ("drug",)).tolist() == [0, 0]
+    with pytest.raises(ValueError, match="collide"):
+        hash_keys(pd.DataFrame({"drug": ["A", "B"]}), ("drug",))
+
+
+def test_output_keys_are_stable_across_runs_and_chunks(tmp_path):
+    outputs = []
+    for options in [{}, {"chunk_size": 2}, {"chunk_size": 3, "workers": 2}]:
+        output_path = str(tmp_path / "data.json")
+        ETL(output_path=output_path, **options).run("data", "n")
+        outputs.append(read_json(output_path))
+
+    for output in outputs[1:]:
+        assert output["drug"].tolist() == outputs[0]["drug"].tolist()
+        assert output["article"].tolist() == outputs[0]["article"].tolist()
+
+
+def test_output_keys_can_be_computed_again_from_records(tmp_path):
+    output_path = str(tmp_path / "data.json")
+    ETL(output_path=output_path).run("data", "n")
+    data = read_json(output_path)
+
+    for drug in data["drug"]:
+        key = drug.pop(SURROGATE_KEY_COLUMN)
+        assert get_record_key(drug, SURROGATE_KEYS["drugs"]) == key
+    for article in data["article"]:
+        key = article.pop(SURROGATE_KEY_COLUMN)
+        assert get_record_key(article, get_article_key_columns(article)) == key
+
+
+def test_articles_sharing_a_title_keep_their_own_edges(tmp_path):
+    data_folder = tmp_path / "data"
+    data_folder.mkdir()
+    pd.DataFrame({"atccode": ["A"], "drug": ["ASPIRIN"]}).to_csv(
+        data_folder / "drugs.csv", index=False
+    )
+    pd.DataFrame(
+        {
+            "id": ["1", "2"],
+            "title": ["Aspirin", "Aspirin"],
+            "date": ["01/01/2020", "02/01/2020"],
+            "journal": ["J1", "J2"],
+        }
+    ).to_csv(data_folder / "pubmed.csv", index=False)
+    pd.DataFrame(
+        columns=["id", "scientific_title", "date", "journal"],
+    ).to_csv(data_folder / "clinical_trials.csv", index=False)
+    output_path = str(tmp_path / "data.json")
+
+    ETL(output_path=output_path, deduplication_keys={}).run(str(data_folder), "n")
+
+    data = read_json(output_path)
+    assert data["article"].str.get("id").tolist() == ["1", "2"]
+    assert data["journal"].tolist() == ["J1", "J2"]
+
+
+def test_database_upserts_nodes_by_surrogate_key(tmp_path):
+    json_path = str(tmp_path / "data.json")
+    database_path = str(tmp_path / "data.db")
+    ETL(output_path=json_path).run("data", "n")
+    data = read_json(json_path)
+
+    write_database(data, database_path)
+    # the same nodes without their surrogate keys get the same keys again
+    without_keys = data.assign(
+        drug=[
+            {k: v for k, v in drug.items() if k != SURROGATE_KEY_COLUMN}
+            for drug in data["drug"]
+        ],
+        date="01-01-2030",
+    )
+    write_database(without_keys, database_path, if_exists="append")
+
+    loaded = read_database(database_path)
+    assert len(loaded) == len(data)
+    assert (loaded["date"] == "01-01-2030").all()
+    assert SURROGATE_KEY_COLUMN not in loaded["drug"][0]
@@ -0,0 +1,122 @@
+import json
+import pstats
+import time
+
+import pytest
+
+from etl.etl import ETL
+from etl.metrics import Instrumentation
+
+
+def test_nested_stages_are_recorded_by_path():
+    instrumentation = Instrumentation()
+
+    with instrumentation.capture(), instrumentation.stage("transform"):
+        for rows in [10, 20]:
+            with instrumentation.stage("dates", rows_in=rows) as record:
+                record["rows_out"] = rows - 1
+
+    stages = instrumentation.report()["stages"]
+    assert [stage["stage"] for stage in stages] == ["transform", "transform/dates"]
+    assert stages[1]["calls"] == 2
+    assert stages[1]["rows_in"] == 30
+    assert stages[1]["rows_out"] == 28
+    assert stages[0]["wall_seconds"] >= stages[1]["wall_seconds"]
+
+
+def test_stage_measures_times_and_memory():
+    instrumentation = Instrumentation()
+
+    with instrumentation.capture(), instrumentation.stage("sleep"):
+        time.sleep(0.01)
+
+    stage = instrumentation.report()["stages"][0]
+    assert stage["wall_seconds"] >= 0.01
+    assert stage["cpu_seconds"] >= 0
+    assert stage["peak_rss_bytes"] > 0
+
+
+def test_callbacks_receive_each_stage_record():
+    records = []
+    instrumentation = Instrumentation(callbacks=[records.append])
+
+    with (
+        instrumentation.capture(),
+        instrumentation.stage("extract"),
+        instrumentation.stage("drugs.csv"),
+    ):
+        pass
+
+    assert [record["stage"] for record in records] == ["extract/drugs.csv", "extract"]
+
+
+def test_metrics_report_is_written(tmp_path):
+    instrumentation = Instrumentation(metrics_path=str(tmp_path / "metrics.json"))
+
+    with instrumentation.capture(), instrumentation.stage("load", rows_in=3):
+        pass
+
+    with open(tmp_path / "metrics.json", encoding="UTF-8") as f:
+        report = json.load(f)
+    assert report["stages"][0]["stage"] == "load"
+    assert report["stages"][0]["rows_in"] == 3
+
+
+def test_cprofile_statistics_are_saved(tmp_path):
+    profile_path = str(tmp_path / "etl.prof")
+    instrumentation = Instrumentation(profile="cprofile", profile_path=profile_path)
+
+    with instrumentation.capture(), instrumentation.stage("sort"):
+        sorted(range(1000), reverse=True)
+
+    assert pstats.Stats(profile_path).total_calls > 0
+
+
+def test_tracemalloc_records_peak_of_sub_stages():
+    instrumentation = Instrumentation(profile="tracemalloc")
+
+    with (
+        instrumentation.capture(),
+        instrumentation.stage("transform"),
+        instrumentation.stage("allocate"),
+    ):
+        data = [0] * 1_000_000
+        del data
+
+    report = instrumentation.report()
+    parent, child = report["stages"]
+    assert child["peak_traced_bytes"] >= 7_000_000
+    assert parent["peak_traced_bytes"] >= child["peak_traced_bytes"]
+    assert report["tracemalloc_top"]
+
+
+def test_unknown_profile_mode_is_rejected():
+    with pytest.raises(ValueError):
+        Instrumentation(profile="perf")
+
+
+def test_etl_run_reports_each_stage(tmp_path):
+    metrics_path = tmp_path / "metrics.json"
+    records = []
+    etl = ETL(
+        output_path=str(tmp_path / "data.json"),
+        metrics_path=str(metrics_path),
+        callbacks=[records.append],
+    )
+
+    etl.run("data", "y")
+
+    with open(metrics_path, encoding="UTF-8") as f:
+        stages = {stage["stage"]: stage for stage in json.load(f)["stages"]}
+    for stage in [
+        "run",
+        "run/extract/drugs.csv",
+        "run/transform/pubmed/types",
+        "run/transform/pubmed/dates",
+        "run/transform/clinical_trials/text_cleaning",
+        "run/matching",
+        "run/load",
+    ]:
+        assert stage in stages
+    assert stages["run/matching"]["rows_out"] == stages["run/load"]["rows_in"]
+    assert records[-1]["stage"] == "run"
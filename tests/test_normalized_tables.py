@@ -0,0 +1,139 @@
+import json
+
+import pandas as pd
+import pytest
+
+from etl.etl import ETL
+from etl.keys import SURROGATE_KEYS, hash_keys
+from etl.normalized import (
+    build_normalized_tables,
+    denormalize_tables,
+    read_normalized_tables,
+    records_by_key,
+    write_normalized_tables,
+)
+
+
+@pytest.fixture
+def edges():
+    """Fixture holding graph edges sharing drugs, articles and journals"""
+    pubmed_article = {
+        "surrerogate_id": 11,
+        "id": "1",
+        "title": "A",
+        "journal": "J1",
+        "date": "01-01-2020",
+    }
+    trial_article = {
+        "surrerogate_id": 12,
+        "id": "NCT1",
+        "scientific_title": "B",
+        "journal": "J2",
+        "date": "02-01-2020",
+    }
+    return pd.DataFrame(
+        {
+            "drug": [
+                {"surrerogate_id": 1, "atccode": "A01", "drug": "ETHANOL"},
+                {"surrerogate_id": 1, "atccode": "A01", "drug": "ETHANOL"},
+                {"surrerogate_id": 2, "atccode": "B01", "drug": "ATROPINE"},
+            ],
+            "article": [pubmed_article, trial_article, pubmed_article],
+            "journal": ["J1", "J2", "J1"],
+            "relationship": ["REFERENCED IN", "REFERENCED IN", "REFERENCED IN"],
+            "date": ["01-01-2020", "02-01-2020", "01-01-2020"],
+        }
+    )
+
+
+def test_nodes_are_stored_once(edges):
+    tables = build_normalized_tables(edges)
+
+    assert len(tables["drugs"]) == 2
+    assert len(tables["articles"]) == 2
+    assert tables["journals"]["journal"].tolist() == ["J1", "J2"]
+    assert tables["edges"]["drug_key"].tolist() == [1, 1, 2]
+    assert tables["edges"]["article_key"].tolist() == [11, 12, 11]
+
+
+def test_records_without_surrogate_id_are_keyed_by_business_columns(edges):
+    edges["drug"] = [
+        {key: value for key, value in drug.items() if key != "surrerogate_id"}
+        for drug in edges["drug"]
+    ]
+
+    tables = build_normalized_tables(edges)
+
+    expected = hash_keys(
+        pd.DataFrame({"atccode": ["A01", "B01"], "drug": ["ETHANOL", "ATROPINE"]}),
+        SURROGATE_KEYS["drugs"],
+    ).tolist()
+    assert tables["drugs"]["surrerogate_id"].tolist() == expected
+    assert tables["edges"]["drug_key"].tolist() == [expected[0], *expected]
+
+
+def test_tables_of_different_runs_join_on_their_keys(edges):
+    first_tables = build_normalized_tables(edges.iloc[[0, 1]])
+    second_tables = build_normalized_tables(edges.iloc[[2]])
+
+    joined = pd.concat([first_tables["edges"], second_tables["edges"]]).merge(
+        pd.concat([first_tables["journals"], second_tables["journals"]])
+        .drop_duplicates("journal_key")
+        .set_index("journal_key"),
+        left_on="journal_key",
+        right_index=True,
+    )
+
+    assert joined["journal"].tolist() == ["J1", "J2", "J1"]
+    first_articles = records_by_key(first_tables["articles"], "surrerogate_id")
+    second_articles = records_by_key(second_tables["articles"], "surrerogate_id")
+    assert first_articles[11] == second_articles[11]
+
+
+@pytest.mark.parametrize("table_format", ["parquet", "feather"])
+def test_normalized_tables_round_trip(tmp_path, edges, table_format):
+    pytest.importorskip("pyarrow")
+    output_path = str(tmp_path / "graph")
+
+    write_normalized_tables(build_normalized_tables(edges), output_path, table_format)
+    data = denormalize_tables(read_normalized_tables(output_path))
+
+    assert data.to_dict("records") == edges.to_dict("records")
+
+
+def test_read_selected_columns(tmp_path, edges):
+    pytest.importorskip("pyarrow")
+    output_path = str(tmp_path / "graph")
+    write_normalized_tables(build_normalized_tables(edges), output_path)
+
+    tables = read_normalized_tables(output_path, {"edges": ["drug_key", "date"]})
+
+    assert tables["edges"].columns.tolist() == ["drug_key", "date"]
+
+
+def test_empty_graph_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    output_path = str(tmp_path / "graph")
+
+    write_normalized_tables(build_normalized_tables(pd.DataFrame()), output_path)
+
+    assert denormalize_tables(read_normalized_tables(output_path)).empty
+
+
+def test_unsupported_table_format_raises_value_error(tmp_path, edges):
+    with pytest.raises(ValueError):
+        write_normalized_tables(
+            build_normalized_tables(edges), str(tmp_path / "graph"), "csv"
+        )
+
+
+def test_etl_parquet_output_matches_json_output(tmp_path):
+    pytest.importorskip("pyarrow")
+    ETL(output_path=str(tmp_path / "data.json")).run("data", "n")
+    ETL(output_path=str(tmp_path / "graph"), output_format="parquet").run("data", "n")
+
+    with open(tmp_path / "data.json", encoding="UTF-8") as f:
+        expected = json.load(f)
+    data = denormalize_tables(read_normalized_tables(str(tmp_path / "graph")))
+
+    assert data.to_dict("records") == expected
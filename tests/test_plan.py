@@ -0,0 +1,130 @@
+import shutil
+
+import pandas as pd
+
+from etl.etl import ETL
+from etl.plan import DateRangeFilter, NonBlankFilter
+from etl.readers import read_file, read_json
+
+
+def test_explain_describes_each_step():
+    plan = ETL(chunk_size=10).plan("data", "n").where_dates("01-01-2020")
+
+    explanation = plan.explain()
+
+    assert (
+        explanation.splitlines()[0]
+        == "1. Extract from data (append, by chunks of 10 rows)"
+    )
+    assert "data/drugs.csv | columns: atccode, drug | where: drug is not blank" in (
+        explanation
+    )
+    assert "scientific_title is not blank and date between 01-01-2020 and ..." in (
+        explanation
+    )
+    assert "2. Transform" in explanation
+    assert "3. Match drugs in titles" in explanation
+    assert "4. Load to data.json (json)" in explanation
+
+
+def test_composing_a_plan_leaves_it_unchanged():
+    plan = ETL().plan("data", "n")
+
+    restricted = plan.select("pubmed", ["id", "title", "notes"]).where_dates(
+        end="01-01-2020"
+    )
+
+    assert plan.columns["pubmed"] == ("id", "title", "date", "journal")
+    assert len(plan.row_filters["pubmed"]) == 1
+    assert restricted.columns["pubmed"] == ("id", "title", "date", "journal", "notes")
+    assert len(restricted.row_filters["pubmed"]) == 2
+
+
+def test_blank_titles_are_dropped_before_transformations():
+    data = ETL()._extract("data", "replace")
+
+    titles = data["clinical_trials"]["scientific_title"]
+    assert (titles.str.strip() != "").all()
+    # surrogate keys of the next rows do not change
+    assert 2 not in data["clinical_trials"].index
+    assert data["clinical_trials"].index[-1] == 7
+
+
+def test_row_filters():
+    data = pd.DataFrame(
+        {
+            "title": ["A", "  ", None, "B"],
+            "date": ["01/01/2020", "2020-02-01", "1 March 2020", "not a date"],
+        }
+    )
+
+    assert NonBlankFilter("title")(data).tolist() == [True, False, False, True]
+    assert DateRangeFilter("15-01-2020", "01-03-2020")(data).tolist() == [
+        False,
+        True,
+        True,
+        False,
+    ]
+
+
+def test_readers_only_keep_selected_columns(tmp_path):
+    pd.DataFrame({"id": [1], "title": ["A"], "notes": ["x"]}).to_csv(
+        tmp_path / "pubmed.csv", index=False
+    )
+    pd.DataFrame({"id": [2], "title": ["B"], "notes": ["y"]}).to_json(
+        tmp_path / "pubmed.json", orient="records"
+    )
+
+    for file_name in ["pubmed.csv", "pubmed.json"]:
+        data = read_file(str(tmp_path / file_name), ("title", "id", "missing"))
+        assert data.columns.tolist() == ["id", "title"]
+    assert read_json(str(tmp_path / "pubmed.json")).columns.tolist() == [
+        "id",
+        "title",
+        "notes",
+    ]
+
+
+def test_unused_columns_are_not_read(tmp_path):
+    shutil.copytree("data", tmp_path / "data")
+    pubmed = pd.read_csv(tmp_path / "data" / "pubmed.csv")
+    pubmed["notes"] = "unused"
+    pubmed.to_csv(tmp_path / "data" / "pubmed.csv", index=False)
+
+    assert ETL(output_path=str(tmp_path / "data.json")).run(str(tmp_path / "data"), "n")
+
+
+def test_date_range_plan(tmp_path):
+    output_path = str(tmp_path / "data.json")
+
+    for chunk_size in [None, 2]:
+        ETL(output_path=output_path, chunk_size=chunk_size).plan(
+            "data", "n"
+        ).where_dates("01-01-2020", "31-01-2020").execute()
+
+        dates = pd.to_datetime(read_json(output_path)["date"], format="%d-%m-%Y")
+        assert not dates.empty
+        assert dates.between("2020-01-01", "2020-01-31").all()
+
+
+def test_selected_columns_keep_the_graph_columns(tmp_path):
+    expected_path = str(tmp_path / "expected.json")
+    ETL(output_path=expected_path).plan("data", "n").where_dates(
+        end="31-12-2020"
+    ).execute()
+    output_path = str(tmp_path / "data.json")
+
+    assert (
+        ETL(output_path=output_path)
+        .plan("data", "n")
+        .select("pubmed", ["id", "title"])
+        .select("clinical_trials", ["id"])
+        .where_dates(end="31-12-2020")
+        .execute()
+    )
+
+    with (
+        open(expected_path, encoding="UTF-8") as expected,
+        open(output_path, encoding="UTF-8") as output,
+    ):
+        assert output.read() == expected.read()
@@ -0,0 +1,188 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from etl.etl import ETL
+from etl.index import (
+    QueryIndex,
+    get_edges_postings_path,
+    get_index_path,
+    get_records_path,
+)
+from etl.readers import read_json
+from main import get_journal_which_quotes_the_most_amount_of_drugs
+
+
+@pytest.fixture
+def data() -> pd.DataFrame:
+    drugs = [
+        {"surrerogate_id": 1, "atccode": "A", "drug": "ASPIRIN"},
+        {"surrerogate_id": 2, "atccode": "B", "drug": "BETA"},
+    ]
+    articles = [
+        {
+            "surrerogate_id": 11,
+            "id": "1",
+            "title": "aspirin and beta",
+            "journal": "J1",
+            "date": "01-01-2020",
+        },
+        {
+            "surrerogate_id": 12,
+            "id": "2",
+            "title": "aspirin again",
+            "journal": "J1",
+            "date": "15-01-2020",
+        },
+        {
+            "surrerogate_id": 13,
+            "id": "3",
+            "title": "aspirin elsewhere",
+            "journal": "J2",
+            "date": "01-02-2020",
+        },
+    ]
+    edges = [(0, 0), (0, 1), (0, 2), (1, 0)]
+
+    return pd.DataFrame(
+        {
+            "drug": [drugs[drug] for drug, _ in edges],
+            "article": [articles[article] for _, article in edges],
+            "journal": [articles[article]["journal"] for _, article in edges],
+            "relationship": "REFERENCED IN",
+            "date": [articles[article]["date"] for _, article in edges],
+        }
+    )
+
+
+def test_articles_citing_a_drug(data):
+    index = QueryIndex.from_data(data)
+
+    assert [article["id"] for article in index.get_articles_citing("ASPIRIN")] == [
+        "1",
+        "2",
+        "3",
+    ]
+    assert index.get_articles_citing("BETA") == [data["article"][0]]
+    assert index.get_articles_citing("UNKNOWN") == []
+
+
+def test_journals_are_ranked_by_distinct_drugs(data):
+    index = QueryIndex.from_data(data)
+
+    assert index.get_journal_drugs("J1") == ["ASPIRIN", "BETA"]
+    assert index.rank_journals() == [("J1", 2), ("J2", 1)]
+
+
+def test_edges_on_a_date(data):
+    edges = QueryIndex.from_data(data).get_edges_on("01-01-2020")
+
+    assert [edge["drug"]["drug"] for edge in edges] == ["ASPIRIN", "BETA"]
+    assert all(edge["journal"] == "J1" for edge in edges)
+
+
+def test_drugs_per_journal_per_month(data):
+    counts = QueryIndex.from_data(data).count_drugs_per_journal_per_month()
+
+    assert counts.to_dict("records") == [
+        {"journal": "J1", "month": "2020-01", "drugs": 2},
+        {"journal": "J2", "month": "2020-02", "drugs": 1},
+    ]
+
+
+def test_index_round_trip(tmp_path, data):
+    index_path = str(tmp_path / "data.index.json")
+
+    QueryIndex.from_data(data).save(index_path)
+    index = QueryIndex.load(index_path)
+
+    assert index.rank_journals() == [("J1", 2), ("J2", 1)]
+    assert index.get_edges_on("15-01-2020")[0]["article"]["id"] == "2"
+
+
+def test_drugs_sharing_a_name_keep_their_articles(data):
+    article = {"id": "4", "title": "aspirin", "journal": "J2", "date": "01-03-2020"}
+    other_aspirin = pd.DataFrame(
+        {
+            "drug": [{"atccode": "C", "drug": "ASPIRIN"}],
+            "article": [article],
+            "journal": ["J2"],
+            "relationship": "REFERENCED IN",
+            "date": ["01-03-2020"],
+        }
+    )
+
+    index = QueryIndex.from_data(pd.concat([data, other_aspirin], ignore_index=True))
+
+    assert [article["id"] for article in index.get_articles_citing("ASPIRIN")] == [
+        "1",
+        "2",
+        "3",
+        "4",
+    ]
+
+
+def test_loaded_index_only_reads_records_when_queried(tmp_path, data):
+    index_path = str(tmp_path / "data.index.json")
+    QueryIndex.from_data(data).save(index_path)
+
+    index = QueryIndex.load(index_path)
+    assert index.get_articles_citing("BETA") == [data["article"][0]]
+
+    os.remove(get_records_path(index_path))
+    assert index.rank_journals() == [("J1", 2), ("J2", 1)]
+    assert index.get_journal_drugs("J1") == ["ASPIRIN", "BETA"]
+
+
+def test_loaded_index_only_reads_edges_postings_when_queried(tmp_path, data):
+    index_path = str(tmp_path / "data.index.json")
+    QueryIndex.from_data(data).save(index_path)
+    edges_postings_path = get_edges_postings_path(index_path)
+    os.rename(edges_postings_path, edges_postings_path + ".moved")
+
+    index = QueryIndex.load(index_path)
+    assert index.rank_journals() == [("J1", 2), ("J2", 1)]
+    assert index.get_journal_drugs("J1") == ["ASPIRIN", "BETA"]
+
+    os.rename(edges_postings_path + ".moved", edges_postings_path)
+    assert [edge["drug"]["drug"] for edge in index.get_edges_on("01-01-2020")] == [
+        "ASPIRIN",
+        "BETA",
+    ]
+
+
+def test_outdated_index_raises_value_error(tmp_path, data):
+    index_path = str(tmp_path / "data.index.json")
+    QueryIndex.from_data(data).save(index_path)
+    with open(index_path, "w", encoding="UTF-8") as f:
+        json.dump({"version": 2}, f)
+
+    with pytest.raises(ValueError, match="outdated"):
+        QueryIndex.load(index_path)
+
+
+def test_empty_index():
+    index = QueryIndex.from_data(pd.DataFrame())
+
+    assert index.rank_journals() == []
+    assert index.count_drugs_per_journal_per_month().empty
+
+
+def test_index_path_is_next_to_the_output():
+    assert get_index_path("output/data.json") == "output/data.index.json"
+    assert get_index_path("output/tables/") == "output/tables.index.json"
+
+
+def test_etl_writes_the_index(tmp_path):
+    output_path = str(tmp_path / "data.json")
+
+    ETL(output_path=output_path).run("data", "y")
+
+    index = QueryIndex.load(get_index_path(output_path))
+    data = read_json(output_path)
+    assert index.rank_journals()[
+        0
+    ] == get_journal_which_quotes_the_most_amount_of_drugs(data)
+    assert sum(len(edges) for edges in index.date_edges.values()) == len(data)
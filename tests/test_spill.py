@@ -0,0 +1,92 @@
+import os
+
+import pandas as pd
+import pytest
+
+from etl.database import read_database
+from etl.etl import ETL
+from etl.index import get_edges_postings_path, get_index_path, get_records_path
+from etl.readers import read_json
+from etl.spill import SpillingEdgeBuffer
+
+
+def create_edge(drug_key, article_key):
+    return {
+        "drug": {"surrerogate_id": drug_key},
+        "article": {"surrerogate_id": article_key},
+        "relationship": "REFERENCED IN",
+    }
+
+
+def test_spilled_edges_are_merged_in_order(tmp_path):
+    sort_keys = [(1, 0), (0, 1), (1, 2), (0, 3), (2, 4)]
+
+    with SpillingEdgeBuffer(
+        ["drug", "article"], max_edges=2, spill_folder=str(tmp_path)
+    ) as edges:
+        for drug_key, sequence in sort_keys:
+            edges.append(create_edge(drug_key, sequence), (drug_key, sequence))
+
+        assert len(edges.partitions) == 2
+        assert len(edges) == 5
+        merged = edges.to_dataframe()
+
+    assert merged["drug"].str.get("surrerogate_id").tolist() == [0, 0, 1, 1, 2]
+    assert merged["article"].str.get("surrerogate_id").tolist() == [1, 3, 0, 2, 4]
+    assert os.listdir(tmp_path) == []
+
+
+def test_duplicated_edges_are_dropped_within_a_drug():
+    edges = SpillingEdgeBuffer(["drug", "article"], max_edges=1)
+    edges.append(create_edge(0, 10), (0, 0))
+    edges.append(create_edge(1, 10), (1, 1))
+    edges.append(create_edge(0, 10), (0, 2))
+
+    assert len(edges.to_dataframe()) == 2
+    edges.close()
+
+
+def test_max_edges_must_be_positive():
+    with pytest.raises(ValueError):
+        SpillingEdgeBuffer(["drug"], max_edges=0)
+
+
+@pytest.mark.parametrize("chunk_size", [None, 3])
+@pytest.mark.parametrize("output_format", ["json", "jsonl"])
+def test_spilled_output_is_the_same(tmp_path, chunk_size, output_format):
+    expected_path = str(tmp_path / f"expected.{output_format}")
+    ETL(output_path=expected_path, output_format=output_format).run("data", "n")
+    spill_folder = tmp_path / "spill"
+    spill_folder.mkdir()
+    output_path = str(tmp_path / f"data.{output_format}")
+
+    ETL(
+        output_path=output_path,
+        output_format=output_format,
+        chunk_size=chunk_size,
+        max_edges_in_memory=2,
+        spill_path=str(spill_folder),
+    ).run("data", "n")
+
+    with (
+        open(expected_path, encoding="UTF-8") as expected,
+        open(output_path, encoding="UTF-8") as output,
+    ):
+        assert output.read() == expected.read()
+    assert os.listdir(spill_folder) == []
+    assert not os.path.exists(get_index_path(output_path))
+    assert not os.path.exists(get_edges_postings_path(get_index_path(output_path)))
+    assert not os.path.exists(get_records_path(get_index_path(output_path)))
+
+
+def test_spilled_edges_are_loaded_to_a_database(tmp_path):
+    json_path = str(tmp_path / "data.json")
+    database_path = str(tmp_path / "data.db")
+    ETL(output_path=json_path).run("data", "n")
+
+    ETL(output_path=database_path, output_format="sqlite", max_edges_in_memory=2).run(
+        "data", "n"
+    )
+
+    pd.testing.assert_frame_equal(read_database(database_path), read_json(json_path))
+    assert os.path.exists(get_index_path(database_path))
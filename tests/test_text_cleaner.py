@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+from etl.cleaning import TextCleaner
+
+
+def test_valid_escape_sequences_are_decoded():
+    texts = pd.Series(["Laminoplasty or \\xc3\\xb1 Laminectomy"])
+
+    cleaned_texts = TextCleaner().clean_column(texts, ("escapes",))
+
+    assert cleaned_texts.tolist() == ["Laminoplasty or ñ Laminectomy"]
+
+
+def test_invalid_escape_sequences_are_dropped_and_text_after_is_kept():
+    texts = pd.Series(["Journal\\xc3\\x28 of nursing", "Journal of nursing\\xc3\\x28"])
+
+    cleaned_texts = TextCleaner().clean_column(texts, ("escapes", "whitespace"))
+
+    assert cleaned_texts.tolist() == ["Journal of nursing", "Journal of nursing"]
+
+
+def test_whitespace_is_collapsed_and_stripped():
+    texts = pd.Series(["  ", " A \t title\n"])
+
+    cleaned_texts = TextCleaner().clean_column(texts, ("whitespace",))
+
+    assert cleaned_texts.tolist() == ["", "A title"]
+
+
+def test_control_characters_are_removed():
+    texts = pd.Series(["A\x00 ti\x1ftle�"])
+
+    cleaned_texts = TextCleaner().clean_column(texts, ("control_characters",))
+
+    assert cleaned_texts.tolist() == ["A title"]
+
+
+def test_unicode_is_normalized():
+    texts = pd.Series(["Gene\u0300ve"])
+
+    cleaned_texts = TextCleaner().clean_column(texts, ("unicode",))
+
+    assert cleaned_texts.tolist() == ["Gen\u00e8ve"]
+
+
+def test_steps_are_configured_per_column():
+    data = pd.DataFrame(
+        {"id": [" 1 "], "title": [" A\\xc3\\xa9 "], "surrerogate_id": [0]}
+    )
+
+    data = TextCleaner({"id": ()}).clean(data)
+
+    assert data.to_dict("records") == [
+        {"id": " 1 ", "title": "Aé", "surrerogate_id": 0}
+    ]
+
+
+def test_missing_texts_are_kept_missing():
+    texts = pd.Series(["\\xc3\\xa9", None], dtype=object)
+
+    cleaned_texts = TextCleaner().clean_column(texts, ("escapes", "whitespace"))
+
+    assert cleaned_texts[0] == "é"
+    assert pd.isna(cleaned_texts[1])
+
+
+def test_only_dirty_texts_are_changed():
+    texts = pd.Series(["Clean text", "Café", " Outer", "Tab\there"], dtype="string")
+
+    cleaned_texts = TextCleaner().clean_column(texts, ("whitespace",))
+
+    assert cleaned_texts.tolist() == ["Clean text", "Café", "Outer", "Tab here"]
+
+
+def test_numeric_categories_are_kept():
+    texts = pd.Series([1, 2, 1], dtype="category")
+
+    assert TextCleaner().clean_column(texts, ("whitespace",)).tolist() == [1, 2, 1]
+
+
+def test_unknown_step_raises_value_error():
+    with pytest.raises(ValueError):
+        TextCleaner({"title": ("lowercase",)})